@@ -4,7 +4,7 @@ import os
 import re
 import json
 import sqlite3
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Dict, Any, Optional
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 import requests
@@ -13,6 +13,8 @@ import aiohttp
 import websockets
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, EmailStr
 from dotenv import load_dotenv
 
@@ -96,7 +98,8 @@ def fetch_featured_from_backend_sync(fast: int = 0, timeout_s: int = 120):
         r.raise_for_status()
         j = r.json()
         items = j.get("items", []) or []
-        print(f"[AGENT] items={len(items)} (fast={fast})")
+        snap = j.get("snapshot") or {}
+        print(f"[AGENT] items={len(items)} (fast={fast}) snapshot=v{snap.get('version')} age_s={snap.get('age_s')}")
         return [it for it in items if isinstance(it, dict)]
     except Exception as e:
         print("[AGENT] fetch error:", type(e).__name__, e)
@@ -169,7 +172,12 @@ def derive_highlights(
     Highlights boşsa veya 'Sender:' gibi işe yaramazsa,
     teaser/long_summary içinden anlamlı 3–4 cümle üret.
     """
-    def clean_list(lst: List[str]) -> List[str]:
+    if max_items <= 0:
+        return []
+    warn = WARNING_PREFIX.lower()
+
+    def clean_list(lst: Iterable[str]) -> List[str]:
+        # max_items kadar geçerli cümle bulununca dur (kalanlar hiç temizlenmez)
         out = []
         for x in lst:
             if not x:
@@ -177,31 +185,38 @@ def derive_highlights(
             t = sanitize_text(x)
             if not t or t.lower().startswith("sender:"):
                 continue
-            if WARNING_PREFIX.lower() in t.lower():
+            if warn in t.lower():
                 continue
             out.append(t)
+            if len(out) >= max_items:
+                break
         return out
 
+    def sentences(text: str) -> Iterable[str]:
+        # finditer ile tembel bölme: baştaki birkaç cümle için tüm metni bölmeye gerek yok
+        start = 0
+        for m in SENT_SPLIT.finditer(text):
+            yield text[start:m.start()].strip()
+            start = m.end()
+        yield text[start:].strip()
+
     # 1) Var olan highlight'ları temizleyip kullan
     if highlights:
         hl = clean_list(highlights)
         if hl:
-            return hl[:max_items]
+            return hl
 
     # 2) Teaser cümlelerine bak (uyarı değilse)
-    hl = []
-    if teaser and WARNING_PREFIX.lower() not in teaser.lower():
-        parts = [p.strip() for p in SENT_SPLIT.split(teaser) if p.strip()]
-        hl = clean_list(parts)
+    if teaser and warn not in teaser.lower():
+        hl = clean_list(sentences(teaser))
         if hl:
-            return hl[:max_items]
+            return hl
 
     # 3) Long summary cümlelerinden seç
     if long_summary:
-        parts = [p.strip() for p in SENT_SPLIT.split(long_summary) if p.strip()]
-        hl = clean_list(parts)
+        hl = clean_list(sentences(long_summary))
         if hl:
-            return hl[:max_items]
+            return hl
 
     return []
 
@@ -344,6 +359,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# önizleme HTML'i büyük; 1 KB üstü yanıtlar gzip'lenir
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("COMPRESS_MIN_BYTES", "1024")))
 
 class SubscribeBody(BaseModel):
     email: EmailStr
@@ -372,7 +389,7 @@ def list_subs():
 class NowBody(BaseModel):
     email: EmailStr
 
-@app.get("/api/digest/preview")
+@app.get("/api/digest/preview", response_class=ORJSONResponse)
 async def digest_preview():
     tz = ZoneInfo(DEFAULT_TZ)
     now_local = datetime.now(tz)
@@ -382,9 +399,9 @@ async def digest_preview():
         # son çare: fast=1
         items = fetch_featured_from_backend_sync(fast=1, timeout_s=120)
     if not items:
-        return {"html": "<p>Öğe yok</p>"}
+        return ORJSONResponse({"html": "<p>Öğe yok</p>"})
     html = build_html_from_featured(now_local, items[:5], global_notice=None)
-    return {"html": html}
+    return ORJSONResponse({"html": html})
 
 
 @app.post("/api/digest/now")
@@ -11,6 +11,8 @@ from langchain_openai import ChatOpenAI
 
 from langchain_core.messages import SystemMessage, HumanMessage
 
+from backend.summarizer.mapreduce import amap_reduce, map_reduce
+
 import aiohttp
 from datetime import datetime
 
@@ -140,22 +142,73 @@ async def gmail_send(to, subject, body):
             raise RuntimeError(f"Gönderim hatası: {r}")
 
 # ---------------- Özetleme ----------------
-def summarize_threads_turkish(messages) -> str:
-    joined = "\n\n".join([
-        f"---\nKonu: {m.get('subject','(yok)')}\nGönderen: {m.get('from','')}\nİçerik:\n{(m.get('content') or m.get('snippet') or '')[:4000]}"
+_DIGEST_SYSTEM = "Kısa ve aksiyon odaklı Türkçe bülten özetleyicisin."
+_NOTES_SYSTEM = "Bülten parçalarından Türkçe, madde işaretli, bilgi yoğun notlar çıkaran bir asistansın."
+# Mesaj başına üst sınır; asıl bölme işini map-reduce yapar, bu sadece aşırı uç durumları keser
+_MAX_MESSAGE_CHARS = 40000
+
+
+def _threads_text(messages) -> str:
+    return "\n\n".join([
+        f"---\nKonu: {m.get('subject','(yok)')}\nGönderen: {m.get('from','')}\nİçerik:\n{(m.get('content') or m.get('snippet') or '')[:_MAX_MESSAGE_CHARS]}"
         for m in messages
     ])
-    prompt = (
+
+
+def _digest_prompt(joined: str) -> str:
+    return (
         "Aşağıda farklı bülten e-postalarından parçalar var.\n"
         "Türkçe, 120-150 kelime, 3-6 madde işaretli özet yaz.\n"
         "Sonda 1-2 maddelik 'Eylem önerisi' ekle.\n\n"
         f"{joined}"
     )
+
+
+def _notes_prompt(part: str) -> str:
+    return (
+        "Aşağıdaki bülten parçalarındaki önemli bilgileri (kaynak/konu adıyla birlikte) "
+        "en fazla 8 kısa madde halinde çıkar. Sayıları, isimleri ve tarihleri koru.\n\n"
+        f"{part}"
+    )
+
+
+def _llm(system: str, prompt: str) -> str:
     # __call__ yerine invoke kullanıyoruz
-    resp = llm.invoke([SystemMessage(content="Kısa ve aksiyon odaklı Türkçe bülten özetleyicisin."),
-                       HumanMessage(content=prompt)])
+    resp = llm.invoke([SystemMessage(content=system), HumanMessage(content=prompt)])
     return resp.content.strip()
 
+
+async def _allm(system: str, prompt: str) -> str:
+    resp = await llm.ainvoke([SystemMessage(content=system), HumanMessage(content=prompt)])
+    return resp.content.strip()
+
+
+def summarize_threads_turkish(messages) -> str:
+    """
+    Bültenleri tek Türkçe özet haline getirir. Toplam metin tek çağrıya sığmıyorsa
+    paralel map-reduce kullanılır: parçalardan notlar → (gerekirse) notların birleştirilmesi → final özet.
+    """
+    return map_reduce(
+        _threads_text(messages),
+        map_fn=lambda part: _llm(_NOTES_SYSTEM, _notes_prompt(part)),
+        combine_fn=lambda parts: _llm(_NOTES_SYSTEM, _notes_prompt("\n\n".join(parts))),
+        reduce_fn=lambda parts: _llm(_DIGEST_SYSTEM, _digest_prompt("\n\n".join(parts))),
+    )
+
+
+async def asummarize_threads_turkish(messages) -> str:
+    """summarize_threads_turkish'in async karşılığı (event loop'u bloklamaz)."""
+    async def map_fn(part: str) -> str:
+        return await _allm(_NOTES_SYSTEM, _notes_prompt(part))
+
+    async def combine_fn(parts) -> str:
+        return await _allm(_NOTES_SYSTEM, _notes_prompt("\n\n".join(parts)))
+
+    async def reduce_fn(parts) -> str:
+        return await _allm(_DIGEST_SYSTEM, _digest_prompt("\n\n".join(parts)))
+
+    return await amap_reduce(_threads_text(messages), map_fn=map_fn, reduce_fn=reduce_fn, combine_fn=combine_fn)
+
 def _filter_for_summary(messages):
     filtered = []
     for m in messages:
@@ -224,7 +277,7 @@ async def summarize_gmail_and_send(target_email: str, limit=10, query=None):
     # 2) Özetle + sana e-posta olarak gönder
     tok = uuid.uuid4().hex[:8].upper()
     header = f"SOURCE=GMAIL_API\nSUMMARY_TOKEN={tok}\nITEMS={len(items)}\n"
-    summary = header + "\n" + summarize_threads_turkish(items)
+    summary = header + "\n" + await asummarize_threads_turkish(items)
     subject = f"[GMAIL][TEST {time.strftime('%H:%M:%S')}] {len(items)} mail · {tok}"
 
     print(">>> SUBJECT:", subject)
@@ -0,0 +1,111 @@
+# backend/bench/fallback_compare.py
+"""
+LLM'siz özet motorlarının gecikmesini karşılaştırır: keywords (eski pick_sentences
+sezgiseli) ↔ textrank (TF-IDF + TextRank, NumPy).
+
+Korpus: rastgele üretilmiş newsletter benzeri düzyazı (--synthetic N, --sentences),
+users.db / gmail_mirror.db gövdeleri (clean_text'ten geçirilir) ve --dir altındaki
+.html / .txt dosyaları. Her belge için build_fallbacks süresi ölçülür.
+
+Uygulama gibi backend/.env'i yükler (routes modülü import edilirken gerekir).
+Çalıştırma:  python -m backend.bench.fallback_compare --synthetic 200
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
+
+from backend.bench.text_clean_compare import from_databases
+from backend.routes.newsletters import build_fallbacks
+from backend.utils.text_clean import clean_text
+
+_SUBJECTS = "OpenAI Apple Nvidia The company Regulators Investors Researchers The startup Analysts Google".split(" ")
+_VERBS = "released announced raised reported launched delayed acquired warned expects confirmed".split()
+_OBJECTS = (
+    "a new model|its quarterly earnings|a funding round|a security update|new privacy rules|"
+    "a climate report|the chip market|an open source toolkit|a merger with a rival|price cuts"
+).split("|")
+_TAILS = (
+    "this week|after months of testing|according to people familiar with the matter|"
+    "despite market concerns|ahead of the holiday season|in a blog post on Tuesday|"
+    "as competition heats up|for enterprise customers"
+).split("|")
+_NOISE = ["Click here to unsubscribe.", "View in browser.", "Sponsored: try our app today.", "Thanks for reading!"]
+
+
+def synthetic_text(n: int, sentences: int, seed: int) -> Iterator[Tuple[str, str]]:
+    rng = random.Random(seed)
+    for i in range(n):
+        out: List[str] = []
+        for _ in range(rng.randint(max(1, sentences // 2), sentences * 2)):
+            if rng.random() < 0.05:
+                out.append(rng.choice(_NOISE))
+                continue
+            out.append(f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} {rng.choice(_TAILS)}.")
+        yield f"synthetic#{i}", " ".join(out)
+
+
+def from_dir(path: str) -> Iterator[Tuple[str, str]]:
+    for fp in sorted(glob.glob(os.path.join(path, "**", "*.*"), recursive=True)):
+        if not fp.endswith((".html", ".htm", ".txt")):
+            continue
+        with open(fp, "r", encoding="utf-8", errors="replace") as f:
+            yield fp, clean_text(f.read())
+
+
+def _latencies(docs: List[str], engine: str, repeat: int) -> List[float]:
+    out = []
+    for text in docs:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            build_fallbacks(text, engine)
+        out.append((time.perf_counter() - t0) / repeat * 1000)
+    return out
+
+
+def _report(name: str, lat: List[float]) -> None:
+    lat = sorted(lat)
+    p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+    print(f"{name:9s} mean {statistics.fmean(lat):7.2f} ms  p50 {statistics.median(lat):7.2f} ms  "
+          f"p95 {p95:7.2f} ms  max {lat[-1]:7.2f} ms")
+
+
+def main(argv: List[str] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--synthetic", type=int, default=200)
+    ap.add_argument("--sentences", type=int, default=60, help="sentetik belge başına ortalama cümle")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--dir", default="")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    corpus = list(synthetic_text(args.synthetic, args.sentences, args.seed))
+    corpus += [(name, clean_text(body)) for name, body in from_databases()]
+    if args.dir:
+        corpus += list(from_dir(args.dir))
+    docs = [text for _, text in corpus if text]
+    if not docs:
+        print("empty corpus")
+        return 1
+
+    build_fallbacks(docs[0], "textrank")  # NumPy ısınması
+    chars = sum(map(len, docs))
+    print(f"documents: {len(docs)}  (avg {chars / len(docs):.0f} chars)")
+    _report("keywords", _latencies(docs, "keywords", args.repeat))
+    _report("textrank", _latencies(docs, "textrank", args.repeat))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
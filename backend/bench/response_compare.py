@@ -0,0 +1,111 @@
+# backend/bench/response_compare.py
+"""
+Ağır JSON yanıtlarının serileştirme süresi ve kablodaki boyutu.
+
+Yükler: 12 kartlık /api/newsletters/featured yanıtı (_make_card ile) ve 500 satırlık
+GET /newsletters listesi (tam gövdeli ve fields=subject,sender,category,received_at
+projeksiyonlu). Serileştiriciler: FastAPI varsayılanı (jsonable_encoder + JSONResponse),
+yalnız JSONResponse ve ORJSONResponse. Boyutlar: ham, gzip, br (brotli kuruluysa).
+
+Uygulama gibi backend/.env'i yükler (routes modülü import edilirken gerekir).
+Çalıştırma:  python -m backend.bench.response_compare --repeat 50
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from backend.bench.fallback_compare import synthetic_text
+from backend.routes.newsletters import _make_card
+from backend.utils.compression import brotli, compress
+
+_SERIALIZERS: Dict[str, Callable[[Any], bytes]] = {
+    "fastapi": lambda c: JSONResponse(jsonable_encoder(c)).body,
+    "json": lambda c: JSONResponse(c).body,
+    "orjson": lambda c: ORJSONResponse(c).body,
+}
+
+
+def featured_payload(cards: int, seed: int) -> Dict[str, Any]:
+    texts = [t for _, t in synthetic_text(cards * 3, 40, seed)]
+    items = []
+    for i in range(cards):
+        long_summary = texts[3 * i][:1200]
+        teaser = texts[3 * i + 1][:240]
+        highlights = [s.strip() + "." for s in texts[3 * i + 2].split(".")[:4] if s.strip()]
+        items.append(_make_card(
+            i + 1, f"Sender {i}", f"news{i}@example.com", f"Weekly digest #{i}",
+            teaser, long_summary, highlights, "2025-01-0%dT08:00:00+00:00" % (i % 9 + 1), "Technology",
+        ))
+    return {"items": items, "snapshot": {"age_s": 12.5, "stale": False, "built_at": 1735718400.0}}
+
+
+def newsletter_rows(n: int, seed: int, with_body: bool) -> List[Dict[str, Any]]:
+    rows = []
+    for i, (_, body) in enumerate(synthetic_text(n, 60, seed)):
+        row = {
+            "id": n - i,
+            "gmail_id": f"18c{i:013x}",
+            "subject": f"Weekly digest #{i}",
+            "sender": f"Sender {i % 40} <news{i % 40}@example.com>",
+            "category": None if i % 3 else "tech",
+            "received_at": "2025-01-01T08:00:00",
+        }
+        if with_body:
+            row["body"] = body
+        rows.append(row)
+    return rows
+
+
+def _ms(fn: Callable[[], Any], repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(runs)
+
+
+def report(name: str, payload: Any, repeat: int) -> None:
+    print(f"\n{name}")
+    for ser_name, ser in _SERIALIZERS.items():
+        print(f"  {ser_name:8s} serialize {_ms(lambda: ser(payload), repeat):8.2f} ms")
+    body = ORJSONResponse(payload).body
+    print(f"  {'raw':8s} {len(body):>10,d} B")
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    for enc in encodings:
+        size = len(compress(body, enc))
+        t = _ms(lambda: compress(body, enc), max(1, repeat // 5))
+        print(f"  {enc:8s} {size:>10,d} B  ({size / len(body):5.1%})  compress {t:7.2f} ms")
+    if brotli is None:
+        print("  br       (brotli kurulu değil)")
+
+
+def main(argv: List[str] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--cards", type=int, default=12)
+    ap.add_argument("--rows", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--repeat", type=int, default=30)
+    args = ap.parse_args(argv)
+
+    report(f"featured ({args.cards} kart)", featured_payload(args.cards, args.seed), args.repeat)
+    report(f"newsletters ({args.rows} satır, body)", newsletter_rows(args.rows, args.seed, True), args.repeat)
+    report(f"newsletters ({args.rows} satır, fields projeksiyonu)",
+           newsletter_rows(args.rows, args.seed, False), args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
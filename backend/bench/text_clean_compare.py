@@ -0,0 +1,177 @@
+# backend/bench/text_clean_compare.py
+"""
+clean_text motorlarını karşılaştırır: fast (tek geçiş) ↔ bs4 (referans).
+
+Korpus:
+- elle yazılmış kenar durumları (iç içe bloklar, entity'ler, void etiketler, yorumlar…)
+- rastgele üretilmiş newsletter benzeri HTML'ler (--synthetic N, --seed)
+- users.db newsletter gövdeleri ve gmail_mirror.db mesajları (varsa)
+- --dir altındaki .html / .htm dosyaları
+
+Her girdi için iki çıktı birebir aynı olmalı; farklar ve süreler raporlanır.
+Çalıştırma:  python -m backend.bench.text_clean_compare --synthetic 500
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import random
+import sqlite3
+import sys
+import time
+from typing import Iterator, List, Tuple
+
+from backend.config.paths import DATA_DIR
+from backend.utils import text_clean
+
+EDGE_CASES = [
+    "<p>a<p>b unsubscribe</p>c</p>d",
+    "<br><br/>x<b>y</b> unsubscribe",
+    "<td>A<!-- unsubscribe -->B</td><td>C</td>",
+    "<template><p>t</p></template><rt>r</rt><p>z</p>",
+    "<div><b>unsubscribe</b> x <i>unsubscribe</i></div>y",
+    "<div>x<p>unsubscribe</p><p>sponsored</p></div><p>y</p>",
+    "<p>z</p><div>x<span>Unsubscribe</span> ad: <b>k</b></div>t",
+    "<p>a &amp; b &nbsp; &#147;q&#148; &bogus; &#x41;</p>",
+    "<div>unsubscribe<b>unsubscribe</b></div>y",
+    "<div>a</div>Unsubscribe here <b>x</b>",
+    "<html><body>Manage preferences<p>keep</p></body></html>",
+    "<!DOCTYPE html><html><head><title>T</title><style>p{}</style></head><body><p>x</p></body></html>",
+    "<p>a<![CDATA[ raw <b> ]]>b</p><template><![CDATA[cd]]></template>",
+    "<?xml version='1.0'?><p>pi</p><!ELEMENT x>",
+    "<noscript><p>unsubscribe</p></noscript><p>ok</p><script>var s='unsubscribe';</script>",
+    "<table><tr><td>Read in browser</td></tr><tr><td><a href='https://x.y/z?utm=1'>Story</a> https://a.b/c</td></tr></table>",
+    "<div>open</div></span></div><p>after</p>",
+    "<p>unclosed <b>bold <i>italic",
+    "<img src=x><br></br><hr/><p>x</p>",
+    "<ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>",
+    "plain < text > with brackets unsubscribe",
+    "<p>&#0; &#xD800; &#99999999; &#128;</p>",
+    "<div>In partnership with <b>Acme</b></div><div>Monday, news</div><p>Aug 3, 2024 — hi</p>",
+    "<p>x</p><div",
+]
+
+_WORDS = (
+    "market ai startup model data cloud chip energy policy research launch funding "
+    "week update team product growth open source security climate health"
+).split()
+_UNSUB = [p.title() if i % 2 else p for i, p in enumerate(text_clean._UNSUB_PATTERNS)]
+_BLOCKS = ["div", "p", "td", "span", "b", "a", "section", "li", "font", "center"]
+
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(_WORDS, k=rng.randint(3, 14))
+    if rng.random() < 0.08:
+        words.insert(rng.randint(0, len(words)), rng.choice(_UNSUB))
+    if rng.random() < 0.05:
+        words.append(rng.choice(["&amp;", "&nbsp;", "&#8217;", "&copy;", "&zz;", "https://t.co/x?u=1"]))
+    return " ".join(words)
+
+
+def _node(rng: random.Random, depth: int) -> str:
+    r = rng.random()
+    if depth > 6 or r < 0.35:
+        return _sentence(rng)
+    if r < 0.40:
+        return rng.choice(["<br>", "<br/>", "<img src='x'>", "<hr>", "</br>"])
+    if r < 0.43:
+        return f"<!-- {_sentence(rng)} -->"
+    if r < 0.45:
+        return f"<style>.x{{}}</style><script>var a='{_sentence(rng)}';</script>"
+    if r < 0.47:
+        return f"<noscript>{_sentence(rng)}</noscript>"
+    tag = rng.choice(_BLOCKS)
+    inner = "".join(_node(rng, depth + 1) for _ in range(rng.randint(1, 4)))
+    # arada bir kapanmamış / fazladan kapanan etiket
+    close = "" if rng.random() < 0.05 else f"</{tag}>"
+    if rng.random() < 0.03:
+        close += f"</{rng.choice(_BLOCKS)}>"
+    return f"<{tag}>{inner}{close}"
+
+
+def synthetic(n: int, seed: int) -> Iterator[Tuple[str, str]]:
+    rng = random.Random(seed)
+    for i in range(n):
+        body = "".join(_node(rng, 0) for _ in range(rng.randint(3, 40)))
+        yield f"synthetic#{i}", f"<html><body><table><tr><td>{body}</td></tr></table></body></html>"
+
+
+def from_databases() -> Iterator[Tuple[str, str]]:
+    sources = [
+        (os.path.join(DATA_DIR, "users.db"), "SELECT id, body FROM newsletter"),
+        (os.path.join(DATA_DIR, "gmail_mirror.db"), "SELECT id, body FROM messages"),
+    ]
+    for path, sql in sources:
+        if not os.path.exists(path):
+            continue
+        try:
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            rows = conn.execute(sql).fetchall()
+            conn.close()
+        except sqlite3.Error:
+            continue
+        for rid, body in rows:
+            if body:
+                yield f"{os.path.basename(path)}#{rid}", body
+
+
+def from_dir(path: str) -> Iterator[Tuple[str, str]]:
+    for fp in sorted(glob.glob(os.path.join(path, "**", "*.htm*"), recursive=True)):
+        with open(fp, "r", encoding="utf-8", errors="replace") as f:
+            yield fp, f.read()
+
+
+def _timed(fn, arg) -> Tuple[object, float]:
+    t0 = time.perf_counter()
+    try:
+        out = fn(arg)
+    except Exception as e:  # referans motorun hatası da rapora girer
+        out = e
+    return out, time.perf_counter() - t0
+
+
+def main(argv: List[str] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--synthetic", type=int, default=300)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--dir", default="")
+    ap.add_argument("--show", type=int, default=5, help="gösterilecek fark sayısı")
+    args = ap.parse_args(argv)
+
+    corpus = [(f"edge#{i}", h) for i, h in enumerate(EDGE_CASES)]
+    corpus += list(synthetic(args.synthetic, args.seed))
+    corpus += list(from_databases())
+    if args.dir:
+        corpus += list(from_dir(args.dir))
+
+    fast = lambda h: text_clean.clean_text(h, engine="fast")
+    ref = lambda h: text_clean.clean_text(h, engine="bs4")
+
+    t_fast = t_ref = 0.0
+    mismatches, ref_errors = [], 0
+    size = 0
+    for name, html in corpus:
+        size += len(html)
+        a, ta = _timed(fast, html)
+        b, tb = _timed(ref, html)
+        t_fast += ta
+        t_ref += tb
+        if isinstance(b, Exception):
+            ref_errors += 1
+            continue
+        if a != b:
+            mismatches.append((name, a, b))
+
+    print(f"documents: {len(corpus)}  ({size / 1024:.0f} KiB)")
+    print(f"bs4 : {t_ref * 1000:9.1f} ms")
+    print(f"fast: {t_fast * 1000:9.1f} ms  (x{t_ref / max(t_fast, 1e-9):.1f})")
+    print(f"reference errors (skipped): {ref_errors}")
+    print(f"mismatches: {len(mismatches)}")
+    for name, a, b in mismatches[: args.show]:
+        print(f"--- {name}\n fast: {a!r}\n bs4 : {b!r}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
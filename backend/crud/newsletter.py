@@ -0,0 +1,357 @@
+# backend/crud/newsletter.py
+"""
+`newsletter` tablosu için tam metin arama (SQLite FTS5).
+
+- newsletter_fts: subject/sender/body üzerinde external-content FTS5 tablosu
+  (metin ikinci kez saklanmaz, rowid = newsletter.id).
+- INSERT/UPDATE/DELETE tetikleyicileri indeksi tabloyla senkron tutar.
+- İlk kurulumda mevcut satırlar 'rebuild' ile indekslenir.
+- Arama bm25 ile sıralanır (subject > sender > body ağırlıklı) ve gövdeden snippet döner.
+
+SQLite FTS5 olmadan derlenmişse arama SQL'de LIKE ile yapılır (LIMIT'ten önce).
+
+Toplu içe aktarma (upsert_newsletters):
+- gmail_id üzerinde UNIQUE indeks (kurulumda varsa eski kopya satırlar temizlenir),
+  content_hash sütunu (yoksa eklenir).
+- Batch'in mevcut hash'leri tek IN sorgusuyla okunur; değişmemiş satırlar hiç
+  yazılmaz, kalanlar executemany ile `INSERT ... ON CONFLICT(gmail_id) DO UPDATE`.
+- Yazılan her satırın temiz içerik SimHash'i `fingerprint` sütununda, bantları
+  newsletter_fp_bands tablosunda tutulur. Yakın kopyalar da saklanır; yalnız
+  `duplicate_of` ilk görülen satırın gmail_id'sini gösterir (batch'ler arası da).
+  Bant araması satır başına ~n/32 aday okur (bkz. backend/nlp/simhash.py): tam
+  taramadan ucuz ama tablo büyüdükçe doğrusal artar.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from backend.nlp.simhash import (
+    BAND_BITS, SIMHASH_MAX_DISTANCE, SimHashIndex, bands, from_signed, hamming, simhash, to_signed,
+)
+from backend.utils.text_clean import clean_text
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "newsletter_fts"
+# bm25 sütun ağırlıkları: subject, sender, body
+_BM25_WEIGHTS = (5.0, 2.0, 1.0)
+_SNIPPET_TOKENS = 24
+
+_TOKEN_RE = re.compile(r"\w+", re.U)
+
+_fts_available = False
+
+# Liste/arama yanıtında seçilebilen sütunlar (fields projeksiyonu); id her zaman döner
+NEWSLETTER_COLUMNS = ("id", "gmail_id", "subject", "sender", "body", "category", "received_at", "duplicate_of")
+
+# executemany / IN sorgusu başına satır (SQLite değişken sınırının altında)
+_UPSERT_BATCH = 500
+_HASHED_FIELDS = ("subject", "sender", "body", "category", "received_at")
+
+_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        subject, sender, body,
+        content='newsletter', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS newsletter_fts_ai AFTER INSERT ON newsletter BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, subject, sender, body)
+        VALUES (new.id, new.subject, new.sender, new.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS newsletter_fts_ad AFTER DELETE ON newsletter BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, subject, sender, body)
+        VALUES ('delete', old.id, old.subject, old.sender, old.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS newsletter_fts_au AFTER UPDATE OF subject, sender, body ON newsletter BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, subject, sender, body)
+        VALUES ('delete', old.id, old.subject, old.sender, old.body);
+        INSERT INTO {FTS_TABLE}(rowid, subject, sender, body)
+        VALUES (new.id, new.subject, new.sender, new.body);
+    END
+    """,
+]
+
+
+def ensure_newsletter_fts(engine: Engine) -> bool:
+    """FTS tablosunu + tetikleyicileri kurar; tablo yeni oluştuysa mevcut satırları indeksler."""
+    global _fts_available
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"), {"n": FTS_TABLE}
+            ).first()
+            if not exists:
+                conn.execute(text(_DDL[0]))
+            for ddl in _DDL[1:]:
+                conn.execute(text(ddl))
+            if not exists:
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+                logger.info("newsletter FTS index built")
+        _fts_available = True
+    except OperationalError as e:
+        logger.warning("FTS5 unavailable, newsletter search falls back to LIKE: %s", e)
+        _fts_available = False
+    return _fts_available
+
+
+def rebuild_newsletter_fts(engine: Engine) -> None:
+    """İndeksi tablodan baştan kurar (elle/toplu değişikliklerden sonra)."""
+    with engine.begin() as conn:
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def fts_query(q: str) -> str:
+    """
+    Kullanıcı metnini güvenli bir FTS5 sorgusuna çevirir: her kelime tırnaklı terim
+    (operatör/sözdizimi hatası olmaz), hepsi AND; son kelime önek olarak eşleşir.
+    """
+    tokens = _TOKEN_RE.findall(q or "")
+    if not tokens:
+        return ""
+    terms = [f'"{t}"' for t in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _like_pattern(q: str) -> str:
+    return "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def parse_fields(fields: Optional[str]) -> Sequence[str]:
+    """
+    "subject,sender" → ("id", "subject", "sender"); boşsa tüm sütunlar.
+    Bilinmeyen alan ValueError.
+    """
+    if not fields or not fields.strip():
+        return NEWSLETTER_COLUMNS
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = wanted.difference(NEWSLETTER_COLUMNS)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(c for c in NEWSLETTER_COLUMNS if c == "id" or c in wanted)
+
+
+def list_newsletter_page(
+    conn: Connection,
+    category: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = 50,
+    columns: Sequence[str] = NEWSLETTER_COLUMNS,
+) -> List[Dict[str, Any]]:
+    """
+    En yeniden eskiye (id azalan) bir sayfa. Keyset: cursor = önceki sayfanın son id'si,
+    `id < cursor` birincil anahtar üzerinden aranır → derin sayfalar ilk sayfa kadar ucuz.
+    """
+    where, params = [], {"limit": limit}
+    if category:
+        where.append("category = :category")
+        params["category"] = category
+    if cursor is not None:
+        where.append("id < :cursor")
+        params["cursor"] = cursor
+    sql = (
+        f"SELECT {', '.join(columns)} FROM newsletter"
+        + (f" WHERE {' AND '.join(where)}" if where else "")
+        + " ORDER BY id DESC LIMIT :limit"
+    )
+    return [dict(r) for r in conn.execute(text(sql), params).mappings()]
+
+
+def get_newsletter_body(conn: Connection, newsletter_id: int) -> Optional[str]:
+    row = conn.execute(text("SELECT body FROM newsletter WHERE id = :id"), {"id": newsletter_id}).first()
+    return row[0] if row else None
+
+
+def search_newsletters(
+    conn: Connection,
+    q: str,
+    category: Optional[str] = None,
+    limit: int = 50,
+    columns: Sequence[str] = NEWSLETTER_COLUMNS,
+) -> List[Dict[str, Any]]:
+    """q ile eşleşen bültenler, en alakalı önce; her satırda `snippet` ve `score` (bm25, küçük = iyi)."""
+    if not _fts_available:
+        sql = (
+            f"SELECT {', '.join(columns)} FROM newsletter "
+            "WHERE (subject LIKE :p ESCAPE '\\' OR body LIKE :p ESCAPE '\\')"
+            + (" AND category = :category" if category else "")
+            + " ORDER BY id DESC LIMIT :limit"
+        )
+        rows = conn.execute(text(sql), {"p": _like_pattern(q), "category": category, "limit": limit}).mappings()
+        return [dict(r) for r in rows]
+
+    match = fts_query(q)
+    if not match:
+        return []
+    w = ", ".join(str(x) for x in _BM25_WEIGHTS)
+    sql = (
+        f"SELECT {', '.join('n.' + c for c in columns)}, "
+        f"snippet({FTS_TABLE}, 2, '<mark>', '</mark>', '…', {_SNIPPET_TOKENS}) AS snippet, "
+        f"bm25({FTS_TABLE}, {w}) AS score "
+        f"FROM {FTS_TABLE} JOIN newsletter n ON n.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH :match"
+        + (" AND n.category = :category" if category else "")
+        + " ORDER BY score LIMIT :limit"
+    )
+    rows = conn.execute(text(sql), {"match": match, "category": category, "limit": limit}).mappings()
+    return [dict(r) for r in rows]
+
+
+# ---------- toplu içe aktarma ----------
+def ensure_newsletter_schema(engine: Engine) -> None:
+    """
+    content_hash / fingerprint / duplicate_of sütunlarını ekler, gmail_id kopyalarını
+    temizler (ilk satır kalır) ve gmail_id üzerine UNIQUE indeks kurar.
+    Tekrar çalıştırmak zararsızdır.
+    """
+    with engine.begin() as conn:
+        cols = {r[1] for r in conn.execute(text("PRAGMA table_info(newsletter)"))}
+        # eski satırlarda NULL kalır → ilk içe aktarmada bir kez güncellenirler
+        for name, ddl in (("content_hash", "VARCHAR"), ("fingerprint", "INTEGER"), ("duplicate_of", "VARCHAR")):
+            if name not in cols:
+                conn.execute(text(f"ALTER TABLE newsletter ADD COLUMN {name} {ddl}"))
+        has_unique = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_newsletter_gmail_id'")
+        ).first()
+        if not has_unique:
+            removed = conn.execute(
+                text("DELETE FROM newsletter WHERE id NOT IN (SELECT MIN(id) FROM newsletter GROUP BY gmail_id)")
+            ).rowcount
+            if removed:
+                logger.info("removed %d duplicate newsletter rows before adding unique gmail_id", removed)
+            conn.execute(text("CREATE UNIQUE INDEX ux_newsletter_gmail_id ON newsletter (gmail_id)"))
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS newsletter_fp_bands ("
+            "band INTEGER NOT NULL, gmail_id VARCHAR NOT NULL, PRIMARY KEY (band, gmail_id)) WITHOUT ROWID"
+        ))
+
+
+def newsletter_hash(item: Mapping[str, Any]) -> str:
+    """İçe aktarılan alanların sha256'sı (gelen haliyle; received_at boşsa boş sayılır)."""
+    raw = "\x1f".join(str(item.get(f) or "") for f in _HASHED_FIELDS)
+    return hashlib.sha256(raw.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def _band_keys(fp: int) -> List[int]:
+    return [(i << BAND_BITS) | b for i, b in enumerate(bands(fp))]
+
+
+def _find_stored_duplicate(conn: Connection, fp: int, gmail_id: str) -> Optional[str]:
+    """Daha önce yazılmış, kopya olmayan ve fp'ye yakın bir satırın gmail_id'si."""
+    keys = _band_keys(fp)
+    rows = conn.execute(
+        text(
+            "SELECT DISTINCT n.gmail_id, n.fingerprint, n.id FROM newsletter_fp_bands b "
+            "JOIN newsletter n ON n.gmail_id = b.gmail_id "
+            f"WHERE b.band IN ({', '.join(str(k) for k in keys)}) "
+            "AND n.duplicate_of IS NULL AND n.fingerprint IS NOT NULL AND n.gmail_id != :g"
+        ),
+        {"g": gmail_id},
+    ).all()
+    best = min(
+        ((hamming(fp, from_signed(v)), i, g) for g, v, i in rows),
+        default=None,
+    )
+    return best[2] if best and best[0] <= SIMHASH_MAX_DISTANCE else None
+
+
+_UPSERT_SQL = text(
+    """
+    INSERT INTO newsletter
+        (gmail_id, subject, sender, body, category, received_at, content_hash, fingerprint, duplicate_of)
+    VALUES
+        (:gmail_id, :subject, :sender, :body, :category, COALESCE(:received_at, :now), :content_hash,
+         :fingerprint, :duplicate_of)
+    ON CONFLICT(gmail_id) DO UPDATE SET
+        subject = excluded.subject,
+        sender = excluded.sender,
+        body = excluded.body,
+        category = excluded.category,
+        received_at = COALESCE(:received_at, newsletter.received_at),
+        content_hash = excluded.content_hash,
+        fingerprint = excluded.fingerprint,
+        duplicate_of = excluded.duplicate_of
+    WHERE newsletter.content_hash IS NOT excluded.content_hash
+    """
+)
+
+
+def _chunks(seq: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def upsert_newsletters(engine: Engine, items: Iterable[Mapping[str, Any]]) -> Dict[str, int]:
+    """
+    Bültenleri gmail_id'ye göre ekler/günceller; içeriği değişmeyenlere dokunmaz.
+    Aynı gmail_id batch'te birden çok kez geçerse sonuncusu geçerlidir.
+    Yazılan satırların parmak izi çıkarılır (clean_text + simhash; senkron, CPU işi →
+    async çağıranlar thread'de çalıştırmalı) ve yakın kopyalar `duplicate_of` alır.
+    DÖNÜŞ: {"inserted", "updated", "unchanged", "duplicates"}
+    """
+    now = datetime.utcnow().isoformat()
+    rows: Dict[str, Dict[str, Any]] = {}
+    for it in items:
+        row = {f: it.get(f) for f in _HASHED_FIELDS}
+        row["gmail_id"] = it.get("gmail_id")
+        row["content_hash"] = newsletter_hash(row)
+        row["now"] = now
+        rows[row["gmail_id"]] = row
+
+    inserted = updated = unchanged = duplicates = 0
+    seen = SimHashIndex()  # bu çağrıda yazılan (kopya olmayan) satırlar
+    with engine.begin() as conn:
+        for batch in _chunks(list(rows.values()), _UPSERT_BATCH):
+            params = {f"g{i}": r["gmail_id"] for i, r in enumerate(batch)}
+            stored = {
+                g: (h, dup) for g, h, dup in conn.execute(
+                    text(f"SELECT gmail_id, content_hash, duplicate_of FROM newsletter WHERE gmail_id IN "
+                         f"({', '.join(':' + k for k in params)})"),
+                    params,
+                ).all()
+            }
+            todo, bands_rows = [], []
+            for r in batch:
+                prev = stored.get(r["gmail_id"])
+                if prev is not None and prev[0] == r["content_hash"]:
+                    unchanged += 1
+                    duplicates += prev[1] is not None
+                    continue
+                if prev is None:
+                    inserted += 1
+                else:
+                    updated += 1
+                fp = simhash(clean_text(r["body"] or ""))
+                leader = None
+                if fp is not None:
+                    leader = seen.find(fp) or _find_stored_duplicate(conn, fp, r["gmail_id"])
+                    if leader is None:
+                        seen.add(fp, r["gmail_id"])
+                    bands_rows += [{"band": k, "g": r["gmail_id"]} for k in _band_keys(fp)]
+                duplicates += leader is not None
+                r["fingerprint"] = to_signed(fp) if fp is not None else None
+                r["duplicate_of"] = leader
+                todo.append(r)
+            if todo:
+                conn.execute(_UPSERT_SQL, todo)
+            if bands_rows:
+                conn.execute(
+                    text("INSERT OR IGNORE INTO newsletter_fp_bands (band, gmail_id) VALUES (:band, :g)"),
+                    bands_rows,
+                )
+    return {"inserted": inserted, "updated": updated, "unchanged": unchanged, "duplicates": duplicates}
@@ -1,5 +1,6 @@
 # backend/main.py
 import os
+import asyncio
 from datetime import datetime,  timedelta
 from pathlib import Path
 from typing import List, Optional
@@ -12,13 +13,14 @@ load_dotenv(dotenv_path=Path(__file__).parent / ".env")
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr
 
 from backend.config.database import Base, engine as sa_engine
-from sqlmodel import SQLModel, Field, Session, select
+from sqlmodel import SQLModel, Field
 from .routes import newsletters
 from backend.routes.summarize_api import router as summarize_router
+from backend.utils.compression import CompressionMiddleware
 
 app = FastAPI(title="Newsly Backend", debug=True)
 
@@ -29,7 +31,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # GET /newsletters sayfalama imleci: başka origin'deki tarayıcı istemcisi okuyabilsin
+    expose_headers=["X-Next-Cursor"],
 )
+# büyük JSON/HTML yanıtları Accept-Encoding'e göre br/gzip (akışlı yanıtlar hariç)
+app.add_middleware(CompressionMiddleware)
 
 # Routerlar – SADECE BURADA include et
 from backend.routes import auth
@@ -51,6 +57,11 @@ class Newsletter(SQLModel, table=True):
     body: str
     category: Optional[str] = Field(default=None, index=True)
     received_at: Optional[str] = None
+    # içe aktarılan alanların hash'i (değişmeyen satır yeniden yazılmaz)
+    content_hash: Optional[str] = None
+    # temiz içerik SimHash'i (işaretli 64 bit) ve yakın kopyası olduğu satırın gmail_id'si
+    fingerprint: Optional[int] = None
+    duplicate_of: Optional[str] = None
 
 # ENV
 NEWSLY_API_KEY = os.getenv("NEWSLY_API_KEY", "dev-key")
@@ -60,30 +71,118 @@ NEWSLY_GMAIL_QUERY = os.getenv(
     'in:anywhere newer_than:30d from:me subject:"[SEED]" -subject:"[GMAIL]"'
 )
 
-from backend.summarizer.summarizer import summarize_file, summarize_url, summarize_text_with_openai
+from backend.summarizer.summarizer import (
+    asummarize_file, asummarize_url, asummarize_text_with_openai, aclose_async_client,
+    astream_summary, extract_text_from_pdf, fetch_url_text,
+)
+from backend.utils.pdf_text import shutdown_pdf_pool
+from backend.nlp.local_labeler import local_labeler
+from backend.crud.newsletter import (
+    ensure_newsletter_fts, ensure_newsletter_schema, get_newsletter_body, list_newsletter_page, parse_fields,
+    search_newsletters, upsert_newsletters,
+)
 from backend.agents.email_agent import gmail_send, summarize_gmail_and_send
 
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=sa_engine)
     SQLModel.metadata.create_all(sa_engine)
+    ensure_newsletter_schema(sa_engine)
+    ensure_newsletter_fts(sa_engine)
+
+@app.on_event("startup")
+def start_gmail_mirror():
+    # ilk (tam) senkron okuma yolunda değil, arka planda
+    from backend.utils.gmail_mirror import MIRROR_ENABLED, get_mirror
+    if MIRROR_ENABLED:
+        get_mirror().start_background_sync()
+
+@app.on_event("startup")
+async def start_featured_refresher():
+    # featured kartlarını arka planda periyodik üret (UI/agent snapshot'ı okur)
+    newsletters.featured_refresher.start()
+
+@app.on_event("shutdown")
+async def stop_featured_refresher():
+    await newsletters.featured_refresher.stop()
+    await aclose_async_client()
+    shutdown_pdf_pool()
+    local_labeler.save()
+
+# Yükleme sınırı: Content-Length büyükse gövde hiç okunmadan 413
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+_MULTIPART_OVERHEAD = 64 * 1024  # form alanları + boundary payı
+
+@app.middleware("http")
+async def limit_summarize_upload(request: Request, call_next):
+    if request.method == "POST" and request.url.path == "/summarize":
+        length = request.headers.get("content-length")
+        if length and length.isdigit() and int(length) > MAX_UPLOAD_BYTES + _MULTIPART_OVERHEAD:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Dosya çok büyük (üst sınır {MAX_UPLOAD_BYTES / (1024 * 1024):.1f} MB)."},
+            )
+    return await call_next(request)
+
+async def _read_upload(file: UploadFile) -> bytes:
+    """
+    Yüklemeyi parça parça okur (Starlette dosyayı zaten diske spool'lar);
+    sınır aşılırsa okumayı bırakıp 413 döner.
+    """
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Dosya çok büyük.")
+    buf = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        buf += chunk
+        if len(buf) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Dosya çok büyük.")
+    return bytes(buf)
+
+async def _stream_text(text: str):
+    # istemci ilk token'ı final çağrısı başlar başlamaz görür
+    try:
+        async for token in astream_summary(text):
+            yield token
+    except Exception as e:
+        yield f"\n[özetleme hatası: {e}]"
 
 @app.post("/summarize")
 async def summarize_api(
     file: UploadFile = File(None),
     content: str = Form(None),
-    url: str = Form(None)
+    url: str = Form(None),
+    stream: bool = Form(False),
 ):
     try:
         if file:
-            file_bytes = await file.read()
-            return {"summary": summarize_file(file_bytes, file.filename)}
+            file_bytes = await _read_upload(file)
+            if not stream:
+                return {"summary": await asummarize_file(file_bytes, file.filename)}
+            text = await asyncio.to_thread(extract_text_from_pdf, file_bytes)
+            del file_bytes
+            if not text or len(text.strip()) < 50:
+                return {"summary": "PDF içeriği okunamadı ya da çok kısa görünüyor."}
         elif url:
-            return {"summary": summarize_url(url)}
+            if not stream:
+                return {"summary": await asummarize_url(url)}
+            text = await asyncio.to_thread(fetch_url_text, url) or f"Bu sayfa için özet üret: {url}"
         elif content:
-            return {"summary": summarize_text_with_openai(content)}
+            if not stream:
+                return {"summary": await asummarize_text_with_openai(content)}
+            text = content
         else:
             raise HTTPException(status_code=400, detail="No content, file or url provided.")
+        return StreamingResponse(
+            _stream_text(text),
+            media_type="text/plain; charset=utf-8",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -119,53 +218,48 @@ class ImportPayload(BaseModel):
 async def import_newsletters(payload: ImportPayload, x_api_key: str = Header(None)):
     _auth(x_api_key)
     try:
-        with Session(sa_engine) as s:
-            inserted = 0
-            for it in payload.items:
-                exists = s.exec(select(Newsletter).where(Newsletter.gmail_id == it.gmail_id)).first()
-                if exists:
-                    exists.subject = it.subject
-                    exists.sender = it.sender
-                    exists.body = it.body
-                    exists.category = it.category
-                    exists.received_at = it.received_at
-                else:
-                    s.add(Newsletter(
-                        gmail_id=it.gmail_id,
-                        subject=it.subject,
-                        sender=it.sender,
-                        body=it.body,
-                        category=it.category,
-                        received_at=it.received_at or datetime.utcnow().isoformat()
-                    ))
-                    inserted += 1
-            s.commit()
-        return {"status": "ok", "inserted": inserted}
+        # clean_text + simhash + SQLite yazımı CPU/IO işi → event loop dışında
+        counts = await asyncio.to_thread(upsert_newsletters, sa_engine, [it.model_dump() for it in payload.items])
+        return {"status": "ok", **counts}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/newsletters")
-async def list_newsletters(category: Optional[str] = None, q: Optional[str] = None, limit: int = 50):
+@app.get("/newsletters", response_class=ORJSONResponse)
+async def list_newsletters(
+    category: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = None,
+    fields: Optional[str] = None,
+):
+    """
+    q verilirse tam metin arama (FTS5, bm25 sıralı, `snippet` + `score`); yoksa en yeniler.
+    - cursor: önceki sayfanın `X-Next-Cursor` başlığı (keyset, id azalan; aramada yok sayılır)
+    - fields: virgülle sütunlar (ör. `subject,sender,received_at`), gövde için
+      GET /newsletters/{id}/body
+    """
     try:
-        with Session(sa_engine) as s:
-            stmt = select(Newsletter).order_by(Newsletter.id.desc()).limit(limit)
-            if category:
-                stmt = stmt.where(Newsletter.category == category)
-            rows = s.exec(stmt).all()
-        if q:
-            rows = [r for r in rows if (q.lower() in r.subject.lower()) or (q.lower() in (r.body or "").lower())]
-        return [{
-            "id": r.id,
-            "gmail_id": r.gmail_id,
-            "subject": r.subject,
-            "sender": r.sender,
-            "body": r.body,
-            "category": r.category,
-            "received_at": r.received_at
-        } for r in rows]
+        columns = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        with sa_engine.connect() as conn:
+            if q and q.strip():
+                return ORJSONResponse(search_newsletters(conn, q, category=category, limit=limit, columns=columns))
+            rows = list_newsletter_page(conn, category=category, cursor=cursor, limit=limit, columns=columns)
+        headers = {"X-Next-Cursor": str(rows[-1]["id"])} if len(rows) == limit else None
+        return ORJSONResponse(rows, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/newsletters/{newsletter_id}/body")
+async def get_newsletter_body_api(newsletter_id: int):
+    with sa_engine.connect() as conn:
+        body = get_newsletter_body(conn, newsletter_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Newsletter not found")
+    return {"id": newsletter_id, "body": body}
+
 SUBSCRIBERS_FILE = os.path.join(os.path.dirname(__file__), "data", "subscribers.txt")
 
 @app.post("/subscribe-news")
@@ -1,5 +1,7 @@
 # backend/mcp/server.py
 import os, json, asyncio, websockets, base64
+import threading
+from datetime import datetime, timedelta
 from typing import Dict, Any, List
 from pathlib import Path
 from dotenv import load_dotenv
@@ -7,6 +9,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Google API
+from google.auth.exceptions import RefreshError
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -21,6 +24,15 @@ SCOPES: List[str] = os.getenv(
 CLIENT_SECRET_FILE = os.environ["GOOGLE_CLIENT_SECRET_FILE"]
 TOKEN_FILE = os.environ.get("GOOGLE_TOKEN_FILE", "./data/token.json")
 
+# Token süresi dolmadan bu kadar saniye önce yenile
+REFRESH_AHEAD_S = float(os.environ.get("GMAIL_TOKEN_REFRESH_AHEAD_S", "300"))
+
+# Süreç içi cache: her tool çağrısında token.json okuma / build() maliyeti olmasın
+_CREDS: Credentials | None = None
+_SERVICE = None
+_SERVICE_CREDS: Credentials | None = None
+_LOCK = threading.RLock()
+
 def _ensure_dirs():
     token_dir = os.path.dirname(TOKEN_FILE) or "."
     Path(token_dir).mkdir(parents=True, exist_ok=True)
@@ -34,39 +46,73 @@ def _load_creds() -> Credentials | None:
     return None
 
 def _save_creds(creds: Credentials) -> None:
+    # atomik yazım: yarım kalmış token.json bırakma
     _ensure_dirs()
-    with open(TOKEN_FILE, "w", encoding="utf-8") as f:
+    tmp = f"{TOKEN_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
         f.write(creds.to_json())
+    os.replace(tmp, TOKEN_FILE)
+
+def _fresh_enough(creds: Credentials | None) -> bool:
+    if not creds or not creds.valid:
+        return False
+    if creds.expiry is None:
+        return True
+    return creds.expiry - datetime.utcnow() >= timedelta(seconds=REFRESH_AHEAD_S)
 
 def _authorize_if_needed() -> Credentials:
     """
     Desktop app akışı:
+    - bellekteki token geçerliyse (ve yakında dolmayacaksa) kullan
     - token varsa ve geçerliyse kullan
-    - expired ise refresh et
+    - expired ise (ya da dolmak üzereyse) refresh et; erken refresh başarısızsa
+      hâlâ geçerli token'la devam et
     - yoksa tarayıcı açıp yeni yetki al
     """
-    creds = _load_creds()
-    if creds and creds.valid:
-        return creds
-
-    if creds and creds.expired and creds.refresh_token:
-        try:
-            creds.refresh(Request())
-            _save_creds(creds)
+    global _CREDS
+    if _fresh_enough(_CREDS):
+        return _CREDS
+
+    with _LOCK:
+        creds = _CREDS or _load_creds()
+        if _fresh_enough(creds):
+            _CREDS = creds
             return creds
-        except Exception:
-            # refresh başarısızsa sıfırdan yetkilendir
-            creds = None
 
-    # İlk kez/yeniden yetkilendirme
-    flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRET_FILE, SCOPES)
-    # port=0 → uygun boş portu seçer; tarayıcıyı otomatik açar
-    creds = flow.run_local_server(port=0, access_type="offline", prompt="consent")
-    _save_creds(creds)
-    return creds
+        if creds and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+                _save_creds(creds)
+                _CREDS = creds
+                return creds
+            except Exception as e:
+                if creds.valid:
+                    # erken yenileme başarısız ama token hâlâ geçerli: onunla devam,
+                    # bir sonraki çağrıda yeniden denenir
+                    print(f"⚠️ Gmail token erken yenilenemedi, mevcut token kullanılıyor: {e}")
+                    _CREDS = creds
+                    return creds
+                if not isinstance(e, RefreshError) or getattr(e, "retryable", False):
+                    raise  # geçici hata (ağ vb.): tarayıcı akışına düşme
+                # refresh token iptal edilmiş → sıfırdan yetkilendir
+                creds = None
+
+        # İlk kez/yeniden yetkilendirme
+        flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRET_FILE, SCOPES)
+        # port=0 → uygun boş portu seçer; tarayıcıyı otomatik açar
+        creds = flow.run_local_server(port=0, access_type="offline", prompt="consent")
+        _save_creds(creds)
+        _CREDS = creds
+        return creds
 
 def _gmail(creds: Credentials):
-    return build("gmail", "v1", credentials=creds, cache_discovery=False)
+    """Aynı Credentials için servisi bir kez kur (refresh yerinde olduğu için yeniden kurmaya gerek yok)."""
+    global _SERVICE, _SERVICE_CREDS
+    with _LOCK:
+        if _SERVICE is None or _SERVICE_CREDS is not creds:
+            _SERVICE = build("gmail", "v1", credentials=creds, cache_discovery=False)
+            _SERVICE_CREDS = creds
+        return _SERVICE
 
 # ---------- Tools ----------
 
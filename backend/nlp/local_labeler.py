@@ -0,0 +1,220 @@
+# backend/nlp/local_labeler.py
+"""
+Yerel konu etiketleyici: hashing TF-IDF + en yakın merkez (nearest centroid), NumPy.
+
+- Özellikler: başlık (2 kat ağırlık) + gövdenin ilk LOCAL_LABELER_BODY_CHARS karakteri,
+  kelimeler crc32 ile LOCAL_LABELER_DIM boyutlu uzaya hash'lenir (sözlük tutulmaz),
+  log-TF, L2 normalize.
+- Model: her etiket için normalize vektörlerin toplamı (merkez) + belge sayısı; IDF
+  belge frekanslarından tahmin anında uygulanır. Tahmin seyrek: yalnız belgenin
+  dolu boyutları okunur (etiket sayısı × ~yüzlerce çarpım).
+- Öğrenme çevrimiçi: LLM'in (ya da combined kart çağrısının) ürettiği her etiket
+  learn() ile modele eklenir; model DATA_DIR altına atomik olarak (npz) kaydedilir.
+- predict() güveni (en yakın merkezle kosinüs) LOCAL_LABELER_MIN_CONFIDENCE altındaysa
+  ya da model henüz LOCAL_LABELER_MIN_DOCS belge görmediyse None döner → LLM'e düşülür.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import string
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.config.paths import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+LOCAL_LABELER_PATH = os.getenv("LOCAL_LABELER_PATH", os.path.join(DATA_DIR, "local_labeler.npz"))
+LOCAL_LABELER_MIN_CONFIDENCE = float(os.getenv("LOCAL_LABELER_MIN_CONFIDENCE", "0.35"))
+LOCAL_LABELER_MIN_DOCS = int(os.getenv("LOCAL_LABELER_MIN_DOCS", "30"))
+LOCAL_LABELER_MAX_LABELS = int(os.getenv("LOCAL_LABELER_MAX_LABELS", "256"))
+LOCAL_LABELER_BODY_CHARS = 2000
+LOCAL_LABELER_DIM = 1 << 14
+# Her öğrenmede değil, bu kadar öğrenmede bir diske yaz (kapanışta da yazılır)
+_SAVE_EVERY = 10
+_MODEL_VERSION = 1
+
+# regex yerine translate + split: 2 KB metinde ~5 kat hızlı
+_SEPARATORS = str.maketrans({c: " " for c in string.punctuation + string.digits + "“”‘’…–—«»•·"})
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in (text or "").lower().translate(_SEPARATORS).split() if len(w) > 1]
+
+
+def _features(subject: str, body: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(boyut indeksleri, L2 normalize log-TF değerleri); boş metinde boş diziler."""
+    counts = Counter(_words((body or "")[:LOCAL_LABELER_BODY_CHARS]))
+    for w in _words(subject):
+        counts[w] += 2
+    if not counts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    hashed = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in counts), dtype=np.int64, count=len(counts))
+    idx, inv = np.unique(hashed & (LOCAL_LABELER_DIM - 1), return_inverse=True)
+    tf = np.bincount(inv, weights=np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+    vals = (1.0 + np.log(tf)).astype(np.float32)
+    vals /= np.linalg.norm(vals)
+    return idx, vals
+
+
+class LocalLabeler:
+    """Thread-safe; tahmin/öğrenme aynı kilitle korunur."""
+
+    def __init__(self, path: str = LOCAL_LABELER_PATH, min_confidence: float = LOCAL_LABELER_MIN_CONFIDENCE):
+        self.path = path
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self.labels: List[str] = []
+        self._label_ix: Dict[str, int] = {}
+        self._sums = np.zeros((0, LOCAL_LABELER_DIM), dtype=np.float32)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._df = np.zeros(LOCAL_LABELER_DIM, dtype=np.float32)
+        self.n_docs = 0
+        self._norms: Optional[np.ndarray] = None  # IDF ağırlıklı merkez normları (öğrenmede sıfırlanır)
+        self._idf: Optional[np.ndarray] = None
+        self._unsaved = 0
+        self._seen: set = set()  # öğrenilmiş örneklerin crc32'si (aynı e-posta iki kez sayılmasın)
+        # istatistik
+        self.predictions = 0
+        self.local_hits = 0
+        self.llm_fallbacks = 0
+        self.local_time_s = 0.0
+        self.llm_time_s = 0.0
+        self._load()
+
+    # ---------- kalıcılık ----------
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as z:
+                if int(z["version"]) != _MODEL_VERSION or z["sums"].shape[1] != LOCAL_LABELER_DIM:
+                    return
+                self.labels = [str(x) for x in z["labels"]]
+                self._sums = z["sums"].astype(np.float32)
+                self._counts = z["counts"].astype(np.int64)
+                self._df = z["df"].astype(np.float32)
+                self.n_docs = int(z["n_docs"])
+                self._seen = set(int(x) for x in z["seen"])
+            self._label_ix = {lab: i for i, lab in enumerate(self.labels)}
+        except Exception as e:
+            logger.warning("local labeler model unreadable (%s): %s", self.path, e)
+
+    def save(self) -> None:
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self) -> None:
+        if not self._unsaved:
+            return
+        tmp = f"{self.path}.{os.getpid()}.tmp.npz"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            np.savez(
+                tmp,
+                version=np.int64(_MODEL_VERSION),
+                labels=np.array(self.labels, dtype=str),
+                sums=self._sums,
+                counts=self._counts,
+                df=self._df,
+                n_docs=np.int64(self.n_docs),
+                seen=np.fromiter(self._seen, dtype=np.uint32, count=len(self._seen)),
+            )
+            os.replace(tmp, self.path)
+            self._unsaved = 0
+        except OSError as e:
+            logger.warning("local labeler save failed (%s): %s", self.path, e)
+
+    # ---------- öğrenme ----------
+    def learn(self, subject: str, body: str, label: str) -> bool:
+        """Etiketli bir örneği modele ekler; etiket kapasitesi doluysa yeni etiket eklenmez."""
+        label = (label or "").strip()
+        if not label or label == "General":
+            return False
+        idx, vals = _features(subject, body)
+        if not len(idx):
+            return False
+        sig = zlib.crc32("\x1f".join([label, subject or "", (body or "")[:LOCAL_LABELER_BODY_CHARS]]).encode("utf-8"))
+        with self._lock:
+            if sig in self._seen:
+                return False
+            li = self._label_ix.get(label)
+            if li is None:
+                if len(self.labels) >= LOCAL_LABELER_MAX_LABELS:
+                    return False
+                li = len(self.labels)
+                self.labels.append(label)
+                self._label_ix[label] = li
+                self._sums = np.vstack([self._sums, np.zeros((1, LOCAL_LABELER_DIM), dtype=np.float32)])
+                self._counts = np.append(self._counts, 0)
+            self._sums[li, idx] += vals
+            self._counts[li] += 1
+            self._seen.add(sig)
+            self._df[idx] += 1.0
+            self.n_docs += 1
+            self._norms = self._idf = None
+            self._unsaved += 1
+            if self._unsaved >= _SAVE_EVERY:
+                self._save_locked()
+        return True
+
+    # ---------- tahmin ----------
+    def _prepare_locked(self) -> None:
+        if self._idf is None:
+            self._idf = (np.log((1.0 + self.n_docs) / (1.0 + self._df)) + 1.0).astype(np.float32)
+        if self._norms is None:
+            norms = np.sqrt(((self._sums * self._idf) ** 2).sum(axis=1))
+            norms[norms == 0] = 1.0
+            self._norms = norms
+
+    def predict(self, subject: str, body: str) -> Tuple[Optional[str], float]:
+        """(etiket, güven); güven eşiğin altındaysa ya da model hazır değilse etiket None."""
+        t0 = time.perf_counter()
+        idx, vals = _features(subject, body)
+        label, conf = None, 0.0
+        with self._lock:
+            if len(idx) and self.labels and self.n_docs >= LOCAL_LABELER_MIN_DOCS:
+                self._prepare_locked()
+                w = self._idf[idx]
+                q = vals * w
+                qn = float(np.linalg.norm(q))
+                if qn > 0:
+                    # kosinüs(q, merkez∘idf): yalnız q'nun dolu boyutları
+                    sims = (self._sums[:, idx] @ (q * w)) / (self._norms * qn)
+                    best = int(np.argmax(sims))
+                    conf = float(sims[best])
+                    if conf >= self.min_confidence:
+                        label = self.labels[best]
+            self.predictions += 1
+            self.local_time_s += time.perf_counter() - t0
+            if label is not None:
+                self.local_hits += 1
+        return label, conf
+
+    def record_llm(self, seconds: float) -> None:
+        with self._lock:
+            self.llm_fallbacks += 1
+            self.llm_time_s += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            predictions = self.predictions
+            return {
+                "labels": len(self.labels),
+                "trained_docs": self.n_docs,
+                "min_confidence": self.min_confidence,
+                "local_hits": self.local_hits,
+                "llm_fallbacks": self.llm_fallbacks,
+                "llm_fallback_rate": round(self.llm_fallbacks / predictions, 4) if predictions else None,
+                "avg_local_us": round(self.local_time_s / predictions * 1e6, 1) if predictions else None,
+                "avg_llm_ms": round(self.llm_time_s / self.llm_fallbacks * 1e3, 1) if self.llm_fallbacks else None,
+            }
+
+
+local_labeler = LocalLabeler()
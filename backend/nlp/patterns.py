@@ -0,0 +1,97 @@
+# backend/nlp/patterns.py
+"""
+Çoklu alt-dizi eşleyici: "metinde şu kalıplardan biri/kaçı geçiyor?" sorusu için.
+
+`any(p in s for p in ...)` ve `sum(1 for p in ... if p in s)` ile birebir aynı
+sonucu verir. Büyük kümeler import sırasında tek bir trie-regex'e derlenir
+(ortak önekler tek dalda birleşir); metin tek geçişte taranır ve kalıp eklemek
+eşleşmeyi doğrusal yavaşlatmaz. Küçük kümelerde (REGEX_MIN_PATTERNS altı)
+C'deki `in` taraması regex'ten hızlı olduğundan o kullanılır.
+
+Kalıp kümeleri dile göre tanımlanır ({"en": [...], "tr": [...]}); hangi dillerin
+etkin olduğu PATTERN_LANGS ile seçilir (varsayılan "en,tr").
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+PATTERN_LANGS = [x.strip().lower() for x in os.getenv("PATTERN_LANGS", "en,tr").split(",") if x.strip()]
+# ~100 kalıba kadar tek tek `in` (C hızında) trie-regex'ten hızlı (160 karakterlik cümlelerde ölçüldü)
+REGEX_MIN_PATTERNS = 96
+
+
+def _trie_regex(patterns: Iterable[str]) -> str:
+    trie: dict = {}
+    for p in patterns:
+        node = trie
+        for ch in p:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(ch) + emit(sub) for ch, sub in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # kalıp burada bitiyor ama daha uzunu da var → açgözlü '?' uzun olanı tercih eder
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class PatternSet:
+    """Derlenmiş kalıp kümesi. Metin çağıran tarafından (gerekirse) küçük harfe çevrilmiş olmalı."""
+
+    def __init__(self, patterns: Iterable[str], regex_min: int = REGEX_MIN_PATTERNS):
+        self.patterns: List[str] = list(dict.fromkeys(p for p in patterns if p))
+        self._any = self._all = None
+        if self.patterns and len(self.patterns) >= regex_min:
+            rx = _trie_regex(self.patterns)
+            self._any = re.compile(rx)
+            # her konumdaki en uzun eşleşme; örtüşenler de bulunur
+            self._all = re.compile(f"(?=({rx}))")
+        # bir kalıp eşleşince, onun içinde geçen diğer kalıplar da metinde vardır
+        self._implied: Dict[str, FrozenSet[str]] = {
+            p: frozenset(q for q in self.patterns if q in p) for p in self.patterns
+        }
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def search(self, text: str) -> bool:
+        """any(p in text for p in patterns)"""
+        if self._any is None:
+            for p in self.patterns:
+                if p in text:
+                    return True
+            return False
+        return self._any.search(text) is not None
+
+    def found(self, text: str) -> Set[str]:
+        """Metinde geçen kalıpların kümesi."""
+        if self._all is None:
+            return {p for p in self.patterns if p in text}
+        out: Set[str] = set()
+        for m in self._all.finditer(text):
+            hit = m.group(1)
+            if hit not in out:
+                out |= self._implied[hit]
+        return out
+
+    def count(self, text: str) -> int:
+        """sum(1 for p in patterns if p in text)"""
+        if self._all is None:
+            n = 0
+            for p in self.patterns:
+                if p in text:
+                    n += 1
+            return n
+        return len(self.found(text))
+
+
+def build_pattern_set(by_lang: Dict[str, List[str]], langs: Optional[Iterable[str]] = None) -> PatternSet:
+    """Seçili dillerin kalıplarını (verilen sırayla) tek bir PatternSet'te toplar."""
+    langs = PATTERN_LANGS if langs is None else langs
+    return PatternSet(p for lang in langs for p in by_lang.get(lang, []))
@@ -0,0 +1,97 @@
+# backend/nlp/textrank.py
+"""
+LLM'siz çıkarımsal özet için TextRank (NumPy).
+
+1) Cümleler kelimelere ayrılır (küçük harf, EN/TR stopword'ler atılır).
+2) TF-IDF matrisi kurulur, satırlar L2 normalize edilir → benzerlik = X @ X.T (kosinüs).
+3) Benzerlik grafında power-iteration ile PageRank skorları hesaplanır.
+
+Ağ çağrısı yok; birkaç yüz cümlelik bir bülten milisaniyeler içinde puanlanır.
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_MAX_ITER = 100
+TEXTRANK_TOL = 1e-6
+# Çok uzun gövdelerde grafı sınırla (n² bellek); kalan cümleler 0 puan alır
+TEXTRANK_MAX_SENTENCES = int(os.getenv("TEXTRANK_MAX_SENTENCES", "400"))
+
+_WORD_RE = re.compile(r"\w+", re.U)
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by can for from has have he her his i if in into is it its
+    me more my no not of on or our she so than that the their them then there these they this
+    to up us was we were what when which who will with would you your about after all also
+    just new one out over said says how get like
+    ve ile bir bu şu o da de ki mi mu için gibi daha çok en ama fakat ancak veya ya hem
+    olarak olan oldu olduğu kadar sonra önce her şey biz siz onlar ben sen ne nasıl neden
+    """.split()
+)
+
+
+def _tokens(sentence: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(sentence.lower()) if len(w) > 1 and w not in _STOPWORDS]
+
+
+def tfidf_matrix(sentences: Sequence[str]) -> np.ndarray:
+    """Satırları L2 normalize edilmiş (n_cümle × n_kelime) TF-IDF matrisi."""
+    vocab: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for i, s in enumerate(sentences):
+        for w in _tokens(s):
+            rows.append(i)
+            cols.append(vocab.setdefault(w, len(vocab)))
+    n = len(sentences)
+    x = np.zeros((n, max(1, len(vocab))), dtype=np.float32)
+    if rows:
+        np.add.at(x, (np.asarray(rows), np.asarray(cols)), 1.0)
+        df = np.count_nonzero(x, axis=0)
+        x *= (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)  # smooth idf
+        norms = np.linalg.norm(x, axis=1, keepdims=True)
+        np.divide(x, norms, out=x, where=norms > 0)
+    return x
+
+
+def textrank_scores(
+    sentences: Sequence[str],
+    damping: float = TEXTRANK_DAMPING,
+    max_iter: int = TEXTRANK_MAX_ITER,
+    tol: float = TEXTRANK_TOL,
+) -> np.ndarray:
+    """Her cümle için TextRank skoru; TEXTRANK_MAX_SENTENCES sonrası cümleler 0 alır."""
+    if len(sentences) > TEXTRANK_MAX_SENTENCES > 0:
+        head = textrank_scores(sentences[:TEXTRANK_MAX_SENTENCES], damping, max_iter, tol)
+        return np.concatenate([head, np.zeros(len(sentences) - len(head))])
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0, dtype=np.float64)
+    if n == 1:
+        return np.ones(1, dtype=np.float64)
+
+    x = tfidf_matrix(sentences)
+    sim = (x @ x.T).astype(np.float64)
+    np.fill_diagonal(sim, 0.0)
+
+    # satır-stokastik geçiş matrisi; bağlantısız cümle herkese eşit dağıtır
+    out_deg = sim.sum(axis=1, keepdims=True)
+    dangling = out_deg[:, 0] == 0
+    trans = np.divide(sim, out_deg, out=np.zeros_like(sim), where=out_deg > 0)
+    trans[dangling] = 1.0 / n
+
+    rank = np.full(n, 1.0 / n)
+    teleport = (1.0 - damping) / n
+    trans_t = trans.T.copy()
+    for _ in range(max_iter):
+        nxt = teleport + damping * (trans_t @ rank)
+        if np.abs(nxt - rank).sum() < tol:
+            rank = nxt
+            break
+        rank = nxt
+    return rank
@@ -1,7 +1,11 @@
-import os, re
+import os, re, time
 from typing import Dict, Any
 from openai import OpenAI
 
+from backend.summarizer.cache import summary_cache
+from backend.nlp.local_labeler import local_labeler
+from backend.summarizer.singleflight import llm_flight, request_key
+
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")  # senin dediğin mini
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
@@ -10,6 +14,7 @@ SYSTEM = (
     "Return ONLY 1–2 words, Title Case, no punctuation, no emojis. "
     "Examples: 'Trump', 'OpenAI', 'US Politics', 'Instagram', 'AI Policy'."
 )
+LABEL_PROMPT_VERSION = "label-v1"
 
 def _fallback_label(subject: str, body: str) -> str:
     # Basit yedek: subject içinden özel isim/marka yakala
@@ -22,27 +27,44 @@ def _fallback_label(subject: str, body: str) -> str:
     # Hiçbir şey yoksa:
     return "General"
 
-def label_newsletter(subject: str, body: str) -> str:
+def normalize_label(raw: str) -> str:
+    """Model çıktısını etikete çevirir: sadece harf/rakam/boşluk, en fazla 2 kelime, Title Case."""
+    out = re.sub(r"[^A-Za-z0-9ÇĞİÖŞÜçğıöşü\s\-]", "", raw or "").strip()
+    words = out.split()
+    if not words:
+        return ""
+    return " ".join(words[:2]).title()[:30]
+
+def label_newsletter(subject: str, body: str, message_id: str = "") -> str:
+    """
+    Önce cache, sonra yerel sınıflandırıcı (local_labeler); yerel güven eşiğin
+    altındaysa LLM çağrılır ve üretilen etiket yerel modele öğretilir.
+    """
     text = f"SUBJECT: {subject}\n\nBODY:\n{body[:6000]}"
+    cached = summary_cache.get(message_id, text, OPENAI_MODEL, LABEL_PROMPT_VERSION, near_dup=True)
+    if cached and cached.get("label"):
+        return cached["label"]
+    local, _ = local_labeler.predict(subject, body)
+    if local:
+        return local
+    t0 = time.perf_counter()
     try:
-        resp = client.responses.create(
-            model=OPENAI_MODEL,
-            input=[
-                {"role": "system", "content": SYSTEM},
-                {"role": "user", "content": text},
-            ],
-            temperature=0.2,
+        messages = [
+            {"role": "system", "content": SYSTEM},
+            {"role": "user", "content": text},
+        ]
+        # Yeni Responses API: düz metni güvenli çek; aynı anda gelen aynı istekler tek çağrı
+        raw = llm_flight.do(
+            request_key(OPENAI_MODEL, messages, api="responses", temperature=0.2),
+            lambda: client.responses.create(model=OPENAI_MODEL, input=messages, temperature=0.2).output_text,
         )
-        # Yeni Responses API: düz metni güvenli çek
-        out = resp.output_text.strip()
-        # Normalize: sadece harf/rakam/boşluk
-        out = re.sub(r"[^A-Za-z0-9ÇĞİÖŞÜçğıöşü\s\-]", "", out).strip()
-        # En fazla 2 kelime
-        words = out.split()
-        if not words:
+        label = normalize_label(raw)
+        if not label:
             return _fallback_label(subject, body)
-        label = " ".join(words[:2])
-        # Title Case
-        return label.title()[:30]
+        summary_cache.put(message_id, text, OPENAI_MODEL, LABEL_PROMPT_VERSION, {"label": label}, near_dup=True)
+        local_labeler.learn(subject, body, label)
+        return label
     except Exception:
         return _fallback_label(subject, body)
+    finally:
+        local_labeler.record_llm(time.perf_counter() - t0)
@@ -7,43 +7,73 @@ import logging
 import traceback
 import re
 import asyncio
-from typing import Any, Dict, List, Optional
+import heapq
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
 IST = ZoneInfo("Europe/Istanbul")
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 
 from backend.nlp.topic_labeler import label_newsletter
+from backend.nlp.local_labeler import local_labeler
+from backend.nlp.patterns import build_pattern_set
+from backend.nlp.textrank import textrank_scores
+from backend.nlp.simhash import SimHashIndex, simhash
 from backend.config.paths import SAVE_PATH, DATA_DIR
 from backend.utils.gmail_scan import (
     scan_candidates,
-    fetch_latest_email_content_for_sender,
+    fetch_latest_email_for_sender,
+    fetch_latest_emails_for_senders,
 )
 from backend.utils.text_clean import clean_text
-from backend.summarizer.summarizer import summarize_newsletter_tiered
+from backend.summarizer.summarizer import asummarize_newsletter_tiered, asummarize_newsletter_card
+from backend.summarizer.cache import summary_cache
+from backend.summarizer.singleflight import llm_flight
+from backend.utils.featured_snapshot import (
+    FeaturedRefresher,
+    FeaturedSnapshotStore,
+    selection_hash,
+)
 
 router = APIRouter(prefix="/api/newsletters", tags=["newsletters"])
 logger = logging.getLogger(__name__)
 
 # ----------------- Yardımcılar -----------------
 
+# LLM'siz özet (fast mod + LLM hatası): textrank | keywords
+FALLBACK_ENGINE = os.getenv("FALLBACK_ENGINE", "textrank").lower()
+
 SENT_SPLIT = re.compile(r"(?<=[\.!?])\s+(?=[A-ZİIĞÜŞÖ0-9])", re.U)
 
 # İngilizce + Türkçe anahtarlar: ürün, kampanya, politika, araştırma vb.
-_KEYWORDS = [
-    # EN
-    "sale", "discount", "deal", "offer", "launch", "update", "policy",
-    "research", "report", "funding", "merger", "acquisition", "feature",
-    "security", "privacy", "climate", "economy", "market", "earnings",
-    # TR
-    "kampanya", "indirim", "fırsat", "duyuru", "güncelleme", "tasarı",
-    "yasa", "karar", "araştırma", "rapor", "yatırım", "fonlama",
-    "birleşme", "satın alma", "özellik", "güvenlik", "mahremiyet",
-    "iklim", "ekonomi", "piyasa", "kazanç",
-]
+_KEYWORDS_BY_LANG = {
+    "en": [
+        "sale", "discount", "deal", "offer", "launch", "update", "policy",
+        "research", "report", "funding", "merger", "acquisition", "feature",
+        "security", "privacy", "climate", "economy", "market", "earnings",
+    ],
+    "tr": [
+        "kampanya", "indirim", "fırsat", "duyuru", "güncelleme", "tasarı",
+        "yasa", "karar", "araştırma", "rapor", "yatırım", "fonlama",
+        "birleşme", "satın alma", "özellik", "güvenlik", "mahremiyet",
+        "iklim", "ekonomi", "piyasa", "kazanç",
+    ],
+}
+_KEYWORDS = build_pattern_set(_KEYWORDS_BY_LANG)
+
+# Özet cümlelerinden elenecek unsub/CTA ifadeleri
+_CTA_BY_LANG = {
+    "en": [
+        "unsubscribe", "view email in browser", "view in browser",
+        "manage preferences", "privacy policy", "contact us",
+        "in partnership with", "sponsored", "advertiser content",
+        "read in browser", "read on the web", "open in browser",
+    ],
+}
+_CTA = build_pattern_set(_CTA_BY_LANG)
 
 
 def _ensure_data_dir() -> None:
@@ -57,43 +87,68 @@ def _ensure_data_dir() -> None:
 def _score_sentence(sent: str) -> float:
     """Anahtar kelime + uzunluk puanı."""
     s = sent.lower()
-    kw = sum(1 for k in _KEYWORDS if k in s)
+    kw = _KEYWORDS.count(s)
     length_bonus = min(len(sent) / 120, 1.0)  # 120+ karaktere kadar bonus
     return kw * 2.0 + length_bonus
 
 
+class SegmentedDocument:
+    """
+    Metni bir kez cümlelere böler, unsub/CTA cümlelerini eler ve kalanları bir kez puanlar.
+    top(k, min_len) her boyutta seçimi tam sıralama yapmadan (heap) verir;
+    sıra ve [:80] tekilleştirmesi eski pick_sentences ile aynıdır.
+
+    engine: "keywords" → anahtar kelime + uzunluk puanı (_score_sentence),
+            "textrank" → TF-IDF kosinüs benzerliği üzerinde TextRank (NumPy, ağ yok).
+    """
+
+    __slots__ = ("sentences", "_ranked")
+
+    def __init__(self, txt: str, engine: str = "keywords"):
+        self.sentences = [p.strip() for p in SENT_SPLIT.split(txt or "") if p]
+        cands = [(i, c) for i, c in enumerate(self.sentences) if not _CTA.search(c.lower())]
+        if engine == "textrank":
+            cands = [(i, c) for i, c in cands if c]
+            scores = textrank_scores([c for _, c in cands]).tolist()
+        else:
+            scores = [_score_sentence(c) for _, c in cands]
+        # (-puan, sıra, cümle): eşit puanda metindeki sıra korunur
+        self._ranked = [(-sc, i, c) for sc, (i, c) in zip(scores, cands)]
+
+    def top(self, max_count: int, min_len: int = 40, in_order: bool = False) -> List[str]:
+        """En iyi max_count cümle; in_order=True ise seçilenler metindeki sırayla döner."""
+        heap = [r for r in self._ranked if len(r[2]) >= min_len]
+        heapq.heapify(heap)
+        picked: List[tuple] = []
+        seen: set = set()
+        while heap:
+            r = heapq.heappop(heap)
+            key = r[2][:80]
+            if key in seen:
+                continue
+            picked.append(r)
+            seen.add(key)
+            if len(picked) >= max_count:
+                break
+        if in_order:
+            picked.sort(key=lambda r: r[1])
+        return [r[2] for r in picked]
+
+
 def pick_sentences(txt: str, max_count: int, min_len: int = 40) -> List[str]:
     """Temiz metinden anlamlı cümle seçer; unsub/cta içerikleri eler."""
-    parts = [p.strip() for p in SENT_SPLIT.split(txt) if p and len(p.strip()) >= min_len]
-    cleaned = []
-    for p in parts:
-        low = p.lower()
-        if any(u in low for u in [
-            "unsubscribe", "view email in browser", "view in browser",
-            "manage preferences", "privacy policy", "contact us",
-            "in partnership with", "sponsored", "advertiser content",
-            "read in browser", "read on the web", "open in browser",
-        ]):
-            continue
-        cleaned.append(p)
-    cleaned.sort(key=_score_sentence, reverse=True)
-    out: List[str] = []
-    seen: set = set()
-    for c in cleaned:
-        key = c[:80]
-        if key in seen:
-            continue
-        out.append(c)
-        seen.add(key)
-        if len(out) >= max_count:
-            break
-    return out
-
-
-def build_fallbacks(clean_content: str):
-    """Highlights(3–4), Teaser(=highlights birleşimi), Long(15–20) üretir."""
-    highlights = pick_sentences(clean_content, 4, min_len=50)
-    long_sents = pick_sentences(clean_content, 20, min_len=40)
+    return SegmentedDocument(txt).top(max_count, min_len)
+
+
+def build_fallbacks(clean_content: str, engine: str = ""):
+    """
+    Highlights(3–4), Teaser(=highlights birleşimi), Long(15–20) üretir (LLM'siz).
+    textrank'ta long özet cümleleri metindeki sırayla dizilir.
+    """
+    engine = engine or FALLBACK_ENGINE
+    doc = SegmentedDocument(clean_content, engine)  # tek bölme + puanlama, iki seçim
+    highlights = doc.top(4, min_len=50)
+    long_sents = doc.top(20, min_len=40, in_order=engine == "textrank")
     teaser = " ".join(highlights) if highlights else (
         clean_content[:300] + "…" if len(clean_content) > 300 else clean_content
     )
@@ -113,6 +168,369 @@ def _safe_topic(name: str) -> str:
         return "Design"
     return "General"
 
+
+# ----------------- Featured kart üretimi -----------------
+
+# Ayarları biraz konservatif yapalım
+MAX_CARDS = 12
+MAX_CARDS_FAST = 5
+LOOKBACK_DAYS = 120
+PER_SENDER_TIMEOUT = 25.0  # saniye
+
+# Aynı anda işlenecek gönderici sayısı ve tüm istek için üst süre sınırı
+FEATURED_CONCURRENCY = int(os.getenv("FEATURED_CONCURRENCY", "4"))
+FEATURED_DEADLINE_S = float(os.getenv("FEATURED_DEADLINE_S", "180"))
+
+# combined → tüm göndericiler birkaç from:(a OR b ...) sorgusuyla tek seferde çekilir;
+# per_sender → her gönderici için ayrı list + get (eski davranış)
+FEATURED_FETCH_MODE = os.getenv("FEATURED_FETCH_MODE", "combined").lower()
+COMBINED_FETCH_TIMEOUT = 2 * PER_SENDER_TIMEOUT
+
+# combined → başlık/teaser/long/highlights/tag tek yapılandırılmış LLM çağrısında;
+# split → tiered özet + ayrı etiket çağrısı (eski davranış)
+FEATURED_CARD_MODE = os.getenv("FEATURED_CARD_MODE", "combined").lower()
+
+EPOCH_ISO = "1970-01-01T00:00:00Z"
+
+
+def _load_selected() -> List[Dict[str, Any]]:
+    """SAVE_PATH'teki seçili gönderici listesini döndürür (yoksa boş liste)."""
+    if not os.path.exists(SAVE_PATH):
+        return []
+    with open(SAVE_PATH, "r", encoding="utf-8") as f:
+        data = json.loads(f.read() or "{}")
+    selected = data.get("selected", [])
+    return selected if isinstance(selected, list) else []
+
+
+def _make_card(
+    i: int,
+    name: str,
+    sender: str,
+    title: str,
+    teaser: str,
+    long_summary: str,
+    highlights: List[str],
+    iso_date: str,
+    tag: str,
+) -> Dict[str, Any]:
+    """Kart sözlüğünü oluşturur; boş highlights ve is_today burada tamamlanır."""
+    # Highlights hâlâ boşsa, teaser/long_summary’dan üret
+    if not highlights:
+        highlights = [p.strip() for p in SENT_SPLIT.split(teaser or "") if p.strip()][:4]
+        if not highlights:
+            highlights = [p.strip() for p in SENT_SPLIT.split(long_summary or "") if p.strip()][:4]
+
+    # is_today’ı iso_date’e göre hesapla
+    is_today = False
+    try:
+        if iso_date and iso_date != EPOCH_ISO:
+            dt = datetime.fromisoformat(iso_date.replace("Z", "+00:00")).astimezone(IST)
+            is_today = dt.date() == datetime.now(IST).date()
+    except Exception:
+        is_today = False
+
+    topic = _safe_topic(f"{name} {sender}")
+    words = len((teaser + " " + long_summary).split())
+    minutes = max(1, words // 180)
+
+    return {
+        "id": i,
+        "title": title,
+        "topic": topic,
+        "minutes": minutes,
+        "tag": tag,
+        "description": teaser,
+        "teaser": teaser,
+        "long_summary": long_summary,
+        "highlights": highlights,
+        "sender": sender,
+        "date": iso_date or EPOCH_ISO,
+        "is_today": is_today,
+        "also_from": [],  # yakın-kopyası bu karta katlanan göndericiler
+    }
+
+
+def _fallback_card(i: int, it: Dict[str, Any], fast: int) -> Optional[Dict[str, Any]]:
+    """Süresi dolan ya da patlayan gönderici için içeriksiz kart (eski fallback ile aynı)."""
+    name = (it.get("name") or it.get("sender") or "Unknown").strip()
+    sender = (it.get("sender") or "").strip()
+    if not sender:
+        return None
+    teaser = f"Sender: {sender}" if fast else "No preview available."
+    return _make_card(i, name, sender, name, teaser, teaser, [], EPOCH_ISO, "General")
+
+
+async def _fetch_latest(sender: str, prefetched: Optional[Dict[str, Dict[str, str]]]) -> Dict[str, str]:
+    """
+    Önceden toplu çekilmiş sonuç varsa onu, yoksa tek gönderici sorgusunu (timeout'lu) kullanır.
+    Toplu sorgunun sayfa sınırı yüzünden çözemediği göndericiler prefetched'da yoktur → tekil sorgu.
+    """
+    if prefetched is not None and sender.lower() in prefetched:
+        return prefetched[sender.lower()]
+    return await asyncio.wait_for(
+        asyncio.to_thread(
+            fetch_latest_email_for_sender,
+            None,            # user_email (None → 'me')
+            sender,          # sender_email
+            LOOKBACK_DAYS,
+        ),
+        timeout=PER_SENDER_TIMEOUT,
+    )
+
+
+async def _prefetch_latest(selected: List[Dict[str, Any]]) -> Optional[Dict[str, Dict[str, str]]]:
+    """combined modda seçili göndericilerin son e-postalarını tek seferde çeker; hata → None."""
+    if FEATURED_FETCH_MODE != "combined":
+        return None
+    senders = [(it.get("sender") or "").strip() for it in selected]
+    senders = [s for s in senders if s]
+    if not senders:
+        return None
+    try:
+        return await asyncio.wait_for(
+            asyncio.to_thread(fetch_latest_emails_for_senders, None, senders, LOOKBACK_DAYS),
+            timeout=COMBINED_FETCH_TIMEOUT,
+        )
+    except Exception as e:
+        # tek tek çekmeye düş
+        logger.warning("combined Gmail fetch failed, falling back to per-sender: %s", e)
+        return None
+
+
+def _register_content(dedup: Optional[SimHashIndex], clean_content: str, also_from: List[str], name: str) -> bool:
+    """
+    Build içi yakın-kopya kontrolü. İçerik daha önce işlenen bir e-postanın yakın kopyasıysa
+    gönderici o kartın also_from listesine eklenir ve True döner (kart üretilmez);
+    değilse içerik bu kartın also_from listesiyle kaydedilir.
+    """
+    if dedup is None or not clean_content:
+        return False
+    fp = simhash(clean_content)
+    if fp is None:
+        return False
+    leader = dedup.find(fp)
+    if leader is not None:
+        leader.append(name)
+        return True
+    dedup.add(fp, also_from)
+    return False
+
+
+async def _build_card(
+    i: int,
+    it: Dict[str, Any],
+    fast: int,
+    prefetched: Optional[Dict[str, Dict[str, str]]] = None,
+    dedup: Optional[SimHashIndex] = None,
+    also_from: Optional[List[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Tek gönderici için: Gmail'den çek → temizle → özetle → etiketle. Bloklayan işler thread'de.
+    İçerik aynı build'deki başka bir e-postanın yakın kopyasıysa None (kart o e-postanınkine katlanır).
+    also_from: bu karta katlanan yakın-kopya göndericilerin listesi (çağıran verirse kart
+    hazır olmadan / fallback'e düşse de izlenebilir).
+    """
+    name = (it.get("name") or it.get("sender") or "Unknown").strip()
+    sender = (it.get("sender") or "").strip()
+    if not sender:
+        return None
+    if also_from is None:
+        also_from = []
+
+    # Ortak alanlar
+    iso_date = EPOCH_ISO
+    title = name
+    teaser = ""
+    long_summary = ""
+    highlights: List[str] = []
+    tag: str = ""            # combined kart modunda özetle birlikte gelir
+    clean_content: str = ""  # tag üretiminde de kullanacağız
+    message_id: str = ""     # özet/etiket cache anahtarı
+
+    if fast:
+        # FAST MODE: içerik çek + FALLBACK özet (çok hızlı)
+        try:
+            latest = await _fetch_latest(sender, prefetched)
+            content, iso_date, message_id = latest["content"], latest["iso_date"], latest["id"]
+            clean_content = clean_text(content or "")
+        except Exception:
+            clean_content = ""
+
+        if _register_content(dedup, clean_content, also_from, name):
+            logger.info("featured: %s is a near-duplicate, collapsed", sender)
+            return None
+
+        if clean_content:
+            teaser, long_summary, highlights = build_fallbacks(clean_content)
+        else:
+            teaser = f"Sender: {sender}"
+            long_summary = teaser
+            highlights = []
+
+    else:
+        # NORMAL MODE: Gmail’den içerik çekmeye çalış (timeout'lu ve thread offload)
+        content: str = ""
+        try:
+            logger.info("Fetching latest email for sender=%s", sender)
+            latest = await _fetch_latest(sender, prefetched)
+            content, iso_date, message_id = latest["content"], latest["iso_date"], latest["id"]
+            logger.info("Fetched OK for %s, len=%d", sender, len(content or ""))
+        except asyncio.TimeoutError:
+            logger.warning("Gmail fetch TIMEOUT for %s", sender)
+        except Exception as e:
+            logger.warning("Gmail fetch ERROR for %s: %s", sender, e)
+
+        # temizle
+        try:
+            clean_content = clean_text(content or "")
+        except Exception:
+            clean_content = content or ""
+
+        if not clean_content or len(clean_content) < 40:
+            clean_content = (content or "").strip()
+
+        if _register_content(dedup, clean_content, also_from, name):
+            logger.info("featured: %s is a near-duplicate, collapsed", sender)
+            return None
+
+        # özetle (combined: tek çağrıda kart + etiket; split: tiered)
+        if clean_content:
+            summarize = asummarize_newsletter_card if FEATURED_CARD_MODE == "combined" else asummarize_newsletter_tiered
+            try:
+                tiered = await summarize(
+                    clean_content,
+                    sender=name,
+                    date_iso=iso_date or "",
+                    message_id=message_id,
+                )
+                title = (tiered.get("title") or name).strip()
+                teaser = (tiered.get("teaser") or "").strip()
+                long_summary = (tiered.get("long") or "").strip()
+                highlights = (tiered.get("highlights") or [])[:4]
+                tag = (tiered.get("tag") or "").strip()
+                if tag:
+                    # combined kartın etiketi yerel etiketleyiciye örnek olur; learn kilit altında
+                    # matrisi büyütebilir / diske yazabilir → thread'de
+                    await asyncio.to_thread(local_labeler.learn, title, clean_content, tag)
+            except Exception as e:
+                logger.warning("%s failed for %s: %s", summarize.__name__, sender, e)
+
+        # Fallback garanti: LLM yoksa/patladıysa çıkarımsal özet
+        if not teaser and not long_summary:
+            if clean_content:
+                teaser, long_summary, highlights = build_fallbacks(clean_content)
+            else:
+                teaser = long_summary = "No preview available."
+
+    if not tag:
+        try:
+            tag = await asyncio.to_thread(
+                label_newsletter, title or "", (clean_content or teaser or long_summary or ""), message_id
+            )
+        except Exception:
+            tag = "General"
+
+    card = _make_card(i, name, sender, title, teaser, long_summary, highlights, iso_date, tag)
+    card["also_from"] = also_from
+    return card
+
+
+async def _iter_featured_cards(selected: List[Dict[str, Any]], fast: int):
+    """
+    Seçili göndericileri eşzamanlı işler ve kartları HAZIR OLDUKÇA (tamamlanma sırasıyla)
+    ("card", kart) olarak verir. Eşzamanlılık FEATURED_CONCURRENCY ile sınırlı;
+    FEATURED_DEADLINE_S dolunca kalan göndericiler iptal edilip fallback kartla döner.
+    İçeriği yakın kopya olan göndericiler ayrı kart üretmez (bkz. _register_content):
+    - katlandığı kart fallback'e düşerse de also_from o kartta kalır;
+    - kart zaten verildikten sonra katlanırsa aynı kart ("update", kart) olarak yeniden verilir.
+    """
+    limit = MAX_CARDS_FAST if fast else MAX_CARDS
+    sem = asyncio.Semaphore(max(1, FEATURED_CONCURRENCY))
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + FEATURED_DEADLINE_S
+
+    prefetched = await _prefetch_latest(selected[:limit])
+    dedup = SimHashIndex()  # bu build'de görülen içerikler (yakın kopyalar tek karta katlanır)
+    collapsed: Dict[int, List[str]] = {i: [] for i in range(len(selected[:limit]))}
+    sent: Dict[int, Tuple[Dict[str, Any], int]] = {}  # verilen kart + o andaki also_from uzunluğu
+
+    async def _run(i: int, it: Dict[str, Any]):
+        async with sem:
+            return await _build_card(i, it, fast, prefetched, dedup, collapsed[i])
+
+    def _fallback(i: int, it: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        card = _fallback_card(i, it, fast)
+        if card:
+            card["also_from"] = collapsed[i]
+        return card
+
+    def _emit(i: int, card: Dict[str, Any]):
+        sent[i] = (card, len(card["also_from"]))
+        return "card", card
+
+    def _late_updates():
+        for i, (card, n) in list(sent.items()):
+            if len(card["also_from"]) > n:
+                sent[i] = (card, len(card["also_from"]))
+                yield "update", card
+
+    tasks = {asyncio.create_task(_run(i, it)): (i, it) for i, it in enumerate(selected[:limit])}
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for t in done:
+                i, it = tasks[t]
+                try:
+                    card = t.result()
+                except Exception as e:
+                    logger.warning("featured card failed for %s: %s", it.get("sender"), e)
+                    card = _fallback(i, it)
+                if card:
+                    yield _emit(i, card)
+            for update in _late_updates():
+                yield update
+
+        for t in pending:
+            t.cancel()
+            i, it = tasks[t]
+            logger.warning("featured DEADLINE exceeded for %s", it.get("sender"))
+            card = _fallback(i, it)
+            if card:
+                yield _emit(i, card)
+    finally:
+        for t in pending:
+            t.cancel()
+
+async def _compute_featured(selected: List[Dict[str, Any]], fast: int) -> List[Dict[str, Any]]:
+    """Tüm kartları üretir; seçim sırasını koruyup en yeniyi üste alır."""
+    items: List[Dict[str, Any]] = []
+    async for event, card in _iter_featured_cards(selected, fast):
+        if event == "card":  # "update" aynı kart nesnesi, also_from'u zaten güncel
+            items.append(card)
+
+    # seçim sırasını koru, sonra en yeni üstte (sort stabil)
+    items.sort(key=lambda x: x["id"])
+    items.sort(key=lambda x: x["date"], reverse=True)
+    return items
+
+
+async def _build_snapshot():
+    """FeaturedRefresher için: güncel seçimle normal-mod kartları üretir."""
+    selected = _load_selected()
+    items = await _compute_featured(selected, fast=0) if selected else []
+    return items, selection_hash(selected)
+
+
+featured_store = FeaturedSnapshotStore()
+featured_refresher = FeaturedRefresher(_build_snapshot, featured_store)
+
 # ----------------- Endpoints -----------------
 
 
@@ -171,6 +589,9 @@ def save_selection(payload: Dict[str, Any]):
         with open(SAVE_PATH, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
 
+        # yeni seçimle kartları arka planda hemen yeniden üret
+        featured_refresher.trigger()
+
         return {"ok": True, "saved": len(cleaned), "path": SAVE_PATH}
     except HTTPException:
         raise
@@ -182,161 +603,155 @@ def save_selection(payload: Dict[str, Any]):
         )
 
 
-@router.get("/featured")
-async def get_featured(fast: int = 0):
+def _filter_to_selection(items: List[Dict[str, Any]], selected: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Göndericisi güncel seçimde olan kartlar (sıra korunur)."""
+    senders = {(it.get("sender") or "").strip().lower() for it in selected}
+    return [c for c in items if (c.get("sender") or "").strip().lower() in senders]
+
+
+@router.get("/featured", response_class=ORJSONResponse)
+async def get_featured(fast: int = 0, fresh: int = 0):
     """
     Ana sayfada gösterilecek kartları üretir.
     - fast=1 → Hızlı mod (ama yine de son e-postadan kısa özet üretir).
-    - fast=0 → Her seçili gönderici için son e-postayı getirip (timeout'lu) özet üretir.
+    - fast=0 → Arka planda üretilen son snapshot'ı hemen döner (`snapshot.age_s` ile yaşı).
+      Snapshot eski seçimle üretildiyse yalnız hâlâ seçili göndericilerin kartları döner
+      (`snapshot.selection_changed`).
+      Snapshot yoksa ya da fresh=1 ise kartlar şimdi üretilir ve snapshot güncellenir.
+    Göndericiler FEATURED_CONCURRENCY sınırıyla eşzamanlı işlenir; FEATURED_DEADLINE_S
+    dolduğunda bitmeyen göndericiler için fallback kart döner.
+    Yanıt doğrudan orjson ile yazılır (jsonable_encoder geçişi yok).
     """
     items: List[Dict[str, Any]] = []
     try:
         _ensure_data_dir()
-        if not os.path.exists(SAVE_PATH):
-            return {"items": []}
-
-        with open(SAVE_PATH, "r", encoding="utf-8") as f:
-            data = json.loads(f.read() or "{}")
-
-        selected = data.get("selected", [])
-        if not isinstance(selected, list) or not selected:
-            return {"items": []}
+        selected = _load_selected()
+        if not selected:
+            return ORJSONResponse({"items": []})
+
+        if fast:
+            items = await _compute_featured(selected, fast)
+            return ORJSONResponse({"items": items})
+
+        sel_hash = selection_hash(selected)
+        snap = featured_store.load()
+        if snap is None or fresh:
+            snap = await featured_refresher.refresh()
+        meta = FeaturedSnapshotStore.meta(snap, sel_hash)
+        if meta["stale"]:
+            featured_refresher.trigger()
+        items = snap["items"]
+        if snap.get("selection_hash") != sel_hash:
+            # seçim değişti, yeni snapshot henüz yok: seçimden çıkarılan göndericilerin
+            # kartları gösterilmez (yeni eklenenler arka plandaki build'le gelir)
+            items = _filter_to_selection(items, selected)
+            meta["selection_changed"] = True
+        return ORJSONResponse({"items": items, "snapshot": meta})
+    except Exception as e:
+        logger.exception("get_featured failed")
+        return ORJSONResponse({"items": items, "error": f"{type(e).__name__}: {e}"})
 
-        # Ayarları biraz konservatif yapalım
-        MAX_CARDS = 12
-        LOOKBACK_DAYS = 120
-        PER_SENDER_TIMEOUT = 25.0  # saniye
-        MAX_CARDS_FAST = 5
 
+def _stream_event(event: str, data: Dict[str, Any], fmt: str) -> str:
+    """Tek olayı SSE ya da NDJSON satırı olarak kodlar."""
+    if fmt == "sse":
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return json.dumps({"event": event, **data}, ensure_ascii=False) + "\n"
 
-        for i, it in enumerate(selected[: (MAX_CARDS_FAST if fast else MAX_CARDS)]):
 
-            name = (it.get("name") or it.get("sender") or "Unknown").strip()
-            sender = (it.get("sender") or "").strip()
-            if not sender:
-                continue
+@router.get("/featured/stream")
+async def stream_featured(fast: int = 0, fresh: int = 0, format: str = "ndjson"):
+    """
+    Kartları HAZIR OLDUKÇA gönderir (format=ndjson ya da format=sse).
+    - Her kart için: {"event": "card", "item": {...}}
+    - Verilmiş bir karta sonradan yakın-kopya gönderici katlanırsa:
+      {"event": "update", "item": {...}} (aynı id, güncel also_from)
+    - En sonda: {"event": "done", "order": [id, ...], "count": N, "snapshot": {...}}
+      `order`, /featured ile aynı sıralamadır (seçim sırası + en yeni üstte).
+    fast=0'da bayat olmayan bir snapshot varsa (ve fresh=0 ise) kartlar oradan gelir;
+    yoksa canlı üretilir ve bitince snapshot güncellenir.
+    """
+    fmt = "sse" if format == "sse" else "ndjson"
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+
+    async def _events():
+        items: List[Dict[str, Any]] = []
+        meta: Optional[Dict[str, Any]] = None
+        try:
+            _ensure_data_dir()
+            selected = _load_selected()
+            if selected:
+                snap = None if (fast or fresh) else featured_store.load()
+                if snap is not None:
+                    meta = FeaturedSnapshotStore.meta(snap, selection_hash(selected))
+                    if meta["stale"]:
+                        snap, meta = None, None
+                if snap is not None:
+                    for card in snap["items"]:
+                        items.append(card)
+                        yield _stream_event("card", {"item": card}, fmt)
+                else:
+                    async for event, card in _iter_featured_cards(selected, fast):
+                        if event == "card":
+                            items.append(card)
+                        yield _stream_event(event, {"item": card}, fmt)
+
+            ordered = sorted(items, key=lambda x: x["id"])
+            ordered.sort(key=lambda x: x["date"], reverse=True)
+            if selected and not fast and meta is None:
+                meta = FeaturedSnapshotStore.meta(featured_store.save(ordered, selection_hash(selected)))
+            yield _stream_event(
+                "done", {"order": [c["id"] for c in ordered], "count": len(ordered), "snapshot": meta}, fmt
+            )
+        except Exception as e:
+            logger.exception("stream_featured failed")
+            yield _stream_event("error", {"error": f"{type(e).__name__}: {e}"}, fmt)
+
+    return StreamingResponse(
+        _events(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-            # Ortak alanlar
-            iso_date = "1970-01-01T00:00:00Z"
-            title = name
-            teaser = ""
-            long_summary = ""
-            highlights: List[str] = []
-            clean_content: str = ""  # tag üretiminde de kullanacağız
 
-            # is_today (sonradan iso_date güncellenebilir)
-            is_today = False
+@router.post("/mirror/sync")
+def sync_gmail_mirror(full: int = 0):
+    """Yerel Gmail aynasını eşitler (full=1 → historyId'yi yok sayıp tam resync)."""
+    try:
+        from backend.utils.gmail_mirror import get_mirror
+        mirror = get_mirror()
+        result = mirror.sync(force_full=bool(full))
+        return {"ok": True, **result, **mirror.stats()}
+    except Exception as e:
+        logger.exception("sync_gmail_mirror failed")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"{type(e).__name__}: {e}", "trace": traceback.format_exc()},
+        )
 
-            if fast:
-            # FAST MODE: içerik çek + FALLOBACK özet (çok hızlı)
-                try:
-                    content, iso_date = fetch_latest_email_content_for_sender(
-                        None, sender, LOOKBACK_DAYS
-                    )
-                    clean_content = clean_text(content or "")
-                except Exception:
-                  clean_content = ""
-
-                if clean_content:
-                   teaser, long_summary, highlights = build_fallbacks(clean_content)
-                   title = title or name
-                else:
-                  teaser = f"Sender: {sender}"
-                  long_summary = teaser
-                  highlights = []
 
-            else:
-                # NORMAL MODE: Gmail’den içerik çekmeye çalış (timeout'lu ve thread offload)
-                content: str = ""
-                try:
-                    logger.info("Fetching latest email for sender=%s", sender)
-                    content, iso_date = await asyncio.wait_for(
-                        asyncio.to_thread(
-                            fetch_latest_email_content_for_sender,
-                            None,            # user_email (None → 'me')
-                            sender,          # sender_email
-                            LOOKBACK_DAYS,
-                        ),
-                        timeout=PER_SENDER_TIMEOUT,
-                    )
-                    logger.info("Fetched OK for %s, len=%d", sender, len(content or ""))
-                except asyncio.TimeoutError:
-                    logger.warning("Gmail fetch TIMEOUT for %s", sender)
-                except Exception as e:
-                    logger.warning("Gmail fetch ERROR for %s: %s", sender, e)
+@router.get("/summary-cache")
+def summary_cache_stats():
+    """Özet cache'inin boyutu, hit/miss sayaçları ve birleştirilen (single-flight) LLM çağrıları."""
+    return {**summary_cache.stats(), "singleflight": llm_flight.stats()}
 
-                # temizle
-                try:
-                    clean_content = clean_text(content or "")
-                except Exception:
-                    clean_content = content or ""
-
-                if not clean_content or len(clean_content) < 40:
-                    clean_content = (content or "").strip()
-
-                # özetle (tiered)
-                if clean_content:
-                    try:
-                        tiered = summarize_newsletter_tiered(
-                            clean_content, sender=name, date_iso=iso_date or ""
-                        )
-                        title = (tiered.get("title") or name).strip()
-                        teaser = (tiered.get("teaser") or "").strip()
-                        long_summary = (tiered.get("long") or "").strip()
-                        highlights = (tiered.get("highlights") or [])[:4]
-                    except Exception as e:
-                        logger.warning("summarize_newsletter_tiered failed for %s: %s", sender, e)
-
-                # Fallback garanti
-                if not teaser and not long_summary:
-                    base = clean_content or "No preview available."
-                    teaser = (base[:300] + "…") if len(base) > 300 else base
-                    long_summary = teaser
-
-            # Highlights hâlâ boşsa, teaser/long_summary’dan üret
-            if not highlights:
-                tparts = [p.strip() for p in SENT_SPLIT.split(teaser or "") if p.strip()]
-                lparts = [p.strip() for p in SENT_SPLIT.split(long_summary or "") if p.strip()]
-                highlights = (tparts or lparts)[:4]
-
-            # is_today’ı iso_date’e göre hesapla
-            try:
-                if iso_date and iso_date != "1970-01-01T00:00:00Z":
-                    dt = datetime.fromisoformat(iso_date.replace("Z", "+00:00")).astimezone(IST)
-                    is_today = dt.date() == datetime.now(IST).date()
-            except Exception:
-                is_today = False
 
-            topic = _safe_topic(f"{name} {sender}")
-            words = len((teaser + " " + long_summary).split())
-            minutes = max(1, words // 180)
+@router.get("/labeler-stats")
+def labeler_stats():
+    """Yerel etiketleyici: model boyutu, LLM'e düşme oranı ve ortalama etiketleme süreleri."""
+    return local_labeler.stats()
 
-            try:
-                tag = label_newsletter(title or "", (clean_content or teaser or long_summary or ""))
-            except Exception:
-                tag = "General"
-
-            items.append({
-                "id": i,
-                "title": title,
-                "topic": topic,
-                "minutes": minutes,
-                "tag": tag,
-                "description": teaser,
-                "teaser": teaser,
-                "long_summary": long_summary,
-                "highlights": highlights,
-                "sender": sender,
-                "date": iso_date or "1970-01-01T00:00:00Z",
-                "is_today": is_today,
-            })
 
-        # en yeni üstte
-        items.sort(key=lambda x: x["date"], reverse=True)
-        return {"items": items}
-    except Exception as e:
-        logger.exception("get_featured failed")
-        return {"items": items, "error": f"{type(e).__name__}: {e}"}
+@router.delete("/summary-cache")
+def invalidate_summary_cache(message_id: Optional[str] = None, prompt_version: Optional[str] = None):
+    """
+    Özet cache'inden kayıt siler.
+    - message_id verilirse sadece o e-postanın özetleri,
+    - prompt_version verilirse o prompt'la üretilenler,
+    - hiçbiri yoksa tüm cache.
+    """
+    deleted = summary_cache.invalidate(message_id=message_id, prompt_version=prompt_version)
+    return {"ok": True, "deleted": deleted}
 
 
 @router.get("/debug")
@@ -0,0 +1,268 @@
+# backend/summarizer/cache.py
+"""
+Kalıcı (SQLite) özet cache'i.
+
+Anahtar: Gmail message id + temiz içeriğin hash'i + model adı + prompt versiyonu.
+Değer: özetleyicinin döndürdüğü JSON (ör. tiered sonuç: title/teaser/long).
+Değişmemiş bir gelen kutusu için tekrar LLM çağrısı yapılmaz.
+
+near_dup=True ile yapılan get, birebir anahtar yoksa sırayla:
+  1) aynı içerik hash'i (hangi mesajdan gelirse gelsin: başka adresten gelen birebir aynı
+     bülten, [SEED] kopyası…) için aynı model/prompt özetini,
+  2) AYNI message_id'nin yakın-kopya içeriği (izleme linki/tarih gibi küçük farklarla
+     yeniden çekilen mesaj) için özeti döner ve onu bu anahtar altına da kopyalar.
+Farklı mesajlar arasında yakın-kopya eşleşmesi yapılmaz: aynı göndericinin ardışık sayıları
+şablon yüzünden yakın parmak izi verebilir, özetleri karışmamalı. Build içi farklı adres
+kopyaları routes tarafındaki SimHashIndex ile zaten tek karta indirgenir.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from backend.config.paths import DATA_DIR
+from backend.nlp.simhash import SIMHASH_MAX_DISTANCE, from_signed, hamming, simhash, to_signed
+
+CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", os.path.join(DATA_DIR, "summary_cache.db"))
+CACHE_TTL_S = float(os.getenv("SUMMARY_CACHE_TTL_DAYS", "30")) * 86400
+CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000"))
+
+# Her put'ta değil, bu kadar yazımda bir eviction çalıştır
+_EVICT_EVERY = 50
+
+
+def content_hash(text: str) -> str:
+    """Temiz içeriğin sha256 özeti."""
+    return hashlib.sha256((text or "").encode("utf-8", errors="ignore")).hexdigest()
+
+
+class SummaryCache:
+    """Thread-safe, TTL + boyut sınırlı SQLite cache."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl_s: float = CACHE_TTL_S, max_entries: int = CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.near_hits = 0
+        # bağlantı ilk kullanımda açılır: modülü import etmek data/ altında dosya oluşturmasın
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        """SQLite bağlantısı (gerekirse açar). _lock altında çağrılır."""
+        if self._conn is None:
+            self._conn = self._open()
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                message_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_summaries_message_id ON summaries (message_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_summaries_accessed_at ON summaries (accessed_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_summaries_content_hash ON summaries (content_hash)")
+        # yakın-kopya araması (aynı message_id içinde): içerik → parmak izi
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                content_hash TEXT PRIMARY KEY,
+                fp INTEGER NOT NULL
+            )
+            """
+        )
+        # eski sürümün global bant indeksi artık kullanılmıyor
+        conn.execute("DROP TABLE IF EXISTS fingerprint_bands")
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def make_key(message_id: str, chash: str, model: str, prompt_version: str) -> str:
+        raw = "\x1f".join([message_id or "", chash, model, prompt_version])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(
+        self, message_id: str, content: str, model: str, prompt_version: str, near_dup: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        chash = content_hash(content)
+        key = self.make_key(message_id, chash, model, prompt_version)
+        now = time.time()
+        with self._lock:
+            row = self._db().execute(
+                "SELECT value, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl_s > 0 and now - row[1] > self.ttl_s:
+                self._db().execute("DELETE FROM summaries WHERE key = ?", (key,))
+                self._db().commit()
+                row = None
+            if row:
+                self._db().execute("UPDATE summaries SET accessed_at = ? WHERE key = ?", (now, key))
+                self._db().commit()
+                self.hits += 1
+            else:
+                self.misses += 1
+        if row:
+            value = row[0]
+        elif near_dup:
+            fp = simhash(content)
+            with self._lock:
+                value = self._get_same_content_locked(chash, model, prompt_version, now)
+                if value is None and fp is not None and message_id:
+                    value = self._get_similar_locked(message_id, fp, chash, model, prompt_version, now)
+                if value is None:
+                    return None
+                # bir dahaki sefere birebir isabet olsun
+                self._insert_locked(key, message_id, chash, model, prompt_version, value, now, fp)
+                self.near_hits += 1
+        else:
+            return None
+        try:
+            return json.loads(value)
+        except Exception:
+            return None
+
+    def _cutoff(self, now: float) -> float:
+        return now - self.ttl_s if self.ttl_s > 0 else 0
+
+    def _get_same_content_locked(self, chash: str, model: str, prompt_version: str, now: float) -> Optional[str]:
+        row = self._db().execute(
+            "SELECT value FROM summaries WHERE content_hash = ? AND model = ? AND prompt_version = ? "
+            "AND created_at >= ? ORDER BY created_at DESC LIMIT 1",
+            (chash, model, prompt_version, self._cutoff(now)),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _get_similar_locked(
+        self, message_id: str, fp: int, chash: str, model: str, prompt_version: str, now: float
+    ) -> Optional[str]:
+        # aynı mesajın kayıtları birkaç tane olur: bant indeksine gerek yok
+        rows = self._db().execute(
+            "SELECT f.fp, s.value FROM summaries s JOIN fingerprints f ON f.content_hash = s.content_hash "
+            "WHERE s.message_id = ? AND s.content_hash != ? AND s.model = ? AND s.prompt_version = ? "
+            "AND s.created_at >= ? ORDER BY s.created_at DESC",
+            (message_id, chash, model, prompt_version, self._cutoff(now)),
+        ).fetchall()
+        cands = [
+            (d, i, v) for i, (f, v) in enumerate(rows)
+            if (d := hamming(fp, from_signed(f))) <= SIMHASH_MAX_DISTANCE
+        ]
+        return min(cands)[2] if cands else None  # en yakın; eşitlikte en yeni
+
+    def _insert_locked(
+        self, key: str, message_id: str, chash: str, model: str, prompt_version: str,
+        value: str, now: float, fp: Optional[int],
+    ) -> None:
+        self._db().execute(
+            """
+            INSERT OR REPLACE INTO summaries
+                (key, message_id, content_hash, model, prompt_version, value, created_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (key, message_id or "", chash, model, prompt_version, value, now, now),
+        )
+        if fp is not None:
+            self._db().execute(
+                "INSERT OR IGNORE INTO fingerprints (content_hash, fp) VALUES (?, ?)", (chash, to_signed(fp))
+            )
+        self._db().commit()
+        self._writes += 1
+        if self._writes % _EVICT_EVERY == 0:
+            self._evict_locked(now)
+
+    def put(
+        self, message_id: str, content: str, model: str, prompt_version: str, value: Dict[str, Any],
+        near_dup: bool = False,
+    ) -> None:
+        chash = content_hash(content)
+        key = self.make_key(message_id, chash, model, prompt_version)
+        fp = simhash(content) if near_dup else None
+        now = time.time()
+        with self._lock:
+            self._insert_locked(
+                key, message_id, chash, model, prompt_version, json.dumps(value, ensure_ascii=False), now, fp
+            )
+
+    def invalidate(self, message_id: Optional[str] = None, prompt_version: Optional[str] = None) -> int:
+        """
+        Kayıt siler. Parametre yoksa cache tamamen boşalır.
+        DÖNÜŞ: silinen satır sayısı
+        """
+        where, args = [], []
+        if message_id:
+            where.append("message_id = ?")
+            args.append(message_id)
+        if prompt_version:
+            where.append("prompt_version = ?")
+            args.append(prompt_version)
+        sql = "DELETE FROM summaries" + (f" WHERE {' AND '.join(where)}" if where else "")
+        with self._lock:
+            cur = self._db().execute(sql, args)
+            self._drop_orphan_fingerprints_locked()
+            self._db().commit()
+            return cur.rowcount
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evict_locked(time.time())
+
+    def _evict_locked(self, now: float) -> None:
+        # 1) süresi dolanlar
+        if self.ttl_s > 0:
+            self._db().execute("DELETE FROM summaries WHERE created_at < ?", (now - self.ttl_s,))
+        # 2) boyut sınırı: en uzun süredir okunmayanlar gider
+        if self.max_entries > 0:
+            (count,) = self._db().execute("SELECT COUNT(*) FROM summaries").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._db().execute(
+                    "DELETE FROM summaries WHERE key IN "
+                    "(SELECT key FROM summaries ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+        self._drop_orphan_fingerprints_locked()
+        self._db().commit()
+
+    def _drop_orphan_fingerprints_locked(self) -> None:
+        # özeti kalmayan içeriklerin parmak izleri
+        self._db().execute(
+            "DELETE FROM fingerprints WHERE content_hash NOT IN (SELECT content_hash FROM summaries)"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (count,) = self._db().execute("SELECT COUNT(*) FROM summaries").fetchone()
+            (fps,) = self._db().execute("SELECT COUNT(*) FROM fingerprints").fetchone()
+        return {
+            "path": self.path,
+            "entries": count,
+            "fingerprints": fps,
+            "hits": self.hits,
+            "misses": self.misses,
+            "near_dup_hits": self.near_hits,
+            "ttl_s": self.ttl_s,
+            "max_entries": self.max_entries,
+        }
+
+
+summary_cache = SummaryCache()
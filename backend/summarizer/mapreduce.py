@@ -0,0 +1,201 @@
+# backend/summarizer/mapreduce.py
+"""
+Uzun metinler için paralel map-reduce özetleme motoru.
+
+1) split_text: metni paragraf → cümle sınırlarından, token bütçesine göre parçalar.
+2) map: her parça eşzamanlı (MAPREDUCE_CONCURRENCY sınırıyla) özetlenir.
+3) reduce: ara özetler bütçeye sığana kadar gruplar halinde birleştirilir
+   (hiyerarşik), sonra tek bir final çağrısı yapılır.
+
+Metin tek parçaya sığıyorsa map atlanır, doğrudan final çağrısı yapılır.
+Hem async (amap_reduce) hem sync (map_reduce) sürümü vardır; parçalama ve
+gruplama mantığı ortaktır.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Optional
+
+CHUNK_TOKENS = int(os.getenv("MAPREDUCE_CHUNK_TOKENS", "3000"))
+REDUCE_TOKENS = int(os.getenv("MAPREDUCE_REDUCE_TOKENS", "6000"))
+MAP_CONCURRENCY = int(os.getenv("MAPREDUCE_CONCURRENCY", "8"))
+MAX_REDUCE_LEVELS = 6
+
+_PARA_SPLIT = re.compile(r"\n\s*\n")
+_SENT_SPLIT = re.compile(r"(?<=[\.!?…])\s+")
+
+_encoder: Any = None  # None: henüz denenmedi, False: tiktoken kullanılamıyor
+
+
+def estimate_tokens(text: str) -> int:
+    """tiktoken varsa gerçek sayım; yoksa (ya da encoding indirilemezse) ~4 karakter = 1 token."""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def _hard_split(text: str, budget: int) -> List[str]:
+    # cümle bile sığmıyorsa karakter bazında böl (bütçe ≈ 4 karakter/token)
+    step = max(200, budget * 4)
+    return [text[i:i + step] for i in range(0, len(text), step)]
+
+
+def _pack(pieces: List[str], budget: int, sep: str) -> List[str]:
+    """Sıralı parçaları bütçeyi aşmadan açgözlü şekilde birleştirir."""
+    out: List[str] = []
+    cur: List[str] = []
+    cur_tokens = 0
+    sep_tokens = estimate_tokens(sep) if sep.strip() else 0
+    for piece in pieces:
+        t = estimate_tokens(piece)
+        if cur and cur_tokens + sep_tokens + t > budget:
+            out.append(sep.join(cur))
+            cur, cur_tokens = [], 0
+        cur.append(piece)
+        cur_tokens += t + (sep_tokens if len(cur) > 1 else 0)
+    if cur:
+        out.append(sep.join(cur))
+    return out
+
+
+def split_text(text: str, budget: int = CHUNK_TOKENS) -> List[str]:
+    """Metni paragraf/cümle sınırlarına saygı göstererek ≤ budget token'lık parçalara böler."""
+    text = (text or "").strip()
+    if not text:
+        return []
+    pieces: List[str] = []
+    for para in _PARA_SPLIT.split(text):
+        para = para.strip()
+        if not para:
+            continue
+        if estimate_tokens(para) <= budget:
+            pieces.append(para)
+            continue
+        for sent in _SENT_SPLIT.split(para):
+            if estimate_tokens(sent) <= budget:
+                pieces.append(sent)
+            else:
+                pieces.extend(_hard_split(sent, budget))
+    return _pack(pieces, budget, "\n\n")
+
+
+def _groups(partials: List[str], budget: int) -> List[List[str]]:
+    groups: List[List[str]] = []
+    cur: List[str] = []
+    cur_tokens = 0
+    for p in partials:
+        t = estimate_tokens(p)
+        if cur and cur_tokens + t > budget:
+            groups.append(cur)
+            cur, cur_tokens = [], 0
+        cur.append(p)
+        cur_tokens += t
+    if cur:
+        groups.append(cur)
+    return groups
+
+
+def _fits(parts: List[str], budget: int) -> bool:
+    return sum(estimate_tokens(p) for p in parts) <= budget
+
+
+async def amap_partials(
+    text: str,
+    map_fn: Callable[[str], Awaitable[str]],
+    combine_fn: Callable[[List[str]], Awaitable[str]],
+    chunk_tokens: int = CHUNK_TOKENS,
+    reduce_tokens: int = REDUCE_TOKENS,
+    concurrency: int = MAP_CONCURRENCY,
+) -> List[str]:
+    """
+    Final çağrısından önceki her şey: final girdisi olacak parçaları döner.
+    Metin tek parçaya sığıyorsa [metin]; değilse reduce bütçesine inmiş ara özetler.
+    (Final'i akış halinde üretmek isteyenler bunu kullanır.)
+    """
+    chunks = split_text(text, chunk_tokens)
+    if len(chunks) <= 1:
+        return chunks
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _limited(fn, arg):
+        async with sem:
+            return await fn(arg)
+
+    async def _combine(group: List[str]) -> str:
+        # tek elemanlı grup zaten bütçede; boşuna çağrı yapma
+        return group[0] if len(group) == 1 else await _limited(combine_fn, group)
+
+    partials = await asyncio.gather(*[_limited(map_fn, c) for c in chunks])
+    partials = [p for p in partials if p and p.strip()]
+
+    for _ in range(MAX_REDUCE_LEVELS):
+        if _fits(partials, reduce_tokens) or len(partials) <= 1:
+            break
+        groups = _groups(partials, reduce_tokens)
+        partials = await asyncio.gather(*[_combine(g) for g in groups])
+        partials = [p for p in partials if p and p.strip()]
+
+    return partials
+
+
+async def amap_reduce(
+    text: str,
+    map_fn: Callable[[str], Awaitable[str]],
+    reduce_fn: Callable[[List[str]], Awaitable[str]],
+    combine_fn: Optional[Callable[[List[str]], Awaitable[str]]] = None,
+    chunk_tokens: int = CHUNK_TOKENS,
+    reduce_tokens: int = REDUCE_TOKENS,
+    concurrency: int = MAP_CONCURRENCY,
+) -> str:
+    """
+    map_fn(parça) → ara özet; combine_fn(ara özetler) → daha kısa ara özet (varsayılan reduce_fn);
+    reduce_fn(parçalar) → final çıktı.
+    """
+    parts = await amap_partials(
+        text, map_fn, combine_fn or reduce_fn,
+        chunk_tokens=chunk_tokens, reduce_tokens=reduce_tokens, concurrency=concurrency,
+    )
+    return await reduce_fn(parts) if parts else ""
+
+
+def map_reduce(
+    text: str,
+    map_fn: Callable[[str], str],
+    reduce_fn: Callable[[List[str]], str],
+    combine_fn: Optional[Callable[[List[str]], str]] = None,
+    chunk_tokens: int = CHUNK_TOKENS,
+    reduce_tokens: int = REDUCE_TOKENS,
+    concurrency: int = MAP_CONCURRENCY,
+) -> str:
+    """amap_reduce'un sync karşılığı: map/combine çağrıları bir thread havuzunda paralel çalışır."""
+    chunks = split_text(text, chunk_tokens)
+    if not chunks:
+        return ""
+    if len(chunks) == 1:
+        return reduce_fn(chunks)
+
+    combine = combine_fn or reduce_fn
+
+    def _combine(group: List[str]) -> str:
+        return group[0] if len(group) == 1 else combine(group)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        partials = [p for p in pool.map(map_fn, chunks) if p and p.strip()]
+        for _ in range(MAX_REDUCE_LEVELS):
+            if _fits(partials, reduce_tokens) or len(partials) <= 1:
+                break
+            groups = _groups(partials, reduce_tokens)
+            partials = [p for p in pool.map(_combine, groups) if p and p.strip()]
+
+    return reduce_fn(partials) if partials else ""
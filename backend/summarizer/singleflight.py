@@ -0,0 +1,102 @@
+# backend/summarizer/singleflight.py
+"""
+Aynı LLM isteğini aynı anda yapan çağıranları tek çağrıda birleştirir (single-flight).
+
+Anahtar: prompt + model + içerik hash'i (bkz. request_key). İlk gelen çağrıyı
+gerçekten yapar, o sürerken aynı anahtarla gelenler onun sonucunu (ya da
+hatasını) paylaşır. Çağrı bitince anahtar silinir; sonuçlar burada tutulmaz,
+kalıcılık summary_cache'in işidir.
+
+- do(key, fn)        → sync çağıranlar (thread'ler) için
+- ado(key, coro_fn)  → async çağıranlar için (aynı event loop içinde)
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+def request_key(model: str, payload: Any, **params: Any) -> str:
+    """Model + mesajlar/prompt + çağrı parametrelerinden kararlı bir anahtar üretir."""
+    raw = json.dumps([model, payload, params], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Thread-safe; async tarafta her event loop kendi uçuştaki task'larını tutar."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[Tuple[int, str], asyncio.Task] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def ado(self, key: str, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(loop_key)
+            if task is not None and not task.done():
+                self.shared += 1
+            else:
+                task = asyncio.create_task(coro_fn())
+                self._tasks[loop_key] = task
+                self.executed += 1
+                task.add_done_callback(lambda t, k=loop_key: self._forget(k, t))
+        # bir çağıranın iptali, sonucu bekleyen diğerlerinin çağrısını iptal etmesin
+        return await asyncio.shield(task)
+
+    def _forget(self, loop_key: Tuple[int, str], task: asyncio.Task) -> None:
+        with self._lock:
+            if self._tasks.get(loop_key) is task:
+                del self._tasks[loop_key]
+        if not task.cancelled():
+            task.exception()  # kimse beklemiyorsa "never retrieved" uyarısını sustur
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            inflight = len(self._calls) + len(self._tasks)
+        return {"executed": self.executed, "shared": self.shared, "inflight": inflight}
+
+
+llm_flight = SingleFlight()
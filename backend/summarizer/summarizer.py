@@ -3,18 +3,26 @@ from __future__ import annotations
 
 import os
 import json
-import tempfile
-from typing import Any, Dict, List, Optional
+import asyncio
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from openai import OpenAI
-import requests
-from bs4 import BeautifulSoup
-import fitz  # PyMuPDF
+import httpx
+from openai import OpenAI, AsyncOpenAI
 import requests as rq
 
+from pydantic import BaseModel, Field
+
+from backend.summarizer.cache import summary_cache
+from backend.summarizer.singleflight import llm_flight, request_key
+from backend.summarizer.mapreduce import MAP_CONCURRENCY, amap_partials, amap_reduce, map_reduce, split_text
+from backend.utils.pdf_text import extract_pdf_text
+from backend.utils.url_fetch import fetch_url_text
+from backend.nlp.topic_labeler import normalize_label
+
 # ---- OpenAI client & config ----
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
@@ -23,62 +31,157 @@ TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.2"))  # daha tutarlı öz
 SUMMARY_LANG = os.getenv("SUMMARY_LANG", "tr").lower()       # 'tr' ya da 'en'
 PROXY_URL = os.getenv("SUMMARY_PROXY_URL")  # senin host ettiğin URL: https://<senin-url>/api/summarize
 
+# Prompt değişince artır → eski cache kayıtları otomatik olarak kullanılmaz
+TIERED_PROMPT_VERSION = "tiered-v1"
+CARD_PROMPT_VERSION = "card-v1"
+URL_PROMPT_VERSION = "url-v1"
+
+# Async client'ın paylaşılan bağlantı havuzu
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "16"))
+OPENAI_TIMEOUT_S = float(os.getenv("OPENAI_TIMEOUT_S", "60"))
+
+_async_client: Optional[AsyncOpenAI] = None
+
 
 # ---- Low-level helper: safe chat completion ----
-def _chat(messages: List[Dict[str, str]], max_tokens: int = 400) -> str:
+def _chat_kwargs(
+    messages: List[Dict[str, str]],
+    max_tokens: int,
+    response_format: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {
+        "model": MODEL,
+        "messages": messages,
+        "temperature": TEMPERATURE,
+        "max_tokens": max_tokens,
+    }
+    if response_format:
+        kwargs["response_format"] = response_format
+    return kwargs
+
+
+def _chat(
+    messages: List[Dict[str, str]],
+    max_tokens: int = 400,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> str:
     """
     OpenAI ChatCompletion çağrısını güvenli şekilde yapar ve metni döner.
+    response_format verilirse (ör. json_schema) modele yapılandırılmış çıktı zorunlu kılınır.
     """
-    resp = client.chat.completions.create(
-        model=MODEL,
-        messages=messages,
-        temperature=TEMPERATURE,
-        max_tokens=max_tokens,
-    )
-    return (resp.choices[0].message.content or "").strip()
+    kwargs = _chat_kwargs(messages, max_tokens, response_format)
 
+    def call() -> str:
+        resp = client.chat.completions.create(**kwargs)
+        return (resp.choices[0].message.content or "").strip()
 
-# ---- 1) Kısa, 2-3 cümlelik özet ----
-def summarize_text_with_openai(text: str, lang: Optional[str] = None) -> str:
+    # aynı prompt/model/içerik için uçuştaki çağrı varsa onun sonucunu paylaş
+    return llm_flight.do(request_key(MODEL, kwargs), call)
+
+
+def get_async_client() -> AsyncOpenAI:
     """
-    Verilen metni GPT ile 2-3 cümlede özetler (dil varsayılanı .env SUMMARY_LANG).
+    Süreç genelinde tek AsyncOpenAI; altında limitleri ayarlı tek bir httpx.AsyncClient
+    (keep-alive havuzu) vardır. İlk kullanımda, çalışan event loop içinde oluşturulur.
     """
-    if not text or not text.strip():
-        return "Metin boş görünüyor."
+    global _async_client
+    if _async_client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(OPENAI_TIMEOUT_S, connect=10.0),
+        )
+        _async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
+    return _async_client
 
+
+async def aclose_async_client() -> None:
+    """Uygulama kapanırken havuzdaki bağlantıları kapatır."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+
+
+async def _achat(
+    messages: List[Dict[str, str]],
+    max_tokens: int = 400,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> str:
+    """_chat'in async karşılığı: event loop'u bloklamaz, thread tutmaz."""
+    kwargs = _chat_kwargs(messages, max_tokens, response_format)
+
+    async def call() -> str:
+        resp = await get_async_client().chat.completions.create(**kwargs)
+        return (resp.choices[0].message.content or "").strip()
+
+    return await llm_flight.ado(request_key(MODEL, kwargs), call)
+
+
+async def _astream_chat(messages: List[Dict[str, str]], max_tokens: int = 400) -> AsyncIterator[str]:
+    """Model token'larını geldikçe verir (stream=True); akış paylaşılamadığı için single-flight dışı."""
+    stream = await get_async_client().chat.completions.create(
+        **_chat_kwargs(messages, max_tokens, None), stream=True
+    )
+    async for chunk in stream:
+        if chunk.choices:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+# ---- 1) Kısa, 2-3 cümlelik özet ----
+def _text_messages(text: str, lang: Optional[str]) -> List[Dict[str, str]]:
     _lang = (lang or SUMMARY_LANG).lower()
     system = (
         "Sen bir içerik özetleyicisisin. Metni kısa, net ve anlamlı biçimde 2-3 cümleyle özetle."
         if _lang.startswith("tr")
         else "You are a concise content summarizer. Summarize the text in 2-3 clear sentences in English."
     )
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": text},
+    ]
+
+
+def summarize_text_with_openai(text: str, lang: Optional[str] = None) -> str:
+    """
+    Verilen metni GPT ile 2-3 cümlede özetler (dil varsayılanı .env SUMMARY_LANG).
+    """
+    if not text or not text.strip():
+        return "Metin boş görünüyor."
 
     try:
-        return _chat(
-            [
-                {"role": "system", "content": system},
-                {"role": "user", "content": text},
-            ],
-            max_tokens=300,
-        )
+        return _chat(_text_messages(text, lang), max_tokens=300)
     except Exception as e:
         return f"OpenAI özetleme hatası: {e}"
 
 
-# ---- 2) Newsletter tarzı zengin özet: başlık + 5 madde + TL;DR ----
-def summarize_newsletter(content: str, sender: str = "", date_iso: str = "", lang: Optional[str] = None) -> Dict[str, Any]:
-    """
-    DÖNÜŞ:
-    {
-      "title": "...",
-      "bullets": ["...", "...", "...", "...", "..."],
-      "tldr": "..."
-    }
-    """
-    if not content or not content.strip():
-        return {"title": sender or "Bülten", "bullets": [], "tldr": ""}
+async def asummarize_text_with_openai(text: str, lang: Optional[str] = None) -> str:
+    """summarize_text_with_openai'nin async karşılığı."""
+    if not text or not text.strip():
+        return "Metin boş görünüyor."
+    if PROXY_URL and not os.getenv("OPENAI_API_KEY"):
+        try:
+            async with httpx.AsyncClient(timeout=30) as http:
+                r = await http.post(PROXY_URL, json={"text": text, "lang": lang})
+                r.raise_for_status()
+                return (r.json() or {}).get("summary", "")
+        except Exception as e:
+            return f"Proxy summarize hatası: {e}"
 
-    _lang = (lang or SUMMARY_LANG).lower()
+    try:
+        return await _achat(_text_messages(text, lang), max_tokens=300)
+    except Exception as e:
+        return f"OpenAI özetleme hatası: {e}"
+
+
+# ---- 2) Newsletter tarzı zengin özet: başlık + 5 madde + TL;DR ----
+def _newsletter_messages(content: str, sender: str, date_iso: str, _lang: str) -> List[Dict[str, str]]:
     system = (
         "Kısa ve vurucu bir bülten editörüsün."
         if _lang.startswith("tr")
@@ -106,30 +209,20 @@ Metin aşağıda. Görevlerin:
 METİN:
 \"\"\"{content[:8000]}\"\"\"
 """
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt},
+    ]
 
-    try:
-        text = _chat(
-            [
-                {"role": "system", "content": system},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=600,
-        )
 
-        data = json.loads(text)
-        if not isinstance(data, dict):
-            raise ValueError("Model JSON yerine farklı çıktı verdi")
+def _parse_json_dict(text: str) -> Dict[str, Any]:
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("Model JSON yerine farklı çıktı verdi")
+    return data
 
-    except Exception:
-        # Güvenli yedek: kısa özet üretip tek madde gibi dön
-        short = summarize_text_with_openai(content, lang=_lang)
-        data = {
-            "title": sender or "Bülten",
-            "bullets": [short] if short else [],
-            "tldr": short,
-        }
 
-    # Normalizasyon
+def _normalize_newsletter(data: Dict[str, Any], sender: str) -> Dict[str, Any]:
     data.setdefault("title", sender or "Bülten")
     bullets = data.get("bullets") or []
     if isinstance(bullets, list):
@@ -141,72 +234,242 @@ METİN:
     return data
 
 
-# ---- 3) URL özetleme (basit <p> toplayıcı) ----
+def summarize_newsletter(content: str, sender: str = "", date_iso: str = "", lang: Optional[str] = None) -> Dict[str, Any]:
+    """
+    DÖNÜŞ:
+    {
+      "title": "...",
+      "bullets": ["...", "...", "...", "...", "..."],
+      "tldr": "..."
+    }
+    """
+    if not content or not content.strip():
+        return {"title": sender or "Bülten", "bullets": [], "tldr": ""}
+
+    _lang = (lang or SUMMARY_LANG).lower()
+    try:
+        text = _chat(_newsletter_messages(content, sender, date_iso, _lang), max_tokens=600)
+        data = _parse_json_dict(text)
+
+    except Exception:
+        # Güvenli yedek: kısa özet üretip tek madde gibi dön
+        short = summarize_text_with_openai(content, lang=_lang)
+        data = {
+            "title": sender or "Bülten",
+            "bullets": [short] if short else [],
+            "tldr": short,
+        }
+
+    return _normalize_newsletter(data, sender)
+
+
+async def asummarize_newsletter(
+    content: str, sender: str = "", date_iso: str = "", lang: Optional[str] = None
+) -> Dict[str, Any]:
+    """summarize_newsletter'ın async karşılığı (aynı çıktı şekli)."""
+    if not content or not content.strip():
+        return {"title": sender or "Bülten", "bullets": [], "tldr": ""}
+
+    _lang = (lang or SUMMARY_LANG).lower()
+    try:
+        text = await _achat(_newsletter_messages(content, sender, date_iso, _lang), max_tokens=600)
+        data = _parse_json_dict(text)
+    except Exception:
+        short = await asummarize_text_with_openai(content, lang=_lang)
+        data = {
+            "title": sender or "Bülten",
+            "bullets": [short] if short else [],
+            "tldr": short,
+        }
+
+    return _normalize_newsletter(data, sender)
+
+
+# ---- 3) URL özetleme (cache'li çekme + hızlı <p> çıkarıcı, bkz. utils/url_fetch.py) ----
 def summarize_url(url: str, lang: Optional[str] = None) -> str:
     """
-    URL'den içerik çekip özetleme yapar (basit HTML <p> toplayıcı).
+    URL'den içerik çekip özetleme yapar. Aynı makale (aynı metin) için özet cache'ten gelir.
     """
-    r = requests.get(url, timeout=20)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-    paragraphs = " ".join([p.get_text(" ", strip=True) for p in soup.find_all("p")][:10])
-    return summarize_text_with_openai(paragraphs or f"Bu sayfa için özet üret: {url}", lang=lang)
+    text = fetch_url_text(url) or f"Bu sayfa için özet üret: {url}"
+    if PROXY_URL and not os.getenv("OPENAI_API_KEY"):
+        return summarize_text_with_openai(text, lang=lang)
+
+    version = f"{URL_PROMPT_VERSION}-{(lang or SUMMARY_LANG).lower()}"
+    cached = summary_cache.get(url, text, MODEL, version)
+    if cached and cached.get("summary"):
+        return cached["summary"]
+    try:
+        summary = _chat(_text_messages(text, lang), max_tokens=300)
+    except Exception as e:
+        return f"OpenAI özetleme hatası: {e}"
+    if summary:
+        summary_cache.put(url, text, MODEL, version, {"summary": summary})
+    return summary
+
+
+async def asummarize_url(url: str, lang: Optional[str] = None) -> str:
+    """summarize_url'in async karşılığı (çekme thread'de, LLM çağrısı async)."""
+    text = await asyncio.to_thread(fetch_url_text, url) or f"Bu sayfa için özet üret: {url}"
+    if PROXY_URL and not os.getenv("OPENAI_API_KEY"):
+        return await asummarize_text_with_openai(text, lang=lang)
+
+    version = f"{URL_PROMPT_VERSION}-{(lang or SUMMARY_LANG).lower()}"
+    cached = summary_cache.get(url, text, MODEL, version)
+    if cached and cached.get("summary"):
+        return cached["summary"]
+    try:
+        summary = await _achat(_text_messages(text, lang), max_tokens=300)
+    except Exception as e:
+        return f"OpenAI özetleme hatası: {e}"
+    if summary:
+        summary_cache.put(url, text, MODEL, version, {"summary": summary})
+    return summary
 
 
 # ---- 4) PDF'ten metin çıkarma ----
 def extract_text_from_pdf(pdf_bytes: bytes) -> str:
     """
-    PDF içeriğini düz metne çevirir (PyMuPDF).
+    PDF içeriğini düz metne çevirir (PyMuPDF, bellekten; bkz. utils/pdf_text.py).
     """
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(pdf_bytes)
-        tmp_path = tmp.name
-
-    doc = fitz.open(tmp_path)
-    try:
-        text = "\n".join(page.get_text() for page in doc)
-    finally:
-        doc.close()
-    return text
+    return extract_pdf_text(pdf_bytes)
 
 
 # ---- 5) Dosya özetleme (PDF) ----
+def _section_messages(chunk: str, lang: Optional[str]) -> List[Dict[str, str]]:
+    _lang = (lang or SUMMARY_LANG).lower()
+    system = (
+        "Uzun bir belgenin bir bölümünü özetliyorsun. Önemli olguları, sayıları, tarihleri ve özel isimleri "
+        "koruyarak 3-5 cümlelik yoğun bir özet yaz."
+        if _lang.startswith("tr")
+        else "You summarize one section of a longer document. Write a dense 3-5 sentence summary in English, "
+        "keeping key facts, numbers, dates and names."
+    )
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": chunk},
+    ]
+
+
+def _merge_messages(parts: List[str], lang: Optional[str]) -> List[Dict[str, str]]:
+    _lang = (lang or SUMMARY_LANG).lower()
+    system = (
+        "Aşağıda aynı belgenin ardışık bölüm özetleri var. Tekrarları atıp sırayı koruyarak tek, "
+        "tutarlı ve yoğun bir ara özette birleştir."
+        if _lang.startswith("tr")
+        else "Below are consecutive section summaries of one document. Merge them in English into a single "
+        "coherent, dense summary, keeping the order and dropping repetition."
+    )
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": "\n\n".join(parts)},
+    ]
+
+
+def _summarize_long_text(text: str, lang: Optional[str]) -> str:
+    return map_reduce(
+        text,
+        map_fn=lambda chunk: _chat(_section_messages(chunk, lang), max_tokens=300),
+        combine_fn=lambda parts: _chat(_merge_messages(parts, lang), max_tokens=600),
+        reduce_fn=lambda parts: _chat(_text_messages("\n\n".join(parts), lang), max_tokens=300),
+    )
+
+
+async def _amap_section(chunk: str, lang: Optional[str]) -> str:
+    return await _achat(_section_messages(chunk, lang), max_tokens=300)
+
+
+async def _amerge_sections(parts: List[str], lang: Optional[str]) -> str:
+    return await _achat(_merge_messages(parts, lang), max_tokens=600)
+
+
+async def _asummarize_long_text(text: str, lang: Optional[str]) -> str:
+    async def reduce_fn(parts: List[str]) -> str:
+        return await _achat(_text_messages("\n\n".join(parts), lang), max_tokens=300)
+
+    return await amap_reduce(
+        text,
+        map_fn=partial(_amap_section, lang=lang),
+        reduce_fn=reduce_fn,
+        combine_fn=partial(_amerge_sections, lang=lang),
+    )
+
+
+def _proxy_summarize_long_text(text: str, lang: Optional[str]) -> str:
+    # proxy modu (OPENAI_API_KEY yok): parçalar ve birleşik özet proxy üzerinden
+    partials = [summarize_text_with_openai(chunk, lang=lang) for chunk in split_text(text)]
+    if len(partials) == 1:
+        return partials[0]
+    return summarize_text_with_openai("\n\n".join(partials), lang=lang)
+
+
+async def _aproxy_summarize_long_text(text: str, lang: Optional[str]) -> str:
+    sem = asyncio.Semaphore(MAP_CONCURRENCY)
+
+    async def one(chunk: str) -> str:
+        async with sem:
+            return await asummarize_text_with_openai(chunk, lang=lang)
+
+    partials = await asyncio.gather(*(one(chunk) for chunk in split_text(text)))
+    if len(partials) == 1:
+        return partials[0]
+    return await asummarize_text_with_openai("\n\n".join(partials), lang=lang)
+
+
+async def astream_summary(text: str, lang: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Metnin kısa özetini token token üretir. Uzun metinlerde map/birleştirme adımları
+    normal çalışır, yalnızca final çağrısı akış halinde gelir.
+    """
+    if not text or not text.strip():
+        yield "Metin boş görünüyor."
+        return
+    if PROXY_URL and not os.getenv("OPENAI_API_KEY"):
+        # proxy akış desteklemiyor: tek parça döner
+        yield await asummarize_text_with_openai(text, lang=lang)
+        return
+
+    parts = await amap_partials(
+        text,
+        map_fn=partial(_amap_section, lang=lang),
+        combine_fn=partial(_amerge_sections, lang=lang),
+    )
+    async for token in _astream_chat(_text_messages("\n\n".join(parts), lang), max_tokens=300):
+        yield token
+
+
 def summarize_file(file_bytes: bytes, filename: str, lang: Optional[str] = None) -> str:
     """
-    PDF dosyasını özetler (uzunsa parça parça).
+    PDF dosyasını özetler. Uzun metinler paragraf/cümle sınırlarından parçalanıp
+    paralel map-reduce ile özetlenir (bkz. summarizer/mapreduce.py).
     """
     text = extract_text_from_pdf(file_bytes)
     if not text or len(text.strip()) < 50:
         return "PDF içeriği okunamadı ya da çok kısa görünüyor."
+    if PROXY_URL and not os.getenv("OPENAI_API_KEY"):
+        return _proxy_summarize_long_text(text, lang)
+
+    try:
+        return _summarize_long_text(text, lang)
+    except Exception as e:
+        return f"OpenAI özetleme hatası: {e}"
 
-    # Basit parçalama (token yerine karakter bazlı; hızlı ve pratik)
-    chunks = [text[i:i + 2000] for i in range(0, len(text), 2000)]
-    summaries: List[str] = []
-    for chunk in chunks:
-        if len(chunk.strip()) > 100:
-            summaries.append(summarize_text_with_openai(chunk, lang=lang))
 
-    if summaries:
-        # Parça özetlerini tek kısa paragrafa indir
-        joined = "\n\n".join(summaries)
-        return summarize_text_with_openai(joined, lang=lang)
+async def asummarize_file(file_bytes: bytes, filename: str, lang: Optional[str] = None) -> str:
+    """summarize_file'ın async karşılığı: PDF çıkarma thread'de, LLM çağrıları async ve eşzamanlı."""
+    text = await asyncio.to_thread(extract_text_from_pdf, file_bytes)
+    if not text or len(text.strip()) < 50:
+        return "PDF içeriği okunamadı ya da çok kısa görünüyor."
+    if PROXY_URL and not os.getenv("OPENAI_API_KEY"):
+        return await _aproxy_summarize_long_text(text, lang)
 
-    return summarize_text_with_openai(text[:2000], lang=lang)
+    try:
+        return await _asummarize_long_text(text, lang)
+    except Exception as e:
+        return f"OpenAI özetleme hatası: {e}"
 
 
 # --- EKLE: Kart + modal için iki seviyeli özet ---
-def summarize_newsletter_tiered(content: str, sender: str = "", date_iso: str = "") -> Dict[str, str]:
-    """
-    ÇIKTI (kaynak dilini KORUYARAK):
-    {
-      "title": "...",
-      "teaser": "3-4 punchy cümle",
-      "long": "15-20 cümlelik ayrıntılı özet"
-    }
-    """
-    if not content or not content.strip():
-        return {"title": sender or "Newsletter", "teaser": "", "long": ""}
-
+def _tiered_messages(content: str, sender: str, date_iso: str) -> List[Dict[str, str]]:
     system = (
         "You are a sharp newsletter editor. IMPORTANT: Detect and KEEP the source language exactly; DO NOT translate."
         " Do not add ads, unsubscribes, or tracking fluff."
@@ -233,29 +496,215 @@ Return STRICT JSON only:
 TEXT:
 \"\"\"{content[:9000]}\"\"\"
 """
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _normalize_tiered(data: Dict[str, Any], sender: str) -> Dict[str, str]:
+    return {
+        "title": (data.get("title") or sender or "Newsletter").strip(),
+        "teaser": (data.get("teaser") or "").strip(),
+        "long": (data.get("long") or "").strip(),
+    }
+
+
+def summarize_newsletter_tiered(
+    content: str, sender: str = "", date_iso: str = "", message_id: str = ""
+) -> Dict[str, str]:
+    """
+    ÇIKTI (kaynak dilini KORUYARAK):
+    {
+      "title": "...",
+      "teaser": "3-4 punchy cümle",
+      "long": "15-20 cümlelik ayrıntılı özet"
+    }
+    Sonuç (message_id, içerik hash'i, model, prompt versiyonu) ile kalıcı cache'lenir.
+    """
+    if not content or not content.strip():
+        return {"title": sender or "Newsletter", "teaser": "", "long": ""}
+
+    cached = summary_cache.get(message_id, content, MODEL, TIERED_PROMPT_VERSION, near_dup=True)
+    if cached is not None:
+        return cached
 
     try:
-        text = _chat(
-            [
-                {"role": "system", "content": system},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=1200,
-        )
-        data = json.loads(text)
-        if not isinstance(data, dict):
-            raise ValueError("not a dict")
+        text = _chat(_tiered_messages(content, sender, date_iso), max_tokens=1200)
+        data = _parse_json_dict(text)
+        cacheable = True
     except Exception:
-        # emniyet: tek aşamalı kısa özet
+        # emniyet: tek aşamalı kısa özet (cache'lenmez, sonraki çağrı tekrar dener)
         short = summarize_text_with_openai(content, lang=None)
         data = {"title": sender or "Newsletter", "teaser": short, "long": short}
+        cacheable = False
 
-    # normalize
-    out = {
-        "title": (data.get("title") or sender or "Newsletter").strip(),
-        "teaser": (data.get("teaser") or "").strip(),
-        "long": (data.get("long") or "").strip(),
+    out = _normalize_tiered(data, sender)
+    if cacheable:
+        summary_cache.put(message_id, content, MODEL, TIERED_PROMPT_VERSION, out, near_dup=True)
+    return out
+
+
+async def asummarize_newsletter_tiered(
+    content: str, sender: str = "", date_iso: str = "", message_id: str = ""
+) -> Dict[str, str]:
+    """summarize_newsletter_tiered'ın async karşılığı (aynı cache anahtarlarını paylaşır)."""
+    if not content or not content.strip():
+        return {"title": sender or "Newsletter", "teaser": "", "long": ""}
+
+    cached = summary_cache.get(message_id, content, MODEL, TIERED_PROMPT_VERSION, near_dup=True)
+    if cached is not None:
+        return cached
+
+    try:
+        text = await _achat(_tiered_messages(content, sender, date_iso), max_tokens=1200)
+        data = _parse_json_dict(text)
+        cacheable = True
+    except Exception:
+        short = await asummarize_text_with_openai(content, lang=None)
+        data = {"title": sender or "Newsletter", "teaser": short, "long": short}
+        cacheable = False
+
+    out = _normalize_tiered(data, sender)
+    if cacheable:
+        summary_cache.put(message_id, content, MODEL, TIERED_PROMPT_VERSION, out, near_dup=True)
+    return out
+
+
+# ---- Featured kartı: tek yapılandırılmış çağrı ----
+class NewsletterCard(BaseModel):
+    title: str
+    teaser: str
+    long: str
+    highlights: List[str] = Field(default_factory=list)
+    tag: str
+
+
+_CARD_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "teaser": {"type": "string"},
+        "long": {"type": "string"},
+        "highlights": {"type": "array", "items": {"type": "string"}},
+        "tag": {"type": "string"},
+    },
+    "required": ["title", "teaser", "long", "highlights", "tag"],
+    "additionalProperties": False,
+}
+
+
+def _card_messages(content: str, sender: str, date_iso: str) -> List[Dict[str, str]]:
+    system = (
+        "You are a sharp newsletter editor. IMPORTANT: Detect and KEEP the source language exactly; DO NOT translate."
+        " Do not add ads, unsubscribes, or tracking fluff."
+    )
+
+    prompt = f"""
+Source: {sender or '-'}
+Date: {date_iso or '-'}
+
+Write output in the SAME language as the source text. DO NOT translate.
+
+Tasks:
+1) title: a short catchy title (6–12 words).
+2) teaser: 3–4 punchy sentences that capture the most impactful insights across different subtopics. No bullets.
+3) long: 15–20 full sentences, logically structured, cohesive, no repetition, no lists; keep numbers, entities, dates.
+4) highlights: 3–4 single-sentence key takeaways, each from a different subtopic.
+5) tag: a compact TOPIC LABEL, 1–2 words, Title Case, no punctuation, no emojis (e.g. 'OpenAI', 'US Politics', 'AI Policy').
+
+TEXT:
+\"\"\"{content[:9000]}\"\"\"
+"""
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt},
+    ]
+
+
+_CARD_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {"name": "newsletter_card", "strict": True, "schema": _CARD_SCHEMA},
+}
+
+
+def _normalize_card(card: NewsletterCard, sender: str) -> Dict[str, Any]:
+    return {
+        "title": card.title.strip() or sender or "Newsletter",
+        "teaser": card.teaser.strip(),
+        "long": card.long.strip(),
+        "highlights": [h.strip() for h in card.highlights if h and h.strip()][:4],
+        "tag": normalize_label(card.tag),
     }
+
+
+def summarize_newsletter_card(
+    content: str, sender: str = "", date_iso: str = "", message_id: str = ""
+) -> Dict[str, Any]:
+    """
+    Featured kartının tüm metin alanlarını TEK çağrıda üretir (kaynak dilini KORUYARAK):
+    {
+      "title": "...",
+      "teaser": "3-4 punchy cümle",
+      "long": "15-20 cümlelik ayrıntılı özet",
+      "highlights": ["...", "..."],   # en fazla 4
+      "tag": "AI Policy"              # 1-2 kelime, Title Case
+    }
+    Çıktı JSON şemasıyla istenir ve NewsletterCard ile doğrulanır; geçerli sonuç cache'lenir.
+    Çağrı başarısız olursa tiered özete düşer ve "tag" boş döner (çağıran etiketi ayrıca üretir).
+    """
+    if not content or not content.strip():
+        return {"title": sender or "Newsletter", "teaser": "", "long": "", "highlights": [], "tag": ""}
+
+    cached = summary_cache.get(message_id, content, MODEL, CARD_PROMPT_VERSION, near_dup=True)
+    if cached is not None:
+        return cached
+
+    try:
+        text = _chat(
+            _card_messages(content, sender, date_iso),
+            max_tokens=1500,
+            response_format=_CARD_RESPONSE_FORMAT,
+        )
+        card = NewsletterCard.model_validate_json(text)
+    except Exception:
+        # emniyet: ayrı tiered özet (kendi cache'i var); etiketi çağıran üretir
+        out = dict(summarize_newsletter_tiered(content, sender=sender, date_iso=date_iso, message_id=message_id))
+        out.update({"highlights": [], "tag": ""})
+        return out
+
+    out = _normalize_card(card, sender)
+    if out["tag"]:
+        summary_cache.put(message_id, content, MODEL, CARD_PROMPT_VERSION, out, near_dup=True)
+    return out
+
+
+async def asummarize_newsletter_card(
+    content: str, sender: str = "", date_iso: str = "", message_id: str = ""
+) -> Dict[str, Any]:
+    """summarize_newsletter_card'ın async karşılığı."""
+    if not content or not content.strip():
+        return {"title": sender or "Newsletter", "teaser": "", "long": "", "highlights": [], "tag": ""}
+
+    cached = summary_cache.get(message_id, content, MODEL, CARD_PROMPT_VERSION, near_dup=True)
+    if cached is not None:
+        return cached
+
+    try:
+        text = await _achat(
+            _card_messages(content, sender, date_iso),
+            max_tokens=1500,
+            response_format=_CARD_RESPONSE_FORMAT,
+        )
+        card = NewsletterCard.model_validate_json(text)
+    except Exception:
+        out = dict(await asummarize_newsletter_tiered(content, sender=sender, date_iso=date_iso, message_id=message_id))
+        out.update({"highlights": [], "tag": ""})
+        return out
+
+    out = _normalize_card(card, sender)
+    if out["tag"]:
+        summary_cache.put(message_id, content, MODEL, CARD_PROMPT_VERSION, out, near_dup=True)
     return out
 
 
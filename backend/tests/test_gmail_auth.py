@@ -0,0 +1,85 @@
+# backend/tests/test_gmail_auth.py
+"""Erken token yenileme hatası etkileşimli OAuth akışını tetiklememeli."""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+
+os.environ.setdefault("GOOGLE_CLIENT_SECRETS_FILE", os.devnull)
+os.environ.setdefault("GOOGLE_CLIENT_SECRET_FILE", os.devnull)
+
+import pytest
+from google.auth.exceptions import RefreshError, TransportError
+
+from backend.mcp import server as mcp_server
+from backend.utils import gmail_client
+from backend.utils.gmail_client import GmailServiceProvider
+
+
+class _Creds:
+    """Süresi yakında dolacak (ama hâlâ geçerli) token; refresh hata verir."""
+
+    def __init__(self, valid=True, error=None):
+        self.valid = valid
+        self.expiry = datetime.utcnow() + timedelta(seconds=60)
+        self.refresh_token = "r"
+        self.error = error or TransportError("ağ yok")
+        self.refresh_calls = 0
+
+    def refresh(self, request):
+        self.refresh_calls += 1
+        raise self.error
+
+    def to_json(self):
+        return "{}"
+
+
+@pytest.fixture
+def no_flow(monkeypatch):
+    def fail(*a, **kw):
+        raise AssertionError("etkileşimli OAuth akışı başlatılmamalı")
+
+    monkeypatch.setattr(gmail_client.InstalledAppFlow, "from_client_secrets_file", fail)
+    monkeypatch.setattr(mcp_server.InstalledAppFlow, "from_client_secrets_file", fail)
+
+
+def test_provider_keeps_valid_token_when_early_refresh_fails(tmp_path, no_flow):
+    provider = GmailServiceProvider(str(tmp_path / "token.json"), os.devnull, ["s"])
+    creds = _Creds()
+    provider._creds = creds
+
+    assert provider.credentials() is creds
+    assert provider.credentials() is creds  # sonraki çağrı yeniden dener
+    assert creds.refresh_calls == 2
+    assert not (tmp_path / "token.json").exists()
+
+
+def test_provider_raises_transient_error_on_expired_token(tmp_path, no_flow):
+    provider = GmailServiceProvider(str(tmp_path / "token.json"), os.devnull, ["s"])
+    provider._creds = _Creds(valid=False)
+
+    with pytest.raises(TransportError):
+        provider.credentials()
+
+
+def test_provider_reauthorizes_when_refresh_token_revoked(tmp_path, monkeypatch):
+    provider = GmailServiceProvider(str(tmp_path / "token.json"), os.devnull, ["s"])
+    provider._creds = _Creds(valid=False, error=RefreshError("invalid_grant"))
+    fresh = _Creds()
+
+    class _Flow:
+        def run_local_server(self, **kw):
+            return fresh
+
+    monkeypatch.setattr(gmail_client.InstalledAppFlow, "from_client_secrets_file", lambda *a: _Flow())
+    assert provider.credentials() is fresh
+    assert (tmp_path / "token.json").exists()
+
+
+def test_mcp_server_keeps_valid_token_when_early_refresh_fails(monkeypatch, no_flow):
+    creds = _Creds()
+    monkeypatch.setattr(mcp_server, "_CREDS", creds)
+    monkeypatch.setattr(mcp_server, "_save_creds", lambda c: pytest.fail("token yazılmamalı"))
+
+    assert mcp_server._authorize_if_needed() is creds
+    assert creds.refresh_calls == 1
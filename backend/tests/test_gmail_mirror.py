@@ -0,0 +1,102 @@
+# backend/tests/test_gmail_mirror.py
+"""GmailMirror senkron yolları, FakeGmailService ile (ağ/OAuth yok)."""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("GOOGLE_CLIENT_SECRETS_FILE", os.devnull)
+
+import pytest
+
+from backend.utils.gmail_fake import FakeGmailService
+from backend.utils.gmail_mirror import GmailMirror
+
+
+def _svc() -> FakeGmailService:
+    svc = FakeGmailService()
+    now = datetime.now(timezone.utc)
+    svc.add_message("m1", "Ben's Bites <ben@bites.com>", "Old", "first issue", date=now - timedelta(days=2))
+    svc.add_message("m2", "Ben's Bites <ben@bites.com>", "New", "second issue", date=now - timedelta(hours=1))
+    svc.add_message(
+        "m3", "Friend <friend@example.com>", "Hi", "personal", labels=["INBOX"], date=now - timedelta(days=1)
+    )
+    return svc
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    def no_service():
+        raise AssertionError("testler servisi açıkça verir")
+
+    return GmailMirror(path=str(tmp_path / "mirror.db"), service_factory=no_service)
+
+
+def test_full_sync(mirror):
+    svc = _svc()
+    result = mirror.sync(svc)
+
+    assert result["mode"] == "full"
+    assert result["added"] == 3
+    assert mirror.ready and mirror.history_id == str(svc._history_id)
+    assert mirror.latest_for_sender("ben@bites.com")["id"] == "m2"
+    assert [c["sender"] for c in mirror.scan_candidates()] == ["ben@bites.com"]
+
+
+def test_incremental_sync(mirror):
+    svc = _svc()
+    mirror.sync(svc)
+    svc.add_message("m4", "Ben's Bites <ben@bites.com>", "Newest", "third issue")
+    svc.delete_message("m1")
+    svc.set_labels("m3", ["INBOX", "CATEGORY_UPDATES"])
+    list_calls = svc.calls.get("messages.list", 0)
+
+    result = mirror.sync(svc)
+
+    assert result["mode"] == "incremental"
+    assert (result["added"], result["deleted"]) == (1, 1)
+    assert svc.calls.get("messages.list", 0) == list_calls  # yalnız history.list + batch get
+    assert mirror.stats()["messages"] == 3
+    assert mirror.latest_for_sender("ben@bites.com")["id"] == "m4"
+    assert {c["sender"] for c in mirror.scan_candidates()} == {"ben@bites.com", "friend@example.com"}
+
+
+def test_incremental_sync_prunes_messages_outside_lookback(mirror, monkeypatch):
+    svc = _svc()
+    mirror.sync(svc)
+    monkeypatch.setattr("backend.utils.gmail_mirror.MIRROR_LOOKBACK_DAYS", 1.5)  # m1 (2 gün) pencereden çıktı
+
+    result = mirror.sync(svc)
+
+    assert result["mode"] == "incremental"
+    assert result["pruned"] == 1
+    assert mirror.stats()["messages"] == 2
+    assert mirror.latest_for_sender("ben@bites.com", lookback_days=120)["id"] == "m2"
+
+
+def test_expired_history_triggers_full_resync(mirror):
+    svc = _svc()
+    mirror.sync(svc)
+    svc.delete_message("m1")
+    svc.expire_history()
+
+    result = mirror.sync(svc)
+
+    assert result["mode"] == "full"
+    assert mirror.stats()["messages"] == 2
+    assert mirror.history_id == str(svc._history_id)
+
+
+def test_read_path_defers_full_sync_to_background(mirror, monkeypatch):
+    monkeypatch.setattr("backend.utils.gmail_mirror.MIRROR_SYNC_INTERVAL_S", 0)
+    svc = _svc()
+
+    mirror.maybe_sync(svc)  # ayna boş: tam senkron arka planda
+    mirror.wait_background_sync(10)
+    assert mirror.ready and mirror.stats()["messages"] == 3
+
+    svc.add_message("m4", "Ben's Bites <ben@bites.com>", "Newest", "third issue")
+    svc.expire_history()
+    mirror.maybe_sync(svc)  # 404: eldeki ayna kalır, resync arka planda
+    mirror.wait_background_sync(10)
+    assert mirror.latest_for_sender("ben@bites.com")["id"] == "m4"
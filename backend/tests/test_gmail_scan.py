@@ -0,0 +1,43 @@
+# backend/tests/test_gmail_scan.py
+"""Birleşik son-e-posta sorgusu, FakeGmailService ile (ağ/OAuth yok)."""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("GOOGLE_CLIENT_SECRETS_FILE", os.devnull)
+
+import pytest
+
+from backend.utils import gmail_scan
+from backend.utils.gmail_fake import FakeGmailService
+
+
+@pytest.fixture
+def svc(monkeypatch):
+    svc = FakeGmailService(page_size=2)
+    now = datetime.now(timezone.utc)
+    for i in range(6):  # sık yazan gönderici ilk sayfaları doldurur
+        svc.add_message(f"b{i}", "Busy <busy@news.com>", f"Busy #{i}", f"busy {i}", date=now - timedelta(hours=i))
+    svc.add_message("q1", "Quiet <quiet@news.com>", "Quiet", "quiet issue", date=now - timedelta(days=3))
+    monkeypatch.setattr(gmail_scan, "MIRROR_ENABLED", False)
+    monkeypatch.setattr(gmail_scan, "_gmail", lambda: svc)
+    return svc
+
+
+def test_sender_beyond_page_cap_is_left_out(svc, monkeypatch):
+    monkeypatch.setattr(gmail_scan, "COMBINED_FETCH_MAX_MESSAGES", 4)
+
+    out = gmail_scan.fetch_latest_emails_for_senders(None, ["busy@news.com", "quiet@news.com", "none@news.com"])
+
+    assert out["busy@news.com"]["id"] == "b0"
+    # sınıra takılan gönderici boş kayıt almaz; çağıran tekil sorguya düşer
+    assert "quiet@news.com" not in out
+    assert "none@news.com" not in out
+
+
+def test_exhausted_query_marks_missing_senders_empty(svc):
+    out = gmail_scan.fetch_latest_emails_for_senders(None, ["busy@news.com", "quiet@news.com", "none@news.com"])
+
+    assert out["quiet@news.com"]["id"] == "q1"
+    assert out["none@news.com"]["id"] == ""
@@ -0,0 +1,56 @@
+# backend/tests/test_summary_cache.py
+"""SummaryCache yakın-kopya kapsamı: farklı mesajların özetleri karışmamalı."""
+from __future__ import annotations
+
+import pytest
+
+from backend.nlp.simhash import SIMHASH_MAX_DISTANCE, hamming, simhash
+from backend.summarizer.cache import SummaryCache
+
+# aynı göndericinin şablonu; sayılar yalnız manşette ayrışır
+_TEMPLATE = " ".join(
+    f"Welcome to this week's roundup of AI tools and research section {i} with links and sponsor notes."
+    for i in range(30)
+)
+ISSUE_1 = _TEMPLATE + " Top story: OpenAI ships a new reasoning model for developers."
+ISSUE_2 = _TEMPLATE + " Top story: Google releases open weights for its small language model."
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SummaryCache(path=str(tmp_path / "summary_cache.db"))
+
+
+def test_same_sender_issues_get_distinct_summaries(cache):
+    assert hamming(simhash(ISSUE_1), simhash(ISSUE_2)) <= SIMHASH_MAX_DISTANCE  # şablon yakın parmak izi verir
+
+    cache.put("msg-1", ISSUE_1, "m", "v1", {"title": "OpenAI"}, near_dup=True)
+
+    assert cache.get("msg-2", ISSUE_2, "m", "v1", near_dup=True) is None
+    cache.put("msg-2", ISSUE_2, "m", "v1", {"title": "Google"}, near_dup=True)
+    assert cache.get("msg-1", ISSUE_1, "m", "v1", near_dup=True) == {"title": "OpenAI"}
+    assert cache.get("msg-2", ISSUE_2, "m", "v1", near_dup=True) == {"title": "Google"}
+
+
+def test_identical_content_is_shared_across_messages(cache):
+    cache.put("msg-1", ISSUE_1, "m", "v1", {"title": "OpenAI"}, near_dup=True)
+
+    assert cache.get("seed-copy", ISSUE_1, "m", "v1", near_dup=True) == {"title": "OpenAI"}
+    assert cache.get("seed-copy", ISSUE_1, "m", "v2", near_dup=True) is None
+
+
+def test_same_message_near_duplicate_is_reused(cache):
+    cache.put("msg-1", ISSUE_1, "m", "v1", {"title": "OpenAI"}, near_dup=True)
+
+    # aynı mesaj, izleme parametresi değişmiş olarak yeniden çekildi
+    assert cache.get("msg-1", ISSUE_1 + " utm 42", "m", "v1", near_dup=True) == {"title": "OpenAI"}
+    assert cache.stats()["near_dup_hits"] == 1
+
+
+def test_database_is_opened_on_first_use(tmp_path):
+    path = tmp_path / "data" / "summary_cache.db"
+    cache = SummaryCache(path=str(path))
+    assert not path.exists()
+
+    assert cache.get("msg-1", ISSUE_1, "m", "v1") is None
+    assert path.exists()
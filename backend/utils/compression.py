@@ -0,0 +1,133 @@
+# backend/utils/compression.py
+"""
+Accept-Encoding'e göre gzip / brotli yanıt sıkıştırma (ASGI middleware).
+
+- İstemci destekliyorsa ve `brotli` paketi kuruluysa br, değilse gzip seçilir
+  (q değerleri dikkate alınır; q=0 reddedilmiş sayılır).
+- Yalnız tek parça gövdeler sıkıştırılır (JSONResponse/HTMLResponse vb.).
+  Akışlı yanıtlar (/summarize stream, /featured/stream NDJSON/SSE) ilk parçada
+  more_body=True olduğu için olduğu gibi geçer → token/kart gecikmesi artmaz.
+- COMPRESS_MIN_BYTES altındaki, zaten Content-Encoding'i olan ya da metin/JSON
+  olmayan yanıtlara dokunulmaz; sıkıştırma küçültmüyorsa ham gövde gider.
+"""
+from __future__ import annotations
+
+import gzip
+import os
+from typing import Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # opsiyonel bağımlılık: yoksa yalnız gzip
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+# 11 (varsayılan) çok yavaş; 4-5 gzip-6 hızında ve daha küçük
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+# Bundan büyük gövdeler thread'de sıkıştırılır (2 MB gzip ≈ 50 ms event loop'u tutmasın)
+_THREAD_MIN_BYTES = 256 * 1024
+_COMPRESSIBLE = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def choose_encoding(accept_encoding: str, allow_brotli: bool = True) -> Optional[str]:
+    """Accept-Encoding başlığından "br" / "gzip" / None."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    star = accepted.get("*", 0.0)
+    if allow_brotli and brotli is not None and accepted.get("br", star) > 0:
+        return "br"
+    if accepted.get("gzip", star) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = COMPRESS_GZIP_LEVEL,
+             brotli_quality: int = COMPRESS_BROTLI_QUALITY) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESS_MIN_BYTES,
+        gzip_level: int = COMPRESS_GZIP_LEVEL,
+        brotli_quality: int = COMPRESS_BROTLI_QUALITY,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # gövdenin ilk parçasını görene kadar beklet
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            pending, start = start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=list(pending.get("headers", [])))
+            pending["headers"] = headers.raw
+            ctype = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not ctype.startswith(_COMPRESSIBLE)
+            ):
+                await send(pending)
+                await send(message)
+                return
+
+            if len(body) >= _THREAD_MIN_BYTES:
+                data = await anyio.to_thread.run_sync(
+                    compress, body, encoding, self.gzip_level, self.brotli_quality
+                )
+            else:
+                data = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers.add_vary_header("Accept-Encoding")
+            if len(data) >= len(body):
+                await send(pending)
+                await send(message)
+                return
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(data))
+            await send(pending)
+            await send({"type": "http.response.body", "body": data, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
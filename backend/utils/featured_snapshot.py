@@ -0,0 +1,163 @@
+# backend/utils/featured_snapshot.py
+"""
+Featured kartlarının arka planda üretilen, versiyonlu snapshot'ı.
+
+- FeaturedSnapshotStore: son kart listesini DATA_DIR altına atomik olarak yazar/okur.
+- FeaturedRefresher: kartları periyodik olarak (ve tetiklendiğinde) yeniden üretir.
+  Aynı anda gelen yenileme istekleri tek bir build'de birleşir.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from backend.config.paths import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = os.getenv("FEATURED_SNAPSHOT_PATH", os.path.join(DATA_DIR, "featured_snapshot.json"))
+REFRESH_INTERVAL_S = float(os.getenv("FEATURED_REFRESH_INTERVAL_S", "1800"))
+
+
+def selection_hash(selected: List[Dict[str, Any]]) -> str:
+    """Seçim listesinin özeti; snapshot'ın hangi seçimle üretildiğini anlamak için."""
+    raw = json.dumps(selected or [], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class FeaturedSnapshotStore:
+    """Son snapshot'ı bellekte tutar, diske atomik yazar."""
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self._current: Optional[Dict[str, Any]] = None
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if self._current is not None:
+            return self._current
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get("items"), list):
+                self._current = data
+        except Exception as e:
+            logger.warning("featured snapshot unreadable (%s): %s", self.path, e)
+        return self._current
+
+    def save(self, items: List[Dict[str, Any]], sel_hash: str) -> Dict[str, Any]:
+        prev = self.load() or {}
+        now = time.time()
+        snap = {
+            "version": int(prev.get("version", 0)) + 1,
+            "built_at": datetime.fromtimestamp(now, timezone.utc).isoformat().replace("+00:00", "Z"),
+            "built_at_ts": now,
+            "selection_hash": sel_hash,
+            "items": items,
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snap, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._current = snap
+        return snap
+
+    @staticmethod
+    def meta(snap: Dict[str, Any], current_selection_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Endpoint'in döndüreceği snapshot bilgisi (yaş, versiyon, bayat mı)."""
+        age_s = max(0.0, time.time() - float(snap.get("built_at_ts", 0)))
+        stale = age_s > REFRESH_INTERVAL_S or (
+            current_selection_hash is not None and snap.get("selection_hash") != current_selection_hash
+        )
+        return {
+            "version": snap.get("version"),
+            "built_at": snap.get("built_at"),
+            "age_s": round(age_s, 1),
+            "stale": stale,
+        }
+
+
+class FeaturedRefresher:
+    """
+    build() → (items, selection_hash) döndüren coroutine'i periyodik çalıştırır.
+    trigger() thread-safe'dir; sync endpoint'lerden (ör. /selection) çağrılabilir.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], Awaitable[tuple]],
+        store: FeaturedSnapshotStore,
+        interval_s: float = REFRESH_INTERVAL_S,
+    ):
+        self._build = build
+        self.store = store
+        self.interval_s = interval_s
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        # açılışta snapshot yoksa ya da bayatsa hemen ısıt
+        snap = self.store.load()
+        if not snap or FeaturedSnapshotStore.meta(snap)["stale"]:
+            self._event.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def trigger(self) -> None:
+        """Bir sonraki turu beklemeden yenileme ister (her thread'den çağrılabilir)."""
+        if self._loop is None or self._event is None:
+            return
+        self._loop.call_soon_threadsafe(self._event.set)
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Snapshot'ı şimdi yeniden üretir; süren bir build varsa onu bekler."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._refresh_once())
+        return await asyncio.shield(self._inflight)
+
+    async def _refresh_once(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        items, sel_hash = await self._build()
+        snap = self.store.save(items, sel_hash)
+        logger.info(
+            "featured snapshot v%s built: %d cards in %.1fs",
+            snap["version"], len(items), time.monotonic() - started,
+        )
+        return snap
+
+    async def _run(self) -> None:
+        assert self._event is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout=self.interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._event.clear()
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("featured snapshot refresh failed")
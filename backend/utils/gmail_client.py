@@ -1,44 +1,139 @@
 # backend/utils/gmail_client.py
 from __future__ import annotations
 import os, glob
+import logging
+import threading
+from datetime import datetime, timedelta
 from typing import List, Optional
 from pathlib import Path
 from typing import Tuple
+from google.auth.exceptions import RefreshError
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
 from backend.config.paths import CREDENTIALS_PATH, TOKEN_PATH
 
+logger = logging.getLogger(__name__)
+
 SECRETS_FILE = os.environ["GOOGLE_CLIENT_SECRETS_FILE"]
 TOKEN_FILE = os.getenv("GOOGLE_TOKEN_FILE", "./data/token.json")
 SCOPES = os.getenv("GMAIL_SCOPES", "https://www.googleapis.com/auth/gmail.readonly").split()
 
 
-def get_gmail_service():
-    Path(os.path.dirname(TOKEN_FILE)).mkdir(parents=True, exist_ok=True)
+# Token süresi dolmadan bu kadar saniye önce yenile (istek yolunda refresh beklenmesin)
+REFRESH_AHEAD_S = float(os.getenv("GMAIL_TOKEN_REFRESH_AHEAD_S", "300"))
+
+
+def _write_token_atomic(path: str, creds: Credentials) -> None:
+    """token.json'u yarım yazılmış dosya bırakmadan günceller."""
+    Path(os.path.dirname(path) or ".").mkdir(parents=True, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as token:
+        token.write(creds.to_json())
+    os.replace(tmp, path)
+
+
+def _refresh_token_revoked(exc: Exception) -> bool:
+    """Refresh token kalıcı olarak geçersiz mi (ör. invalid_grant)? O zaman yeniden yetki gerekir."""
+    return isinstance(exc, RefreshError) and not getattr(exc, "retryable", False)
+
+
+class GmailServiceProvider:
+    """
+    Süreç genelinde paylaşılan Gmail kimlik bilgisi + servis sağlayıcı.
+    - Credentials bellekte tutulur, token.json sadece ilk seferde okunur.
+    - Süresi REFRESH_AHEAD_S içinde dolacaksa önceden yenilenir, dosyaya atomik yazılır;
+      erken yenileme başarısız olursa hâlâ geçerli token'la devam edilir.
+    - Servisler thread başına bir kez kurulur (httplib2 thread-safe değil);
+      discovery dokümanı ilk kurulumdan alınıp sonrakilerde yeniden kullanılır.
+    """
+
+    def __init__(self, token_file: str, secrets_file: str, scopes: List[str]):
+        self.token_file = token_file
+        self.secrets_file = secrets_file
+        self.scopes = scopes
+        self._lock = threading.RLock()
+        self._creds: Optional[Credentials] = None
+        self._discovery_doc: Optional[dict] = None
+        self._local = threading.local()
+
+    def _needs_refresh(self, creds: Credentials) -> bool:
+        if not creds.valid:
+            return True
+        if creds.expiry is None:
+            return False
+        # google-auth expiry'yi naive UTC tutar
+        return creds.expiry - datetime.utcnow() < timedelta(seconds=REFRESH_AHEAD_S)
+
+    def credentials(self) -> Credentials:
+        creds = self._creds
+        if creds is not None and not self._needs_refresh(creds):
+            return creds
+        with self._lock:
+            creds = self._creds
+            if creds is None and os.path.exists(self.token_file):
+                creds = Credentials.from_authorized_user_file(self.token_file, self.scopes)
+
+            # Token yoksa veya kapsamlar değiştiyse yeniden yetkilendir
+            if creds is None or self._needs_refresh(creds):
+                if creds and creds.refresh_token:
+                    try:
+                        creds.refresh(Request())  # type: ignore
+                    except Exception as e:
+                        if creds.valid:
+                            # erken yenileme başarısız ama token hâlâ geçerli: onunla devam,
+                            # bir sonraki çağrıda yeniden denenir (kilit altında tarayıcı açma)
+                            logger.warning("Gmail token erken yenilenemedi, mevcut token kullanılıyor: %s", e)
+                            self._creds = creds
+                            return creds
+                        if not _refresh_token_revoked(e):
+                            raise  # geçici hata (ağ vb.): etkileşimli akışa düşme
+                        creds = None
+                else:
+                    creds = None
+                if not creds:
+                    flow = InstalledAppFlow.from_client_secrets_file(self.secrets_file, self.scopes)
+                    # Desktop app akışı: tarayıcıyı açar, localhost loopback ile döner
+                    creds = flow.run_local_server(port=0)  # uygun boş portu seçer
+                # token'ı kaydet
+                _write_token_atomic(self.token_file, creds)
+
+            self._creds = creds
+            return creds
+
+    def service(self):
+        creds = self.credentials()
+        local = self._local
+        # aynı Credentials nesnesi yerinde yenilendiği için servis yeniden kurulmaz;
+        # sadece yeniden yetkilendirmede (yeni nesne) kurulur
+        if getattr(local, "service", None) is None or local.creds is not creds:
+            local.service = self._build(creds)
+            local.creds = creds
+        return local.service
+
+    def _build(self, creds: Credentials):
+        with self._lock:
+            doc = self._discovery_doc
+        if doc is not None:
+            return build_from_document(doc, credentials=creds)
+        service = build("gmail", "v1", credentials=creds, cache_discovery=False)
+        with self._lock:
+            self._discovery_doc = service._rootDesc
+        return service
+
+    def invalidate(self) -> None:
+        """Bellekteki kimlik bilgisini unut (ör. token iptal edildiyse); sonraki çağrı diski okur."""
+        with self._lock:
+            self._creds = None
+
+
+_provider = GmailServiceProvider(TOKEN_FILE, SECRETS_FILE, SCOPES)
 
-    creds = None
-    if os.path.exists(TOKEN_FILE):
-        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
 
-    # Token yoksa veya kapsamlar değiştiyse yeniden yetkilendir
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())  # type: ignore
-            except Exception:
-                creds = None
-        if not creds:
-            flow = InstalledAppFlow.from_client_secrets_file(SECRETS_FILE, SCOPES)
-            # Desktop app akışı: tarayıcıyı açar, localhost loopback ile döner
-            creds = flow.run_local_server(port=0)  # uygun boş portu seçer
-        # token'ı kaydet
-        with open(TOKEN_FILE, "w") as token:
-            token.write(creds.to_json())
-
-    service = build("gmail", "v1", credentials=creds)
-    return service
+def get_gmail_service():
+    """Çağıran thread'e ait, yetkili Gmail servisi (paylaşılan kimlik bilgisiyle)."""
+    return _provider.service()
 
 def list_last_messages(max_results: int = 5) -> list:
     service = get_gmail_service()
@@ -0,0 +1,245 @@
+# backend/utils/gmail_fake.py
+"""
+Gmail API'nin bellek içi sahtesi (offline geliştirme/test için).
+
+Gerçek googleapiclient servisinin kullandığımız kısmını taklit eder:
+  users().getProfile / messages().list / messages().get / history().list
+  ve new_batch_http_request()
+ve her çağrı `.execute()` ile sonuçlanır. Gmail gibi historyId tutar;
+expire_history() ile eski historyId'ler 404 döndürür (tam resync senaryosu).
+
+Örnek:
+    svc = FakeGmailService()
+    svc.add_message("m1", "Ben's Bites <ben@bites.com>", "Hello", "Body")
+    mirror.sync(svc)
+"""
+from __future__ import annotations
+
+import base64
+import re
+import time
+from email.utils import format_datetime
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+def _b64(s: str) -> str:
+    return base64.urlsafe_b64encode(s.encode("utf-8")).decode().rstrip("=")
+
+
+def _http_error(status: int, reason: str) -> HttpError:
+    resp = httplib2.Response({"status": status})
+    resp.reason = reason
+    return HttpError(resp, reason.encode())
+
+
+class _Request:
+    def __init__(self, fn, *args, **kwargs):
+        self._fn, self._args, self._kwargs = fn, args, kwargs
+
+    def execute(self):
+        return self._fn(*self._args, **self._kwargs)
+
+
+class _Batch:
+    """BatchHttpRequest taklidi: alt istekleri sırayla çalıştırır, sonucu callback'e verir."""
+
+    def __init__(self, svc: "FakeGmailService", callback=None):
+        self.svc = svc
+        self._callback = callback
+        self._items: List[tuple] = []
+
+    def add(self, request: _Request, callback=None, request_id: Optional[str] = None):
+        self._items.append((request, callback or self._callback, request_id or str(len(self._items))))
+
+    def execute(self):
+        self.svc._count("batch")
+        for request, callback, request_id in self._items:
+            try:
+                response, exception = request.execute(), None
+            except HttpError as e:
+                response, exception = None, e
+            if callback:
+                callback(request_id, response, exception)
+
+
+class FakeGmailService:
+    def __init__(self, email: str = "me@example.com", page_size: int = 100):
+        self.email = email
+        self.page_size = page_size
+        self._messages: Dict[str, Dict[str, Any]] = {}
+        self._history: List[Dict[str, Any]] = []
+        self._history_id = 1000
+        self._min_history_id = 1000
+        self.calls: Dict[str, int] = {}
+
+    # ---------- test kurulumu ----------
+    def add_message(
+        self,
+        msg_id: str,
+        from_header: str,
+        subject: str,
+        body: str,
+        date: Optional[datetime] = None,
+        labels: Optional[List[str]] = None,
+        html: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        date = date or datetime.now(timezone.utc)
+        hdrs = {"From": from_header, "Subject": subject, "Date": format_datetime(date)}
+        hdrs.update(headers or {})
+        mime = "text/html" if html else "text/plain"
+        msg = {
+            "id": msg_id,
+            "threadId": f"t-{msg_id}",
+            "labelIds": labels or ["INBOX", "CATEGORY_UPDATES"],
+            "snippet": re.sub(r"<[^>]+>", "", body)[:100],
+            "internalDate": str(int(date.timestamp() * 1000)),
+            "payload": {
+                "mimeType": "multipart/alternative",
+                "headers": [{"name": k, "value": v} for k, v in hdrs.items()],
+                "parts": [{"mimeType": mime, "body": {"data": _b64(body)}}],
+            },
+        }
+        self._messages[msg_id] = msg
+        self._record("messagesAdded", msg)
+        return msg
+
+    def delete_message(self, msg_id: str) -> None:
+        msg = self._messages.pop(msg_id, None)
+        if msg:
+            self._record("messagesDeleted", msg)
+
+    def set_labels(self, msg_id: str, labels: List[str]) -> None:
+        msg = self._messages[msg_id]
+        msg["labelIds"] = list(labels)
+        self._record("labelsAdded", msg)
+
+    def expire_history(self) -> None:
+        """Şu ana kadarki tüm historyId'leri geçersiz kıl (Gmail ~1 hafta sonra yapar)."""
+        self._min_history_id = self._history_id + 1
+
+    def _record(self, kind: str, msg: Dict[str, Any]) -> None:
+        self._history_id += 1
+        self._history.append({
+            "id": str(self._history_id),
+            kind: [{"message": {"id": msg["id"], "threadId": msg["threadId"], "labelIds": list(msg["labelIds"])}}],
+        })
+
+    def _count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    # ---------- googleapiclient arayüzü ----------
+    def users(self):
+        return self
+
+    def messages(self):
+        return _Messages(self)
+
+    def history(self):
+        return _History(self)
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+    def getProfile(self, userId: str = "me"):
+        return _Request(self._get_profile)
+
+    def _get_profile(self):
+        self._count("getProfile")
+        return {"emailAddress": self.email, "historyId": str(self._history_id)}
+
+    # ---------- sorgu ----------
+    def _matches(self, msg: Dict[str, Any], q: Optional[str]) -> bool:
+        """Gmail sorgu dilinin kullandığımız alt kümesi: from:, from:(a OR b), newer_than:Nd, category:."""
+        if not q:
+            return True
+        headers = {h["name"]: h["value"] for h in msg["payload"]["headers"]}
+        from_low = headers.get("From", "").lower()
+
+        m = re.search(r"newer_than:(\d+)d", q)
+        if m:
+            cutoff_ms = (time.time() - int(m.group(1)) * 86400) * 1000
+            if int(msg["internalDate"]) < cutoff_ms:
+                return False
+
+        m = re.search(r"from:\(([^)]*)\)", q) or re.search(r"from:(\S+)", q)
+        if m:
+            senders = [s.strip().lower() for s in re.split(r"\s+OR\s+", m.group(1)) if s.strip()]
+            if not any(s in from_low for s in senders):
+                return False
+
+        if "category:updates" in q and "label:^smartlabel_newsletter" not in q:
+            if "CATEGORY_UPDATES" not in msg["labelIds"]:
+                return False
+        return True
+
+    def _sorted(self) -> List[Dict[str, Any]]:
+        return sorted(self._messages.values(), key=lambda m: int(m["internalDate"]), reverse=True)
+
+
+class _Messages:
+    def __init__(self, svc: FakeGmailService):
+        self.svc = svc
+
+    def list(self, userId: str = "me", q: Optional[str] = None, maxResults: int = 100, pageToken: Optional[str] = None):
+        return _Request(self._list, q, maxResults, pageToken)
+
+    def _list(self, q, max_results, page_token):
+        self.svc._count("messages.list")
+        matched = [m for m in self.svc._sorted() if self.svc._matches(m, q)]
+        start = int(page_token or 0)
+        size = min(max_results or self.svc.page_size, self.svc.page_size)
+        page = matched[start:start + size]
+        resp: Dict[str, Any] = {
+            "messages": [{"id": m["id"], "threadId": m["threadId"]} for m in page],
+            "resultSizeEstimate": len(matched),
+        }
+        if start + size < len(matched):
+            resp["nextPageToken"] = str(start + size)
+        return resp
+
+    def get(self, userId: str = "me", id: str = "", format: str = "full", metadataHeaders: Optional[List[str]] = None):
+        return _Request(self._get, id, format, metadataHeaders)
+
+    def _get(self, msg_id, fmt, metadata_headers):
+        self.svc._count("messages.get")
+        msg = self.svc._messages.get(msg_id)
+        if msg is None:
+            raise _http_error(404, "Not Found")
+        if fmt != "metadata":
+            return msg
+        wanted = set(metadata_headers or [])
+        headers = [h for h in msg["payload"]["headers"] if not wanted or h["name"] in wanted]
+        return {**{k: v for k, v in msg.items() if k != "payload"}, "payload": {"headers": headers}}
+
+
+class _History:
+    def __init__(self, svc: FakeGmailService):
+        self.svc = svc
+
+    def list(
+        self,
+        userId: str = "me",
+        startHistoryId: str = "",
+        historyTypes: Optional[List[str]] = None,
+        pageToken: Optional[str] = None,
+    ):
+        return _Request(self._list, startHistoryId, pageToken)
+
+    def _list(self, start_history_id, page_token):
+        self.svc._count("history.list")
+        start = int(start_history_id)
+        if start < self.svc._min_history_id:
+            raise _http_error(404, "Requested entity was not found.")
+        records = [h for h in self.svc._history if int(h["id"]) > start]
+        offset = int(page_token or 0)
+        page = records[offset:offset + self.svc.page_size]
+        resp: Dict[str, Any] = {"history": page, "historyId": str(self.svc._history_id)}
+        if offset + self.svc.page_size < len(records):
+            resp["nextPageToken"] = str(offset + self.svc.page_size)
+        return resp
+
@@ -0,0 +1,398 @@
+# backend/utils/gmail_mirror.py
+"""
+Gmail'in yerel SQLite aynası.
+
+- İlk çalıştırmada (ya da historyId geçersiz olunca) son GMAIL_MIRROR_LOOKBACK_DAYS
+  günün mesajlarını tam olarak çeker.
+- Sonraki senkronlar users.history.list ile sadece son historyId'den beri değişenleri alır;
+  her artımlı senkrondan sonra pencereden (GMAIL_MIRROR_LOOKBACK_DAYS) çıkan mesajlar silinir.
+- Featured akışı ve aday taraması Gmail'e tekrar tekrar sormak yerine buradan okur
+  (GMAIL_MIRROR=1 iken).
+- Tam senkron (ilk kurulum / süresi dolmuş historyId) okuma yolunda yapılmaz: uygulama
+  açılışında ve gerektiğinde arka plan thread'inde çalışır; ayna hazır olana kadar
+  okumalar doğrudan Gmail'e gider (bkz. gmail_scan._mirror). Okuma yolundaki
+  maybe_sync yalnız artımlı senkron yapar ve başka bir senkron sürüyorsa beklemez.
+
+Servis olarak gerçek Gmail client'ı ya da gmail_fake.FakeGmailService verilebilir.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from googleapiclient.errors import HttpError
+
+from backend.config.paths import DATA_DIR
+from backend.utils.gmail_scan import (
+    _batch_get_messages,
+    _extract_best_body,
+    _extract_headers,
+    _guess_display_name,
+    _parse_email_address,
+    _to_iso,
+)
+
+logger = logging.getLogger(__name__)
+
+MIRROR_ENABLED = os.getenv("GMAIL_MIRROR", "0") == "1"
+MIRROR_PATH = os.getenv("GMAIL_MIRROR_PATH", os.path.join(DATA_DIR, "gmail_mirror.db"))
+MIRROR_LOOKBACK_DAYS = int(os.getenv("GMAIL_MIRROR_LOOKBACK_DAYS", "120"))
+MIRROR_MAX_MESSAGES = int(os.getenv("GMAIL_MIRROR_MAX_MESSAGES", "2000"))
+# okuma yollarında en fazla bu sıklıkla Gmail'e "değişiklik var mı" diye sorulur
+MIRROR_SYNC_INTERVAL_S = float(os.getenv("GMAIL_MIRROR_SYNC_INTERVAL_S", "60"))
+
+_HISTORY_TYPES = ["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"]
+
+
+def _default_service():
+    from backend.utils.gmail_client import get_gmail_service
+    return get_gmail_service()
+
+
+class GmailMirror:
+    def __init__(self, path: str = MIRROR_PATH, service_factory: Callable[[], Any] = _default_service):
+        self.path = path
+        self._service_factory = service_factory
+        self._db_lock = threading.Lock()
+        self._sync_lock = threading.RLock()
+        self._last_sync = 0.0
+        self._bg_lock = threading.Lock()
+        self._bg_thread: Optional[threading.Thread] = None
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                id TEXT PRIMARY KEY,
+                thread_id TEXT,
+                internal_date INTEGER NOT NULL,
+                sender TEXT NOT NULL,
+                from_raw TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                date_iso TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                body TEXT NOT NULL,
+                snippet TEXT NOT NULL,
+                label_ids TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_messages_sender_date ON messages (sender, internal_date);
+            CREATE INDEX IF NOT EXISTS ix_messages_internal_date ON messages (internal_date);
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    # ---------- state ----------
+    def _get_state(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        with self._db_lock:
+            self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+            self._conn.commit()
+
+    @property
+    def history_id(self) -> Optional[str]:
+        return self._get_state("history_id")
+
+    @property
+    def ready(self) -> bool:
+        """En az bir tam senkron tamamlandı mı (okumalar aynadan yapılabilir)."""
+        return self.history_id is not None
+
+    # ---------- yazma ----------
+    @staticmethod
+    def _row_from_message(msg: Dict[str, Any]) -> tuple:
+        payload = msg.get("payload", {}) or {}
+        headers = _extract_headers(payload)
+        from_raw = headers.get("From", "")
+        body = _extract_best_body(payload) or (msg.get("snippet") or "").strip()
+        return (
+            msg["id"],
+            msg.get("threadId"),
+            int(msg.get("internalDate") or 0),
+            _parse_email_address(from_raw),
+            from_raw,
+            headers.get("Subject", ""),
+            _to_iso(headers.get("Date", "")),
+            json.dumps(headers, ensure_ascii=False),
+            body,
+            msg.get("snippet") or "",
+            json.dumps(msg.get("labelIds") or []),
+        )
+
+    _INSERT_SQL = (
+        "INSERT OR REPLACE INTO messages "
+        "(id, thread_id, internal_date, sender, from_raw, subject, date_iso, headers, body, snippet, label_ids) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+
+    def _upsert(self, messages: List[Dict[str, Any]], replace_all: bool = False) -> None:
+        """replace_all=True: tablo tek işlemde boşaltılıp yeniden doldurulur (okurlar yarım ayna görmez)."""
+        rows = [self._row_from_message(m) for m in messages if m and m.get("id")]
+        if not rows and not replace_all:
+            return
+        with self._db_lock:
+            if replace_all:
+                self._conn.execute("DELETE FROM messages")
+            self._conn.executemany(self._INSERT_SQL, rows)
+            self._conn.commit()
+
+    def _delete(self, ids: List[str]) -> None:
+        if not ids:
+            return
+        with self._db_lock:
+            self._conn.executemany("DELETE FROM messages WHERE id = ?", [(i,) for i in ids])
+            self._conn.commit()
+
+    def _prune(self, lookback_days: float) -> int:
+        """Pencereden eski mesajları siler (tam senkron bunları zaten çekmez). DÖNÜŞ: silinen sayısı"""
+        cutoff_ms = int((time.time() - lookback_days * 86400) * 1000)
+        with self._db_lock:
+            cur = self._conn.execute("DELETE FROM messages WHERE internal_date < ?", (cutoff_ms,))
+            self._conn.commit()
+            return cur.rowcount
+
+    def _set_labels(self, changes: Dict[str, List[str]]) -> None:
+        if not changes:
+            return
+        with self._db_lock:
+            self._conn.executemany(
+                "UPDATE messages SET label_ids = ? WHERE id = ?",
+                [(json.dumps(labels), mid) for mid, labels in changes.items()],
+            )
+            self._conn.commit()
+
+    # ---------- Gmail'den çekme ----------
+    def _fetch_full(self, explicit_service, ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Tam mesajları batch'ler halinde çeker; arada silinmiş olanlar (404) düşer.
+        Dışarıdan tek servis verildiyse (ör. FakeGmailService) onu tek worker'la kullanır.
+        """
+        if explicit_service is None:
+            by_id = _batch_get_messages(ids, fmt="full", service_factory=self._service_factory)
+        else:
+            by_id = _batch_get_messages(
+                ids, fmt="full", service_factory=lambda: explicit_service, workers=1
+            )
+        return [by_id[i] for i in ids if i in by_id]
+
+    def _full_sync(self, service, explicit=None) -> Dict[str, Any]:
+        # historyId'yi listelemeden ÖNCE al: arada gelenler bir sonraki incremental'da yakalanır
+        profile = service.users().getProfile(userId="me").execute()
+        start_history = str(profile.get("historyId", ""))
+
+        ids: List[str] = []
+        page_token = None
+        q = f"newer_than:{MIRROR_LOOKBACK_DAYS}d"
+        while len(ids) < MIRROR_MAX_MESSAGES:
+            resp = service.users().messages().list(
+                userId="me", q=q, maxResults=min(500, MIRROR_MAX_MESSAGES - len(ids)), pageToken=page_token
+            ).execute()
+            ids.extend(m["id"] for m in resp.get("messages", []) or [])
+            page_token = resp.get("nextPageToken")
+            if not page_token:
+                break
+
+        messages = self._fetch_full(explicit, ids)
+        self._upsert(messages, replace_all=True)
+        self._set_state("history_id", start_history)
+        return {"mode": "full", "added": len(messages), "deleted": 0, "history_id": start_history}
+
+    def _incremental_sync(self, service, start_history: str, explicit=None) -> Dict[str, Any]:
+        added: Dict[str, None] = {}
+        deleted: Dict[str, None] = {}
+        labels: Dict[str, List[str]] = {}
+        latest = start_history
+        page_token = None
+        while True:
+            resp = service.users().history().list(
+                userId="me",
+                startHistoryId=start_history,
+                historyTypes=_HISTORY_TYPES,
+                pageToken=page_token,
+            ).execute()
+            for h in resp.get("history", []) or []:
+                for rec in h.get("messagesAdded", []) or []:
+                    mid = rec["message"]["id"]
+                    added[mid] = None
+                    deleted.pop(mid, None)
+                for rec in h.get("messagesDeleted", []) or []:
+                    mid = rec["message"]["id"]
+                    deleted[mid] = None
+                    added.pop(mid, None)
+                for key in ("labelsAdded", "labelsRemoved"):
+                    for rec in h.get(key, []) or []:
+                        m = rec["message"]
+                        labels[m["id"]] = m.get("labelIds") or []
+            latest = str(resp.get("historyId") or latest)
+            page_token = resp.get("nextPageToken")
+            if not page_token:
+                break
+
+        messages = self._fetch_full(explicit, list(added))
+        self._upsert(messages)
+        self._delete(list(deleted))
+        self._set_labels({k: v for k, v in labels.items() if k not in added and k not in deleted})
+        pruned = self._prune(MIRROR_LOOKBACK_DAYS)
+        self._set_state("history_id", latest)
+        return {
+            "mode": "incremental", "added": len(messages), "deleted": len(deleted),
+            "pruned": pruned, "history_id": latest,
+        }
+
+    # ---------- public ----------
+    def sync(self, service=None, force_full: bool = False) -> Dict[str, Any]:
+        """
+        Aynayı Gmail ile eşitler. historyId yoksa ya da Gmail 404 döndürürse
+        (historyId çok eski → süresi dolmuş) tam senkron yapılır.
+        """
+        with self._sync_lock:
+            return self._sync_locked(service, force_full=force_full, allow_full=True)
+
+    def _sync_locked(self, service, force_full: bool, allow_full: bool) -> Dict[str, Any]:
+        explicit = service
+        service = service or self._service_factory()
+        start_history = None if force_full else self.history_id
+        if start_history:
+            try:
+                result = self._incremental_sync(service, start_history, explicit)
+            except HttpError as e:
+                if getattr(e.resp, "status", None) != 404:
+                    raise
+                if not allow_full:
+                    # okuma yolu: eldeki aynayla devam, tam resync arka planda
+                    logger.info("gmail mirror: historyId %s expired, full resync in background", start_history)
+                    self._last_sync = time.monotonic()
+                    self.start_background_sync(explicit, force_full=True)
+                    return {"mode": "deferred", "added": 0, "deleted": 0, "history_id": start_history}
+                logger.info("gmail mirror: historyId %s expired, full resync", start_history)
+                result = self._full_sync(service, explicit)
+        else:
+            result = self._full_sync(service, explicit)
+        self._last_sync = time.monotonic()
+        logger.info("gmail mirror sync: %s", result)
+        return result
+
+    def start_background_sync(self, service=None, force_full: bool = False) -> bool:
+        """
+        sync()'i daemon thread'de başlatır (uygulama açılışı / ilk okuma / süresi dolmuş historyId).
+        Zaten çalışan bir arka plan senkronu varsa False.
+        """
+        with self._bg_lock:
+            if self._bg_thread is not None and self._bg_thread.is_alive():
+                return False
+            self._bg_thread = threading.Thread(
+                target=self._background_sync, args=(service, force_full), name="gmail-mirror-sync", daemon=True
+            )
+            self._bg_thread.start()
+            return True
+
+    def _background_sync(self, service, force_full: bool) -> None:
+        try:
+            self.sync(service, force_full=force_full)
+        except Exception:
+            logger.exception("gmail mirror background sync failed")
+
+    def wait_background_sync(self, timeout: Optional[float] = None) -> None:
+        t = self._bg_thread
+        if t is not None:
+            t.join(timeout)
+
+    def maybe_sync(self, service=None) -> None:
+        """
+        Okuma yolları için: son senkrondan beri MIRROR_SYNC_INTERVAL_S geçtiyse artımlı senkron.
+        Ayna hiç senkronlanmadıysa tam senkronu arka planda başlatıp hemen döner; başka bir
+        senkron sürüyorsa beklemez (eldeki ayna okunur).
+        """
+        if not self.ready:
+            self.start_background_sync(service)
+            return
+        if time.monotonic() - self._last_sync < MIRROR_SYNC_INTERVAL_S:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            # başka thread az önce senkronladıysa tekrar etme
+            if time.monotonic() - self._last_sync < MIRROR_SYNC_INTERVAL_S:
+                return
+            self._sync_locked(service, force_full=False, allow_full=False)
+        finally:
+            self._sync_lock.release()
+
+    def latest_for_sender(self, sender_email: str, lookback_days: int = 120) -> Optional[Dict[str, str]]:
+        """Göndericinin aynadaki en yeni mesajı: {"id", "content", "iso_date"}."""
+        cutoff_ms = int((time.time() - lookback_days * 86400) * 1000)
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT id, body, date_iso FROM messages "
+                "WHERE sender = ? AND internal_date >= ? ORDER BY internal_date DESC LIMIT 1",
+                ((sender_email or "").strip().lower(), cutoff_ms),
+            ).fetchone()
+        if not row:
+            return None
+        return {"id": row[0], "content": row[1], "iso_date": row[2]}
+
+    def scan_candidates(self, lookback_days: int = 30) -> List[Dict[str, Any]]:
+        """
+        Bülten göndericileri: CATEGORY_UPDATES etiketli ya da List-Unsubscribe başlıklı mesajlar.
+        DÖNÜŞ: [{"name", "sender", "count30d"}, ...]
+
+        Gmail yolu (gmail_scan.scan_candidates) `category:updates OR label:^smartlabel_newsletter`
+        sorgusunu kullanır. Gmail'in "newsletter" akıllı etiketi API'nin labelIds'inde yer
+        almadığı için yerelde birebir uygulanamaz; List-Unsubscribe başlığı onun yaklaşığıdır.
+        Bu yüzden iki mod farklı listeler döndürebilir: ayna, başlığı olan ama Gmail'in
+        newsletter saymadığı toplu gönderileri de içerir (ör. bazı bildirim/pazarlama adresleri),
+        List-Unsubscribe'sız akıllı etiketli bültenleri ise kaçırır.
+        """
+        cutoff_ms = int((time.time() - lookback_days * 86400) * 1000)
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT sender, from_raw FROM messages "
+                "WHERE internal_date >= ? AND sender != '' "
+                "AND (label_ids LIKE '%\"CATEGORY_UPDATES\"%' OR headers LIKE '%\"List-Unsubscribe\"%') "
+                "ORDER BY internal_date DESC",
+                (cutoff_ms,),
+            ).fetchall()
+
+        senders: Dict[str, Dict[str, Any]] = {}
+        for sender, from_raw in rows:
+            c = senders.setdefault(sender, {
+                "name": _guess_display_name(from_raw) or sender.split("@")[0],
+                "sender": sender,
+                "count30d": 0,
+            })
+            c["count30d"] += 1
+        candidates = list(senders.values())
+        candidates.sort(key=lambda x: (x["name"] or "").lower())
+        return candidates
+
+    def stats(self) -> Dict[str, Any]:
+        with self._db_lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()
+        return {"path": self.path, "messages": count, "history_id": self.history_id}
+
+
+_mirror: Optional[GmailMirror] = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror() -> GmailMirror:
+    """Süreç genelinde tek ayna örneği."""
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = GmailMirror()
+        return _mirror
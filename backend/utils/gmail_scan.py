@@ -3,6 +3,9 @@ from __future__ import annotations
 
 import base64
 import datetime as dt
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple
 
 from googleapiclient.discovery import Resource
@@ -11,12 +14,36 @@ from googleapiclient.discovery import Resource
 from backend.utils.gmail_client import get_gmail_service
 
 
+# GMAIL_MIRROR=1 → okumalar Gmail yerine yerel SQLite aynasından (utils/gmail_mirror.py)
+MIRROR_ENABLED = os.getenv("GMAIL_MIRROR", "0") == "1"
+
+# Taramada bakılacak en fazla mesaj sayısı (sayfalama ile)
+SCAN_MAX_MESSAGES = int(os.getenv("SCAN_MAX_MESSAGES", "2000"))
+
+# Birleşik from:(a OR b ...) sorgusunun en fazla uzunluğu ve sorgu başına bakılacak mesaj
+GMAIL_QUERY_MAX_CHARS = int(os.getenv("GMAIL_QUERY_MAX_CHARS", "1500"))
+COMBINED_FETCH_MAX_MESSAGES = int(os.getenv("COMBINED_FETCH_MAX_MESSAGES", "500"))
+
+logger = logging.getLogger(__name__)
+
+
 # ---------- servis ----------
 def _gmail() -> Resource:
     """Authorized Gmail service client döndürür."""
     return get_gmail_service()
 
 
+def _mirror():
+    """
+    Senkronlanmış yerel ayna; ilk tam senkron henüz bitmediyse None (okuma doğrudan Gmail'e).
+    (gmail_mirror bu modülün yardımcılarını kullandığı için geç import)
+    """
+    from backend.utils.gmail_mirror import get_mirror
+    mirror = get_mirror()
+    mirror.maybe_sync()
+    return mirror if mirror.ready else None
+
+
 # ---------- yardımcılar (MIME/gövde/başlık) ----------
 def _flatten_parts(parts: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
@@ -84,6 +111,88 @@ def _list_messages(service: Resource, q: str, max_results: int = 50) -> List[Dic
     return resp.get("messages", []) or []
 
 
+def _list_all_messages(service: Resource, q: str, limit: int) -> List[Dict[str, Any]]:
+    """messages.list'i sayfalayarak en fazla `limit` mesaj döndürür."""
+    out: List[Dict[str, Any]] = []
+    page_token: Optional[str] = None
+    while len(out) < limit:
+        resp = service.users().messages().list(
+            userId="me", q=q, maxResults=min(500, limit - len(out)), pageToken=page_token
+        ).execute()
+        out.extend(resp.get("messages", []) or [])
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            break
+    return out[:limit]
+
+
+# ---------- batch get ----------
+GMAIL_BATCH_SIZE = 100  # Gmail batch başına en fazla 100 alt istek
+GMAIL_BATCH_WORKERS = int(os.getenv("GMAIL_BATCH_WORKERS", "4"))
+
+
+def _execute_batch(service: Resource, ids: List[str], fmt: str, metadata_headers: Optional[List[str]]):
+    """Tek HTTP batch isteği: (başarılılar, hatalılar) sözlükleri döner."""
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, Exception] = {}
+
+    def _cb(request_id, response, exception):
+        if exception is not None:
+            errors[request_id] = exception
+        else:
+            results[request_id] = response
+
+    batch = service.new_batch_http_request(callback=_cb)
+    for mid in ids:
+        kwargs: Dict[str, Any] = {"userId": "me", "id": mid, "format": fmt}
+        if metadata_headers:
+            kwargs["metadataHeaders"] = metadata_headers
+        batch.add(service.users().messages().get(**kwargs), request_id=mid)
+    batch.execute()
+    return results, errors
+
+
+def _batch_get_messages(
+    ids: List[str],
+    fmt: str = "metadata",
+    metadata_headers: Optional[List[str]] = None,
+    service_factory=None,
+    workers: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    messages.get'i 100'lük batch'ler halinde, batch'leri de eşzamanlı çalıştırır.
+    Her worker kendi servisini kullanır (httplib2 thread-safe değil).
+    Hata alan öğeler bir kez daha denenir; yine olmazsa loglanıp atlanır.
+    DÖNÜŞ: {message_id: message}
+    """
+    service_factory = service_factory or _gmail
+    chunks = [ids[i:i + GMAIL_BATCH_SIZE] for i in range(0, len(ids), GMAIL_BATCH_SIZE)]
+    if not chunks:
+        return {}
+
+    def _run(chunk: List[str]):
+        service = service_factory()
+        results, errors = _execute_batch(service, chunk, fmt, metadata_headers)
+        if errors:
+            # çoğunlukla 429/5xx: tek seferlik tekrar
+            retry, errors = _execute_batch(service, list(errors), fmt, metadata_headers)
+            results.update(retry)
+        for mid, e in errors.items():
+            logger.warning("gmail batch get failed for %s: %s", mid, e)
+        return results
+
+    out: Dict[str, Dict[str, Any]] = {}
+    workers = max(1, min(workers or GMAIL_BATCH_WORKERS, len(chunks)))
+    if workers == 1:
+        for chunk in chunks:
+            out.update(_run(chunk))
+        return out
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for res in pool.map(_run, chunks):
+            out.update(res)
+    return out
+
+
 # ---------- yardımcılar (adres/isim/tarih) ----------
 def _parse_email_address(from_header: str) -> str:
     """
@@ -127,58 +236,81 @@ def _to_iso(date_header: str) -> str:
 def scan_candidates(user_email: Optional[str] = None, lookback_days: int = 30) -> List[Dict[str, Any]]:
     """
     Gelen kutusundan son X gün içindeki iletilerden potansiyel bülten göndericilerini çıkarır.
-    DÖNÜŞ: [{ "name": "...", "sender": "newsletter@example.com" }, ...]
+    DÖNÜŞ: [{ "name": "...", "sender": "newsletter@example.com", "count30d": N }, ...]
+    (count30d = pencere içinde o göndericiden gelen mesaj sayısı)
+    GMAIL_MIRROR=1 ise Gmail yerine yerel aynadan okunur.
     """
+    mirror = _mirror() if MIRROR_ENABLED else None
+    if mirror is not None:
+        return mirror.scan_candidates(lookback_days)
+
     service = _gmail()
 
     # Kategorileri gruplayalım; Gmail query parantezlerini ekle
     query = f'newer_than:{lookback_days}d (category:updates OR label:^smartlabel_newsletter)'
-    msgs = _list_messages(service, q=query, max_results=200)
-
-    senders: Dict[str, str] = {}
-    for m in msgs:
-        msg = service.users().messages().get(
-            userId="me",
-            id=m["id"],
-            format="metadata",
-            metadataHeaders=["From", "Subject"],
-        ).execute()
+    msgs = _list_all_messages(service, q=query, limit=SCAN_MAX_MESSAGES)
+    ids = [m["id"] for m in msgs]
+
+    # Metadata'yı tek tek değil, batch'ler halinde çek (200 mesaj → 2 HTTP isteği)
+    by_id = _batch_get_messages(ids, fmt="metadata", metadata_headers=["From", "Subject"])
+
+    senders: Dict[str, Dict[str, Any]] = {}
+    for mid in ids:  # list sırası = en yeni önce → isim en son e-postadan gelir
+        msg = by_id.get(mid)
+        if not msg:
+            continue
         headers = _extract_headers(msg.get("payload", {}))
         from_raw = headers.get("From", "")
         sender_email = _parse_email_address(from_raw)
         if not sender_email:
             continue
-        name = _guess_display_name(from_raw) or sender_email.split("@")[0]
-        senders.setdefault(sender_email, name)
+        c = senders.setdefault(sender_email, {
+            "name": _guess_display_name(from_raw) or sender_email.split("@")[0],
+            "sender": sender_email,
+            "count30d": 0,
+        })
+        c["count30d"] += 1
 
     # Liste formatına çevir
-    candidates = [{"name": name, "sender": sender} for sender, name in senders.items()]
+    candidates = list(senders.values())
     candidates.sort(key=lambda x: (x["name"] or "").lower())
     return candidates
 
 
 # ---------- içerik çekme ----------
-def fetch_latest_email_content_for_sender(
+def fetch_latest_email_for_sender(
     user_email: Optional[str],
     sender_email: str,
-    lookback_days: int = 120,  # daha geniş pencere
-) -> Tuple[str, str]:
+    lookback_days: int = 120,
+) -> Dict[str, str]:
     """
-    Belirli bir göndericiden gelen en son e-postanın metnini ve tarihini döndürür.
-    DÖNÜŞ: (content, iso_date)
+    Belirli bir göndericiden gelen en son e-postayı döndürür.
+    DÖNÜŞ: {"id": gmail_message_id, "content": "...", "iso_date": "..."}
+    (mesaj yoksa id ve content boş string olur)
+    GMAIL_MIRROR=1 ise Gmail yerine yerel aynadan okunur.
     """
+    empty = {"id": "", "content": "", "iso_date": "1970-01-01T00:00:00Z"}
     if not sender_email:
-        return "", "1970-01-01T00:00:00Z"
+        return empty
+
+    mirror = _mirror() if MIRROR_ENABLED else None
+    if mirror is not None:
+        return mirror.latest_for_sender(sender_email, lookback_days) or empty
 
     service = _gmail()
 
     q = f'from:{sender_email} newer_than:{lookback_days}d'
     msgs = _list_messages(service, q=q, max_results=1)
     if not msgs:
-        return "", "1970-01-01T00:00:00Z"
+        return empty
 
     msg_id = msgs[0]["id"]
     msg = service.users().messages().get(userId="me", id=msg_id, format="full").execute()
+    return _to_latest(msg)
+
+
+def _to_latest(msg: Dict[str, Any]) -> Dict[str, str]:
+    """Tam (format=full) Gmail mesajından {"id", "content", "iso_date"} üretir."""
     payload = msg.get("payload", {})
 
     content = _extract_best_body(payload)
@@ -190,4 +322,115 @@ def fetch_latest_email_content_for_sender(
     date_str = headers.get("Date", "")
     iso_date = _to_iso(date_str)
 
-    return content, iso_date
+    return {"id": msg["id"], "content": content, "iso_date": iso_date}
+
+
+def _build_sender_queries(senders: List[str], lookback_days: int, max_chars: int) -> List[List[str]]:
+    """
+    Göndericileri `from:(a OR b OR c) newer_than:Nd` sorguları Gmail'in uzunluk sınırını
+    aşmayacak şekilde gruplar. DÖNÜŞ: her sorgu için gönderici listesi.
+    """
+    suffix_len = len(f"from:() newer_than:{lookback_days}d")
+    groups: List[List[str]] = []
+    cur: List[str] = []
+    cur_len = suffix_len
+    for sender in senders:
+        add = len(sender) + (4 if cur else 0)  # " OR "
+        if cur and cur_len + add > max_chars:
+            groups.append(cur)
+            cur, cur_len, add = [], suffix_len, len(sender)
+        cur.append(sender)
+        cur_len += add
+    if cur:
+        groups.append(cur)
+    return groups
+
+
+def _sender_query(group: List[str], lookback_days: int) -> str:
+    return f"from:({' OR '.join(group)}) newer_than:{lookback_days}d"
+
+
+def fetch_latest_emails_for_senders(
+    user_email: Optional[str],
+    sender_emails: List[str],
+    lookback_days: int = 120,
+) -> Dict[str, Dict[str, str]]:
+    """
+    Birden çok göndericinin en son e-postalarını birkaç birleşik sorguyla çeker:
+      1) from:(a OR b OR ...) ile id listesi (GMAIL_QUERY_MAX_CHARS'a göre gruplanır),
+      2) batch metadata ile From başlığına göre yerelde gruplama (en yeni → ilk görülen),
+      3) her göndericinin en yeni mesajının gövdesi tek batch'te.
+    12 gönderici için ~3 HTTP isteği (eskiden 24).
+    DÖNÜŞ: {sender(lower): {"id", "content", "iso_date"}}; sorgu sonuna kadar taranıp mesajı
+    bulunmayan göndericiler boş kayıt alır. COMBINED_FETCH_MAX_MESSAGES sınırına takılıp
+    görülemeyen (ya da gövdesi alınamayan) göndericiler sonuçta YER ALMAZ → çağıran tek
+    gönderici sorgusuna düşmeli.
+    """
+    empty = {"id": "", "content": "", "iso_date": "1970-01-01T00:00:00Z"}
+    wanted = [s.strip().lower() for s in sender_emails if s and s.strip()]
+    wanted = list(dict.fromkeys(wanted))
+    if not wanted:
+        return {}
+
+    mirror = _mirror() if MIRROR_ENABLED else None
+    if mirror is not None:
+        return {s: mirror.latest_for_sender(s, lookback_days) or dict(empty) for s in wanted}
+
+    service = _gmail()
+    newest: Dict[str, str] = {}  # sender → message id
+    unresolved: set = set()  # sayfa sınırı yüzünden bulunamayanlar (yokluğu kesin değil)
+    for group in _build_sender_queries(wanted, lookback_days, GMAIL_QUERY_MAX_CHARS):
+        q = _sender_query(group, lookback_days)
+        missing = set(group)
+        page_token: Optional[str] = None
+        seen = 0
+        # çok sık yazan bir gönderici sayfayı doldurabilir: eksik kalan varsa bir sonraki sayfaya bak
+        while missing and seen < COMBINED_FETCH_MAX_MESSAGES:
+            resp = service.users().messages().list(
+                userId="me", q=q, maxResults=100, pageToken=page_token
+            ).execute()
+            ids = [m["id"] for m in resp.get("messages", []) or []]
+            seen += len(ids)
+            meta = _batch_get_messages(ids, fmt="metadata", metadata_headers=["From"])
+            for mid in ids:  # list sırası en yeni → en eski
+                msg = meta.get(mid)
+                if not msg:
+                    continue
+                from_raw = _extract_headers(msg.get("payload", {})).get("From", "")
+                addr = _parse_email_address(from_raw)
+                low = from_raw.lower()
+                for sender in list(missing):
+                    # adres tam eşleşmeli; '@' içermeyen (alan adı vb.) girişler parça eşleşir
+                    if sender == addr or ("@" not in sender and sender in low):
+                        newest[sender] = mid
+                        missing.discard(sender)
+            page_token = resp.get("nextPageToken")
+            if not page_token:
+                break
+        if page_token:
+            unresolved |= missing
+
+    full = _batch_get_messages(list(dict.fromkeys(newest.values())), fmt="full")
+    out: Dict[str, Dict[str, str]] = {}
+    for sender in wanted:
+        if sender in newest:
+            msg = full.get(newest[sender])
+            if msg:
+                out[sender] = _to_latest(msg)
+        elif sender not in unresolved:
+            out[sender] = dict(empty)
+    return out
+
+
+def fetch_latest_email_content_for_sender(
+    user_email: Optional[str],
+    sender_email: str,
+    lookback_days: int = 120,  # daha geniş pencere
+) -> Tuple[str, str]:
+    """
+    Belirli bir göndericiden gelen en son e-postanın metnini ve tarihini döndürür.
+    DÖNÜŞ: (content, iso_date)
+    """
+    msg = fetch_latest_email_for_sender(user_email, sender_email, lookback_days)
+    return msg["content"], msg["iso_date"]
+
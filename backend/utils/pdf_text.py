@@ -0,0 +1,116 @@
+# backend/utils/pdf_text.py
+"""
+PDF'ten metin çıkarma (PyMuPDF), tamamen bellekte.
+
+- Dosya diske yazılmaz: fitz.open(stream=..., filetype="pdf")
+- Sayfalar sırayla okunur; PDF_MAX_PAGES / PDF_MAX_CHARS dolunca durulur.
+- PDF_PARALLEL_MIN_PAGES ve üzeri sayfalı belgelerde sayfa aralıkları bir
+  process havuzuna dağıtılır (CPU işi API worker'ını / GIL'i tutmaz).
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "500"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "400000"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _open(pdf_bytes: bytes) -> fitz.Document:
+    return fitz.open(stream=pdf_bytes, filetype="pdf")
+
+
+def iter_pdf_pages(pdf_bytes: bytes, max_pages: int = PDF_MAX_PAGES) -> Iterator[str]:
+    """Sayfa metinlerini tek tek verir; tüketici erken durursa kalan sayfalar hiç okunmaz."""
+    doc = _open(pdf_bytes)
+    try:
+        for i in range(min(doc.page_count, max_pages)):
+            yield doc.load_page(i).get_text()
+    finally:
+        doc.close()
+
+
+def _extract_range(args: Tuple[bytes, int, int]) -> List[str]:
+    # process havuzunda çalışır (pickle edilebilmesi için modül seviyesinde)
+    pdf_bytes, start, stop = args
+    doc = _open(pdf_bytes)
+    try:
+        return [doc.load_page(i).get_text() for i in range(start, stop)]
+    finally:
+        doc.close()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: çok thread'li sunucuda fork güvenli değil
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, PDF_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pdf_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _join_capped(pages: Iterator[str], max_chars: int) -> str:
+    out: List[str] = []
+    total = 0
+    for text in pages:
+        if max_chars > 0 and total + len(text) > max_chars:
+            out.append(text[: max(0, max_chars - total)])
+            break
+        out.append(text)
+        total += len(text) + 1
+    return "\n".join(out)
+
+
+def _parallel_pages(pdf_bytes: bytes, n_pages: int) -> Iterator[str]:
+    workers = max(1, PDF_WORKERS)
+    step = -(-n_pages // workers)  # ceil
+    ranges = [(pdf_bytes, s, min(s + step, n_pages)) for s in range(0, n_pages, step)]
+    for pages in _get_pool().map(_extract_range, ranges):
+        yield from pages
+
+
+def extract_pdf_text(
+    pdf_bytes: bytes,
+    max_pages: int = PDF_MAX_PAGES,
+    max_chars: int = PDF_MAX_CHARS,
+) -> str:
+    """PDF'i düz metne çevirir (sayfalar arası '\\n'); sayfa ve karakter sınırlıdır."""
+    if not pdf_bytes:
+        return ""
+    doc = _open(pdf_bytes)
+    try:
+        n_pages = min(doc.page_count, max_pages)
+    finally:
+        doc.close()
+
+    if PDF_WORKERS > 1 and n_pages >= PDF_PARALLEL_MIN_PAGES:
+        try:
+            return _join_capped(_parallel_pages(pdf_bytes, n_pages), max_chars)
+        except Exception as e:
+            logger.warning("parallel PDF extraction failed, falling back to serial: %s", e)
+            shutdown_pdf_pool()  # bozulmuş havuzu bir sonraki çağrıda yeniden kur
+    return _join_capped(iter_pdf_pages(pdf_bytes, max_pages), max_chars)
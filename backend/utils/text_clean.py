@@ -1,24 +1,40 @@
 # backend/utils/text_clean.py
+import os
 import re
+from html.parser import HTMLParser
+
 from bs4 import BeautifulSoup
+from bs4.dammit import EntitySubstitution
+
+from backend.nlp.patterns import build_pattern_set
+
+# fast → tek geçişli HTMLParser temizleyici (ağaç kurmaz); bs4 → eski BeautifulSoup yolu
+TEXT_CLEAN_ENGINE = os.getenv("TEXT_CLEAN_ENGINE", "fast").lower()
+# Bundan uzun gövdeler kesilir (karakter); dev HTML'ler worker'ı kilitlemesin
+TEXT_CLEAN_MAX_INPUT = int(os.getenv("TEXT_CLEAN_MAX_INPUT", "1000000"))
 
-_UNSUB_PATTERNS = [
-    "unsubscribe",
-    "view email in browser",
-    "view in browser",
-    "privacy policy",
-    "manage preferences",
-    "update preferences",
-    "contact us",
-    "sponsored",
-    "in partnership with",
-    "advertiser content",
-    "ad:",
-    "sponsor:",
-    "read in browser",
-    "read on the web",
-    "open in browser",
-]
+# footer/CTA/abonelik blokları; dile göre (etkin diller: PATTERN_LANGS)
+_UNSUB_PATTERNS_BY_LANG = {
+    "en": [
+        "unsubscribe",
+        "view email in browser",
+        "view in browser",
+        "privacy policy",
+        "manage preferences",
+        "update preferences",
+        "contact us",
+        "sponsored",
+        "in partnership with",
+        "advertiser content",
+        "ad:",
+        "sponsor:",
+        "read in browser",
+        "read on the web",
+        "open in browser",
+    ],
+}
+_UNSUB = build_pattern_set(_UNSUB_PATTERNS_BY_LANG)
+_UNSUB_PATTERNS = _UNSUB.patterns
 
 # “tarih/başlık/abone” gibi çöp satırları erkenden at
 _HEADER_GARBAGE_RE = re.compile(
@@ -31,6 +47,8 @@ _HEADER_GARBAGE_RE = re.compile(
 )
 
 _URL_RE = re.compile(r"http[s]?://\S+", re.I)
+_SPACES_RE = re.compile(r"[ \t]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
 
 def _strip_unsub_blocks(soup: BeautifulSoup):
     for t in soup(["script", "style", "noscript"]):
@@ -38,29 +56,228 @@ def _strip_unsub_blocks(soup: BeautifulSoup):
 
     # metin düğümlerini tarayıp üst bloğu kaldır
     for el in list(soup.find_all(string=True)):
+        # daha önce silinen bir bloğun içindeyse (decompose edilmiş) atla
+        if el.decomposed:
+            continue
         s = (el or "").strip().lower()
         if not s:
             continue
-        if any(p in s for p in _UNSUB_PATTERNS):
+        if _UNSUB.search(s):
             p = el.parent
             if p and p.name not in ("body", "html"):
                 p.decompose()
 
-def clean_text(html_or_text: str) -> str:
+# ---------- tek geçişli temizleyici ----------
+# bs4 (html.parser) + _strip_unsub_blocks + get_text("\n", strip=True) ile birebir aynı
+# çıktıyı ağaç kurmadan üretir:
+# - her açık etiket için yığında bir çerçeve (ad + metin parçaları) tutulur,
+# - unsub kalıbı içeren metin düğümü, bulunduğu çerçeveyi "silindi" diye işaretler;
+#   çerçeve kapanınca içeriği atılır (body/html hariç; kök silinirse çıktı boş),
+# - script/style/noscript içi hiç değerlendirilmez,
+# - yorum/doctype/PI kalıp eşleşmesine katılır ama çıktıya girmez (bs4'teki gibi),
+# - rt/rp/template içindeki düz metinler çıktıya girmez (bs4 string container'ları).
+
+_ROOT = "[document]"
+_DROP_TAGS = frozenset(("script", "style", "noscript"))
+_KEEP_TAGS = frozenset(("body", "html"))
+_STRING_CONTAINERS = frozenset(("rt", "rp", "style", "script", "template"))
+_VOID_TAGS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem",
+    "meta", "param", "source", "track", "wbr",
+    "basefont", "bgsound", "command", "frame", "image", "isindex", "nextid", "spacer",
+))
+
+# metin düğümü türleri
+_TEXT, _CDATA, _OTHER = 0, 1, 2
+
+
+class _Frame:
+    __slots__ = ("name", "parts", "removed", "dropped", "container")
+
+    def __init__(self, name: str, dropped: bool, container: bool):
+        self.name = name
+        self.parts: list = []   # str ya da kapanmış çocuk çerçevenin parts listesi
+        self.removed = False
+        self.dropped = dropped
+        self.container = container
+
+
+class _StreamingCleaner(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self._stack = [_Frame(_ROOT, False, False)]
+        self._open = {}
+        self._removed_open = 0
+        self._pending: list = []
+        self._closed_void: list = []
+
+    # --- yığın ---
+    def _push(self, name: str) -> None:
+        top = self._stack[-1]
+        self._stack.append(_Frame(name, top.dropped or name in _DROP_TAGS, top.container or name in _STRING_CONTAINERS))
+        self._open[name] = self._open.get(name, 0) + 1
+
+    def _pop(self) -> None:
+        frame = self._stack.pop()
+        self._open[frame.name] -= 1
+        if frame.removed:
+            self._removed_open -= 1
+        elif frame.parts:
+            self._stack[-1].parts.append(frame.parts)
+
+    def _pop_to(self, name: str) -> None:
+        if not self._open.get(name):
+            return
+        while len(self._stack) > 1:
+            frame_name = self._stack[-1].name
+            self._pop()
+            if frame_name == name:
+                break
+
+    # --- metin düğümleri ---
+    def _flush(self) -> None:
+        if self._pending:
+            data = "".join(self._pending)
+            self._pending = []
+            self._node(data, _TEXT)
+
+    def _node(self, data: str, kind: int) -> None:
+        frame = self._stack[-1]
+        if frame.dropped:
+            return
+        stripped = data.strip()
+        if not stripped:
+            return
+        if not self._removed_open:
+            if _UNSUB.search(stripped.lower()) and frame.name not in _KEEP_TAGS:
+                frame.removed = True
+                self._removed_open += 1
+        if kind == _CDATA or (kind == _TEXT and not frame.container):
+            frame.parts.append(stripped)
+
+    # --- HTMLParser olayları (bs4'ün BeautifulSoupHTMLParser'ı ile aynı anlamda) ---
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self._flush()
+        self._push(tag)
+        if handle_empty_element and tag in _VOID_TAGS:
+            self.handle_endtag(tag, check_already_closed=False)
+            self._closed_void.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self._closed_void:
+            self._closed_void.remove(tag)
+        else:
+            self._flush()
+            self._pop_to(tag)
+
+    def handle_data(self, data):
+        self._pending.append(data)
+
+    def handle_charref(self, name):
+        if name.startswith("x"):
+            code = int(name.lstrip("x"), 16)
+        elif name.startswith("X"):
+            code = int(name.lstrip("X"), 16)
+        else:
+            code = int(name)
+        data = None
+        if code < 256:
+            try:
+                data = bytearray([code]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(code)
+            except (ValueError, OverflowError):
+                pass
+        self._pending.append(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self._pending.append(character if character is not None else "&%s" % name)
+
+    def handle_comment(self, data):
+        self._flush()
+        self._node(data, _OTHER)
+
+    def handle_decl(self, data):
+        self._flush()
+        if data.startswith("DOCTYPE "):
+            data = data[len("DOCTYPE "):]
+        self._node(data, _OTHER)
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith("CDATA["):
+            self._node(data[len("CDATA["):], _CDATA)
+        else:
+            self._node(data, _OTHER)
+
+    def handle_pi(self, data):
+        self._flush()
+        self._node(data, _OTHER)
+
+    def text(self) -> str:
+        self.close()
+        self._flush()
+        while len(self._stack) > 1:
+            self._pop()
+        root = self._stack[0]
+        if root.removed:
+            return ""
+        out: list = []
+        todo = [iter(root.parts)]
+        while todo:
+            for item in todo[-1]:
+                if isinstance(item, list):
+                    todo.append(iter(item))
+                    break
+                out.append(item)
+            else:
+                todo.pop()
+        return "\n".join(out)
+
+
+def _html_to_text_fast(html: str) -> str:
+    parser = _StreamingCleaner()
+    parser.feed(html)
+    return parser.text()
+
+
+def _html_to_text_bs4(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    _strip_unsub_blocks(soup)
+    return soup.get_text("\n", strip=True)
+
+
+def html_to_text(html: str, engine: str = "") -> str:
+    """HTML → düz metin (script/style ve unsub/footer blokları atılmış)."""
+    if (engine or TEXT_CLEAN_ENGINE) == "bs4":
+        return _html_to_text_bs4(html)
+    return _html_to_text_fast(html)
+
+
+def clean_text(html_or_text: str, engine: str = "") -> str:
     """
     Newsletter gövdesini temizler:
     - HTML ise <script/style> ve typik footer/CTA/unsub bloklarını siler,
     - 'read in browser', tarih başlıkları, fazla URL ve boşlukları kırpar,
     - gereksiz satırları ayıklar.
+    TEXT_CLEAN_MAX_INPUT karakterden uzun girdiler kesilir.
     """
     if not html_or_text:
         return ""
+    if TEXT_CLEAN_MAX_INPUT > 0 and len(html_or_text) > TEXT_CLEAN_MAX_INPUT:
+        html_or_text = html_or_text[:TEXT_CLEAN_MAX_INPUT]
 
     # HTML ise parse et
     if "<" in html_or_text and ">" in html_or_text:
-        soup = BeautifulSoup(html_or_text, "html.parser")
-        _strip_unsub_blocks(soup)
-        text = soup.get_text("\n", strip=True)
+        text = html_to_text(html_or_text, engine)
     else:
         text = html_or_text
 
@@ -73,6 +290,6 @@ def clean_text(html_or_text: str) -> str:
     text = _URL_RE.sub("", text)
 
     # aşırı boşlukları toparla
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _SPACES_RE.sub(" ", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text)
     return text.strip()
@@ -0,0 +1,177 @@
+# backend/utils/url_fetch.py
+"""
+URL'den makale metni çekme katmanı.
+
+- Tek, havuzlu requests.Session (keep-alive + geçici hatalarda retry)
+- Disk cache'i (DATA_DIR/url_cache): çıkarılmış metin + ETag/Last-Modified
+  * URL_CACHE_FRESH_S içinde: ağ yok, parse yok
+  * sonrasında koşullu GET (If-None-Match / If-Modified-Since); 304 → cache'teki metin
+- Hızlı ana içerik çıkarıcı: BeautifulSoup ağacı kurmadan, stdlib HTMLParser ile
+  nav/header/footer/script gibi blokların dışındaki ilk <p>'leri toplar ve
+  yeterince paragraf bulunca okumayı bırakır.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from backend.config.paths import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+URL_CACHE_DIR = os.getenv("URL_CACHE_DIR", os.path.join(DATA_DIR, "url_cache"))
+URL_CACHE_FRESH_S = float(os.getenv("URL_CACHE_FRESH_S", "3600"))
+URL_FETCH_TIMEOUT = float(os.getenv("URL_FETCH_TIMEOUT", "20"))
+URL_MAX_PARAGRAPHS = 10
+# Çıkarıcı değişirse artır → eski cache metinleri kullanılmaz
+EXTRACTOR_VERSION = 1
+
+_FEED_CHUNK = 64 * 1024
+_WS_RE = re.compile(r"\s+")
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            s.headers.update({"User-Agent": "Mozilla/5.0 (compatible; NewslyBot/1.0)"})
+            _session = s
+        return _session
+
+
+# ---------- içerik çıkarıcı ----------
+class _ParagraphExtractor(HTMLParser):
+    _SKIP = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "template"}
+
+    def __init__(self, max_paragraphs: int):
+        super().__init__(convert_charrefs=True)
+        self.max_paragraphs = max_paragraphs
+        self.paragraphs: List[str] = []
+        self._skip_depth = 0
+        self._in_p = 0
+        self._buf: List[str] = []
+
+    @property
+    def done(self) -> bool:
+        return len(self.paragraphs) >= self.max_paragraphs
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip_depth += 1
+        elif tag == "p" and not self._skip_depth:
+            if self._in_p:  # kapanmamış <p> (HTML'de geçerli): öncekini bitir
+                self._flush()
+            self._in_p = 1
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "p" and self._in_p:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._in_p and not self._skip_depth:
+            self._buf.append(data)
+
+    def _flush(self):
+        text = _WS_RE.sub(" ", "".join(self._buf)).strip()
+        self._buf, self._in_p = [], 0
+        if text and not self.done:
+            self.paragraphs.append(text)
+
+
+def extract_main_text(html: str, max_paragraphs: int = URL_MAX_PARAGRAPHS) -> str:
+    """Sayfanın ilk anlamlı paragraflarını tek metin olarak döner."""
+    parser = _ParagraphExtractor(max_paragraphs)
+    for i in range(0, len(html or ""), _FEED_CHUNK):
+        parser.feed(html[i:i + _FEED_CHUNK])
+        if parser.done:
+            break
+    if not parser.done and parser._in_p:
+        parser._flush()
+    return " ".join(parser.paragraphs)
+
+
+# ---------- disk cache ----------
+def _cache_path(url: str) -> str:
+    return os.path.join(URL_CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+
+def _load(url: str) -> Optional[Dict[str, Any]]:
+    path = _cache_path(url)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("url cache unreadable (%s): %s", path, e)
+        return None
+    if entry.get("url") != url or entry.get("extractor") != EXTRACTOR_VERSION:
+        return None
+    return entry
+
+
+def _save(entry: Dict[str, Any]) -> None:
+    path = _cache_path(entry["url"])
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(URL_CACHE_DIR, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("url cache write failed (%s): %s", path, e)
+
+
+def fetch_url_text(url: str) -> str:
+    """URL'nin ana metnini döner; mümkünse cache'ten, gerekirse koşullu GET ile."""
+    entry = _load(url)
+    now = time.time()
+    if entry and now - entry.get("fetched_at", 0) < URL_CACHE_FRESH_S:
+        return entry["text"]
+
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    r = get_session().get(url, headers=headers, timeout=URL_FETCH_TIMEOUT)
+    if r.status_code == 304 and entry:
+        entry["fetched_at"] = now
+        _save(entry)
+        return entry["text"]
+    r.raise_for_status()
+
+    text = extract_main_text(r.text)
+    if "no-store" not in (r.headers.get("Cache-Control") or "").lower():
+        _save({
+            "url": url,
+            "extractor": EXTRACTOR_VERSION,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "fetched_at": now,
+            "text": text,
+        })
+    return text
@@ -157,19 +157,55 @@ export default function Home() {
         setLoading(true);
         setLoadError(null);
 
-        // 1) Featured items'ı çek
+        const byDate = (a: FeaturedItem, b: FeaturedItem) =>
+          (b.date ? Date.parse(b.date) : 0) - (a.date ? Date.parse(a.date) : 0);
+
+        // 1) Featured kartlarını NDJSON stream ile çek: her kart hazır oldukça ekrana düşer
+        const res = await fetch(`${API}/api/newsletters/featured/stream`, { signal: ctrl.signal });
+        if (res.ok && res.body) {
+          const reader = res.body.getReader();
+          const decoder = new TextDecoder();
+          let buf = "";
+          let items: FeaturedItem[] = [];
+          for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buf += decoder.decode(value, { stream: true });
+            const lines = buf.split("\n");
+            buf = lines.pop() ?? "";
+            for (const line of lines) {
+              if (!line.trim()) continue;
+              const ev = JSON.parse(line);
+              if (ev.event === "card" && ev.item) {
+                // Backend her item'da tag döndürüyor => normalize içinde topic: item.tag ... zaten önde
+                items = [...items, normalize(ev.item)].sort(byDate);
+                setAllNewsletters(items);
+                setLoading(false);
+              } else if (ev.event === "update" && ev.item) {
+                // sonradan yakın-kopya gönderici katlanan kart: aynı id'li öğeyi değiştir
+                const upd = normalize(ev.item);
+                items = items.map((x) => (x.id === upd.id ? upd : x));
+                setAllNewsletters(items);
+              } else if (ev.event === "error") {
+                // build yarıda kesildi: gelen kartlar kalır, hata tek seferlik fetch'teki gibi gösterilir
+                console.error("featured stream error:", ev.error);
+                setLoadError("İçerikler yüklenemedi. Lütfen daha sonra tekrar deneyin.");
+                setLoading(false);
+              }
+            }
+          }
+          return;
+        }
+
+        // 2) Stream yoksa: klasik tek seferlik JSON
         let featured = await jsonFetch<{ items: any[] }>(`${API}/api/newsletters/featured`);
         if (!featured || !Array.isArray(featured.items)) {
           featured = { items: [] as any[] };
         }
-
-        // 2) Backend artık her item'da tag döndürüyor => normalize içinde topic: item.tag ... zaten önde
         let items = (featured.items || []).map(normalize);
 
         // 3) Sırala ve state'e yaz
-        items.sort(
-          (a, b) => (b.date ? Date.parse(b.date) : 0) - (a.date ? Date.parse(a.date) : 0)
-        );
+        items.sort(byDate);
         setAllNewsletters(items);
       } catch (err: any) {
         if (err?.name !== "AbortError") {